@@ -0,0 +1,132 @@
+#!/usr/local/bin/python3
+
+# file: bench_import.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# start-up cost of short-lived fgt_api.py invocations (scripts, cron jobs, CLI calls)
+
+# notes:
+# every sample runs in a fresh interpreter, so nothing is cached in sys.modules;
+#   compile the repo first (python3 -m compileall .) so bytecode compilation is not
+#   counted
+# scenarios:
+#   import          wall time of "import fgt_api" and the number of modules it loads
+#   first_request   import + client setup + one get_firmware call against fgt_mock.py,
+#                   with the default requests transport and with fgt_http_transport
+# the times reported are the median over --runs interpreters; the process start-up
+#   time of a bare interpreter is reported separately and not subtracted
+# results are written as JSON; compare runs with bench_suite.py --compare
+# usage: python3 benchmarks/bench_import.py --output import.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+repo_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, repo_dir)
+from bench_suite import start_mock
+
+# code run in the child interpreter; prints a JSON line with its own timings
+child_bare = '''
+import json, sys
+print(json.dumps({'seconds': 0.0, 'modules': len(sys.modules),
+                  'requests_loaded': 'requests' in sys.modules}))
+'''
+
+child_import = '''
+import json, sys, time
+start = time.perf_counter()
+import fgt_api
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'modules': len(sys.modules),
+                  'requests_loaded': 'requests' in sys.modules}))
+'''
+
+child_request = '''
+import json, sys, time
+start = time.perf_counter()
+import fgt_api
+client = fgt_api.fgt_api_token('bench', '127.0.0.1', 'token')
+client.protocol = 'http'
+client.set_port(%d)
+if %r == 'http.client':
+    client.set_transport(fgt_api.fgt_http_transport())
+response = client.get_firmware()
+elapsed = time.perf_counter() - start
+assert response.status_code == 200
+print(json.dumps({'seconds': elapsed, 'modules': len(sys.modules),
+                  'requests_loaded': 'requests' in sys.modules}))
+'''
+
+
+# run code in "runs" fresh interpreters and summarize the reported timings
+def run_child(code, runs):
+    samples = []
+    wall = []
+    for index in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], cwd=repo_dir,
+                                stdout=subprocess.PIPE, check=True).stdout
+        wall.append(time.perf_counter() - start)
+        samples.append(json.loads(output.decode().splitlines()[-1]))
+    seconds = sorted(sample['seconds'] for sample in samples)
+    return {'runs': runs,
+            'median_ms': statistics.median(seconds) * 1000,
+            'min_ms': seconds[0] * 1000,
+            'max_ms': seconds[-1] * 1000,
+            'process_median_ms': statistics.median(wall) * 1000,
+            'modules': samples[-1]['modules'],
+            'requests_loaded': samples[-1]['requests_loaded']}
+
+
+def bench_import(args):
+    return {'bare_interpreter': run_child(child_bare, args.runs),
+            'fgt_api': run_child(child_import, args.runs)}
+
+
+def bench_first_request(args):
+    process, port = start_mock(args)
+    try:
+        return {transport: run_child(child_request % (port, transport), args.runs)
+                for transport in ('requests', 'http.client')}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='fgt_api start-up benchmark')
+    parser.add_argument('--runs', type=int, default=20,
+                        help='fresh interpreters per measurement')
+    parser.add_argument('--addresses', type=int, default=100)
+    parser.add_argument('--policies', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='mock server delay per request in seconds')
+    parser.add_argument('--scenarios', nargs='+', default=['import', 'first_request'])
+    parser.add_argument('--output', default='bench_import.json')
+    args = parser.parse_args()
+
+    scenarios = {'import': bench_import, 'first_request': bench_first_request}
+    report = {'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'runs': args.runs},
+              'results': {}}
+    for name in args.scenarios:
+        print('running ' + name)
+        report['results'][name] = scenarios[name](args)
+
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps(report['results'], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/local/bin/python3
+
+# file: bench_json_stream.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# compare full-response decoding (api_get().json(), or fgt_api.json_loads, which is
+#   orjson when installed) with incremental decoding (api_get(stream=True)) of a
+#   large cmdb/firewall/policy/ response
+
+# notes:
+# the policy table is served by an fgt_mock.py server running in this process
+# each decode mode runs in its own child process, so peak RSS is not shared
+# usage: python3 benchmarks/bench_json_stream.py [--policies N]
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import fgt_api
+import fgt_mock
+
+
+# child process: decode the table once in the given mode and print stats as JSON
+def run_mode(mode, port):
+    client = fgt_api.fgt_api_token('bench', '127.0.0.1', 'token')
+    client.protocol = 'http'
+    client.set_port(port)
+    client.set_timeout(120)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    first = None
+    count = 0
+    if mode == 'full':
+        for result in client.show_policies().json()['results']:
+            if first is None:
+                first = time.perf_counter() - start
+            count += 1
+    elif mode == 'full-json_loads':
+        for result in fgt_api.json_loads(client.show_policies().content)['results']:
+            if first is None:
+                first = time.perf_counter() - start
+            count += 1
+    else:
+        for result in client.api_get(client.cmdb_policy, stream=True):
+            if first is None:
+                first = time.perf_counter() - start
+            count += 1
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'mode': mode, 'objects': count, 'seconds': elapsed,
+                      'first_object_seconds': first,
+                      'objects_per_second': count / elapsed,
+                      'peak_rss_delta_kb': peak_rss - base_rss}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--policies', type=int, default=100000)
+    parser.add_argument('--mode')
+    parser.add_argument('--port', type=int)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.port)
+        return
+
+    server = fgt_mock.fgt_mock_server(addresses=1000, policies=args.policies).start()
+    print('policies: %d' % args.policies)
+    for mode in ['full', 'full-json_loads', 'stream']:
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                          '--mode', mode,
+                                          '--port', str(server.port)])
+        stats = json.loads(output.decode().strip().splitlines()[-1])
+        print('%-16s %8.0f obj/s  first object %7.3f s  peak RSS +%7.1f MB' %
+              (mode, stats['objects_per_second'], stats['first_object_seconds'],
+               stats['peak_rss_delta_kb'] / 1024.0))
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
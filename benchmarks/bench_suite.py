@@ -0,0 +1,266 @@
+#!/usr/local/bin/python3
+
+# file: bench_suite.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# reproducible performance benchmarks for fgt_api.py against the fgt_mock.py server
+
+# notes:
+# the mock server runs in its own process, so it does not compete with the client
+#   for the GIL or pollute the client's memory measurements
+# scenarios:
+#   latency      per-call latency (mean/p50/p95/p99) of show_addresses, get_address,
+#                add_address, search_policy and move_policy
+#   throughput   sustained get_address and show_addresses calls per second
+#   concurrency  get_address calls per second from 1..N threads sharing one client
+#   memory       peak Python memory of reading the address table as one response,
+#                with the paged iterator and with the streaming decoder
+#   models       memory held by the address and policy tables kept as dicts and as
+#                fgt_record objects, before and after their fields are decoded
+# results are written as JSON; --compare prints the change against an earlier run
+# usage: python3 benchmarks/bench_suite.py --output new.json [--compare old.json]
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+repo_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, repo_dir)
+import fgt_api
+
+
+# start fgt_mock.py in a child process and return (process, port)
+def start_mock(args):
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(repo_dir, 'fgt_mock.py'),
+         '--port', str(port), '--addresses', str(args.addresses),
+         '--policies', str(args.policies), '--latency', str(args.latency)],
+        stdout=subprocess.PIPE)
+    process.stdout.readline()
+    return process, port
+
+
+# build a client pointed at the mock server
+def mock_client(port, pool_size=10):
+    client = fgt_api.fgt_api_token('bench', '127.0.0.1', 'token')
+    client.protocol = 'http'
+    client.set_port(port)
+    client.set_timeout(60)
+    client.set_pool(pool_size)
+    return client
+
+
+# latency summary in milliseconds
+def summarize(samples):
+    samples = sorted(samples)
+    def pct(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+    return {'calls': len(samples), 'mean_ms': statistics.mean(samples) * 1000,
+            'p50_ms': pct(0.50), 'p95_ms': pct(0.95), 'p99_ms': pct(0.99)}
+
+
+# time "calls" runs of a function
+def time_calls(func, calls):
+    samples = []
+    for index in range(calls):
+        start = time.perf_counter()
+        func(index)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_latency(port, args):
+    client = mock_client(port)
+    calls = args.calls
+    results = {}
+    results['show_addresses'] = time_calls(lambda i: client.show_addresses().content,
+                                           max(3, calls // 50))
+    results['get_address'] = time_calls(
+        lambda i: client.get_address('net-' + str(1 + i % (args.addresses - 1))), calls)
+    results['add_address'] = time_calls(
+        lambda i: client.add_address({'name': 'bench-%d-%d' % (os.getpid(), i),
+                                      'subnet': '192.0.2.1 255.255.255.255'}), calls)
+    results['search_policy'] = time_calls(
+        lambda i: client.search_policy({'srcintf==port1': None}), max(3, calls // 10))
+    results['move_policy'] = time_calls(
+        lambda i: client.move_policy(1 + i % args.policies,
+                                     1 + (i + 7) % args.policies, 'after'),
+        calls)
+    return results
+
+
+def bench_throughput(port, args):
+    client = mock_client(port)
+    results = {}
+    for name, func in (('get_address', lambda: client.get_address('net-1')),
+                       ('show_addresses', lambda: client.show_addresses().content)):
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            func()
+            count += 1
+        elapsed = time.perf_counter() - start
+        results[name] = {'calls': count, 'seconds': elapsed,
+                         'calls_per_second': count / elapsed}
+    return results
+
+
+def bench_concurrency(port, args):
+    results = {}
+    for threads in args.threads:
+        client = mock_client(port, pool_size=threads)
+        per_thread = max(1, args.calls // threads)
+
+        def worker():
+            for index in range(per_thread):
+                client.get_address('net-1')
+
+        workers = [threading.Thread(target=worker) for index in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        results[str(threads)] = {'calls': per_thread * threads, 'seconds': elapsed,
+                                 'calls_per_second': per_thread * threads / elapsed}
+        client.close()
+    return results
+
+
+def bench_memory(port, args):
+    client = mock_client(port)
+    results = {}
+    modes = (('full_response', lambda: len(client.show_addresses().json()['results'])),
+             ('paged_iterator', lambda: sum(1 for obj in client.iter_addresses())),
+             ('stream_decode',
+              lambda: sum(1 for obj in client.api_get(client.cmdb_addr, stream=True))))
+    for name, func in modes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        objects = func()
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {'objects': objects, 'seconds': elapsed,
+                         'peak_mb': peak / 1e6}
+    return results
+
+
+# memory held by a list of objects, measured while tracemalloc is running
+def held(objects, start, elapsed):
+    current = tracemalloc.get_traced_memory()[0]
+    return {'objects': len(objects), 'seconds': elapsed, 'retained_mb': current / 1e6,
+            'bytes_per_object': current / max(1, len(objects))}
+
+
+def bench_models(port, args):
+    client = mock_client(port)
+    results = {}
+    for table, api_url, record_class in (
+            ('address', client.cmdb_addr, fgt_api.fgt_address_record),
+            ('policy', client.cmdb_policy, fgt_api.fgt_policy_record)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        objects = [obj for page in client.iter_pages(api_url) for obj in page]
+        results[table + '.dicts'] = held(objects, start, time.perf_counter() - start)
+        tracemalloc.stop()
+        del objects
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        records = list(client.iter_records(api_url, record_class))
+        results[table + '.records'] = held(records, start, time.perf_counter() - start)
+        # decode every record in place
+        start = time.perf_counter()
+        for record in records:
+            record.key
+        results[table + '.records_decoded'] = held(records, start,
+                                                   time.perf_counter() - start)
+        tracemalloc.stop()
+        del records
+    return results
+
+
+# flatten nested result dicts into {'a.b.c': number}
+def flatten(data, prefix=''):
+    flat = {}
+    for key, value in data.items():
+        if type(value) is dict:
+            flat.update(flatten(value, prefix + key + '.'))
+        elif type(value) in (int, float):
+            flat[prefix + key] = value
+    return flat
+
+
+# print the relative change of every metric against an earlier results file
+def compare(old, new):
+    old_flat = flatten(old['results'])
+    new_flat = flatten(new['results'])
+    for key in sorted(new_flat):
+        if key in old_flat and old_flat[key]:
+            change = (new_flat[key] - old_flat[key]) / old_flat[key] * 100
+            print('%-50s %12.3f %12.3f %+8.1f%%' % (key, old_flat[key], new_flat[key],
+                                                   change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='fgt_api benchmark suite')
+    parser.add_argument('--addresses', type=int, default=10000)
+    parser.add_argument('--policies', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='mock server delay per request in seconds')
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=3.0,
+                        help='seconds per throughput scenario')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--scenarios', nargs='+',
+                        default=['latency', 'throughput', 'concurrency', 'memory',
+                                 'models'])
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+
+    scenarios = {'latency': bench_latency, 'throughput': bench_throughput,
+                 'concurrency': bench_concurrency, 'memory': bench_memory,
+                 'models': bench_models}
+    report = {'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'addresses': args.addresses, 'policies': args.policies,
+                       'latency': args.latency, 'calls': args.calls},
+              'results': {}}
+    for name in args.scenarios:
+        # fresh server per scenario, so writes from one do not affect the next
+        process, port = start_mock(args)
+        try:
+            print('running ' + name)
+            report['results'][name] = scenarios[name](port, args)
+        finally:
+            process.terminate()
+            process.wait()
+
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(json.dumps(report['results'], indent=2))
+    if args.compare:
+        with open(args.compare) as old_file:
+            compare(json.load(old_file), report)
+
+
+if __name__ == '__main__':
+    main()
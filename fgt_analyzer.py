@@ -0,0 +1,548 @@
+#!/usr/local/bin/python3
+
+# file: fgt_analyzer.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# offline analysis of FortiGate firewall policies: shadowed, redundant and
+#   conflicting rules
+
+# notes:
+# fgt_api_token.analyze_policies() reads the policies and objects and returns an
+#   fgt_policy_analyzer
+# address and service objects are reduced to sorted integer intervals, see
+#   merge_intervals() and the functions after it
+# numpy is required by fgt_policy_analyzer only
+
+import bisect
+import time
+
+from fgt_api import (addr_interval, fgt_api_error, fgt_lazy_module, module_available,
+                     ref_names)
+
+# numpy is only required by fgt_policy_analyzer
+numpy = fgt_lazy_module('numpy', namespace=globals())
+
+
+# merge (start, end) intervals into a sorted list of disjoint, non-adjacent intervals
+# created: 2026-10-18
+# last modified: 2026-10-18
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+# return the parts of [0, maximum] not covered by merged intervals
+# created: 2026-10-18
+# last modified: 2026-10-18
+def complement_intervals(intervals, maximum):
+    result = []
+    next_start = 0
+    for start, end in intervals:
+        if start > next_start:
+            result.append((next_start, start - 1))
+        next_start = end + 1
+    if next_start <= maximum:
+        result.append((next_start, maximum))
+    return result
+
+
+# return True if merged intervals "outer" cover every interval in "inner"
+# created: 2026-10-18
+# last modified: 2026-10-18
+def intervals_cover(outer, inner):
+    starts = [start for start, end in outer]
+    for start, end in inner:
+        pos = bisect.bisect_right(starts, start) - 1
+        if pos < 0 or outer[pos][1] < end:
+            return False
+    return True
+
+
+# return True if two lists of merged intervals share any value
+# created: 2026-10-18
+# last modified: 2026-10-18
+def intervals_intersect(first, second):
+    i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i][1] < second[j][0]:
+            i += 1
+        elif second[j][1] < first[i][0]:
+            j += 1
+        else:
+            return True
+    return False
+
+
+# largest encoded service value; services are encoded as protocol << 16 | port
+service_max = (255 << 16) | 0xffff
+service_protocols = {'tcp-portrange': 6, 'udp-portrange': 17, 'sctp-portrange': 132}
+
+
+# return encoded (start, end) service intervals for a custom service, or None if the
+#   service matches on something other than protocol and destination port (ICMP
+#   type, source port, destination address) and cannot be compared as intervals
+# created: 2026-10-18
+# last modified: 2026-10-18
+def service_intervals(service):
+    try:
+        if service.get('iprange', '0.0.0.0') not in ('', '0.0.0.0') or service.get('fqdn'):
+            return None
+        protocol = service.get('protocol', 'TCP/UDP/SCTP')
+        if protocol == 'IP':
+            number = int(service.get('protocol-number', 0))
+            if number == 0:
+                return [(0, service_max)]
+            return [(number << 16, (number << 16) | 0xffff)]
+        if protocol in ('ICMP', 'ICMP6'):
+            if service.get('icmptype') not in (None, ''):
+                return None
+            number = 1 if protocol == 'ICMP' else 58
+            return [(number << 16, (number << 16) | 0xffff)]
+        intervals = []
+        for field, number in service_protocols.items():
+            for port_range in (service.get(field) or '').split():
+                dst, __, src = port_range.partition(':')
+                if src and src not in ('0-65535', '1-65535'):
+                    return None
+                low, __, high = dst.partition('-')
+                intervals.append(((number << 16) | int(low),
+                                  (number << 16) | int(high or low)))
+        return intervals
+    except Exception:
+        return None
+
+
+# return the parts of merged intervals "first" not covered by merged "second"
+# created: 2026-10-18
+# last modified: 2026-10-18
+def subtract_intervals(first, second):
+    result = []
+    for start, end in first:
+        for cut_start, cut_end in second:
+            if cut_end < start or cut_start > end:
+                continue
+            if cut_start > start:
+                result.append((start, cut_start - 1))
+            start = cut_end + 1
+            if start > end:
+                break
+        if start <= end:
+            result.append((start, end))
+    return result
+
+
+# fgt_object_resolver
+# resolve address and service names (including nested groups) to merged integer
+#   ranges: IPv4 addresses for address objects, protocol << 16 | port for services
+# refresh() bulk-loads the address, addrgrp, service custom and service group
+#   tables with the paged iterators, so resolving any number of policies costs a
+#   few requests; it checks the config revision first and reloads (dropping every
+#   cached expansion) only when the configuration has changed
+# expansions are memoized per name, so a group shared by many policies or nested
+#   in many groups is expanded once
+# a group that contains itself, directly or through other groups, resolves to None
+#   and its member path is recorded in "cycles"
+# names that cannot be expressed as ranges (FQDN or geography addresses, ICMP
+#   type services, missing objects, ...) resolve to None and are recorded in
+#   "unresolved" as name -> 'address' or 'service'
+# "client" may be None when the tables are given with set_tables()
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_object_resolver:
+    def __init__(self, client=None):
+        self.client = client
+        self.revision = None
+        self.set_tables()
+
+    # replace the object tables; each argument is an iterable of cmdb objects
+    # if "services" is None, only the ALL service is known
+    def set_tables(self, addresses=(), addrgrps=(), services=None, servicegrps=()):
+        self.objects = {'address': {obj['name']: obj for obj in addresses},
+                        'service': {obj['name']: obj for obj in services or ()}}
+        self.groups = {'address': {obj['name']: obj for obj in addrgrps},
+                       'service': {obj['name']: obj for obj in servicegrps}}
+        self.services_loaded = services is not None
+        self.memo = {'address': {}, 'service': {}}
+        self.unresolved = {}
+        self.cycles = []
+        self.hits = 0
+        self.misses = 0
+
+    # read one table, or return None if the FortiGate does not have it
+    def load_table(self, path, page_options):
+        try:
+            return list(self.client.iter_cmdb(path, **page_options))
+        except fgt_api_error:
+            return None
+
+    # load the tables from the FortiGate if the config revision has changed
+    # returns True if the tables were (re)loaded
+    # raises fgt_api_error if the address table cannot be read
+    # keyword arguments are passed to fgt_api_token.iter_pages()
+    def refresh(self, force=False, **page_options):
+        revision = self.client.config_revision(options=page_options.get('options'))
+        if not force and revision is not None and revision == self.revision:
+            return False
+        addresses = list(self.client.iter_addresses(**page_options))
+        self.set_tables(addresses,
+                        self.load_table('firewall/addrgrp/', page_options) or (),
+                        self.load_table('firewall.service/custom/', page_options),
+                        self.load_table('firewall.service/group/', page_options) or ())
+        self.revision = revision
+        return True
+
+    # ranges of a single (non-group) object
+    def leaf_ranges(self, kind, name):
+        obj = self.objects[kind].get(name)
+        if kind == 'address':
+            if name == 'all':
+                return [(0, 0xffffffff)]
+            interval = addr_interval(obj) if obj is not None else None
+            return [interval] if interval is not None else None
+        if obj is None:
+            if name == 'ALL' and not self.services_loaded:
+                return [(0, service_max)]
+            return None
+        ranges = service_intervals(obj)
+        return merge_intervals(ranges) if ranges is not None else None
+
+    # resolve a name of "kind" ('address' or 'service'), expanding groups
+    # "path" is the chain of groups being expanded, for cycle detection
+    def expand(self, kind, name, path):
+        memo = self.memo[kind]
+        if name in memo:
+            self.hits += 1
+            return memo[name]
+        if name in path:
+            self.cycles.append(tuple(path[path.index(name):]) + (name,))
+            return None
+        self.misses += 1
+        group = self.groups[kind].get(name)
+        if group is None:
+            ranges = self.leaf_ranges(kind, name)
+            if ranges is None:
+                self.unresolved[name] = kind
+        else:
+            path.append(name)
+            ranges = self.expand_members(kind, group.get('member', []), path)
+            if (ranges is not None and group.get('exclude') == 'enable'):
+                excluded = self.expand_members(kind, group.get('exclude-member', []),
+                                               path)
+                if excluded is None:
+                    ranges = None
+                else:
+                    ranges = subtract_intervals(ranges, excluded)
+            path.pop()
+        memo[name] = ranges
+        return ranges
+
+    # merged ranges of a list of member references, or None if any is unresolved
+    def expand_members(self, kind, members, path):
+        ranges = []
+        for member in ref_names(members):
+            member_ranges = self.expand(kind, member, path)
+            if member_ranges is None:
+                return None
+            ranges.extend(member_ranges)
+        return merge_intervals(ranges)
+
+    # merged IPv4 ranges of an address or address group, or None
+    def address_ranges(self, name):
+        return self.expand('address', name, [])
+
+    # merged service ranges of a custom service or service group, or None
+    def service_ranges(self, name):
+        return self.expand('service', name, [])
+
+    # merged ranges of a policy field ('srcaddr', 'dstaddr' or 'service'), with
+    #   <field>-negate applied, or None if any referenced object is unresolved
+    def policy_ranges(self, policy, field):
+        kind = 'service' if field == 'service' else 'address'
+        ranges = self.expand_members(kind, policy.get(field, []), [])
+        if ranges is not None and policy.get(field + '-negate') == 'enable':
+            maximum = service_max if kind == 'service' else 0xffffffff
+            ranges = complement_intervals(ranges, maximum)
+        return ranges
+
+    # cache counters
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'addresses': len(self.memo['address']),
+                'services': len(self.memo['service']),
+                'unresolved': len(self.unresolved), 'cycles': len(self.cycles)}
+
+
+# fgt_policy_finding
+# one result of an fgt_policy_analyzer check
+# "kind" is 'shadowed' (an earlier policy with a different action matches all of
+#   this policy's traffic), 'redundant' (same, but the earlier policy has the same
+#   action) or 'overlap' (the policies match some of the same traffic and have
+#   different actions)
+# "policyid" is the later policy, "by_policyid" the earlier one
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_policy_finding:
+    def __init__(self, kind, policyid, by_policyid):
+        self.kind = kind
+        self.policyid = policyid
+        self.by_policyid = by_policyid
+
+    def __repr__(self):
+        return ('fgt_policy_finding(kind=%r, policyid=%r, by_policyid=%r)' %
+                (self.kind, self.policyid, self.by_policyid))
+
+
+# fgt_policy_analyzer
+# find shadowed, redundant and overlapping IPv4 firewall policies
+# "policies" are policy dicts in evaluation order; "addresses" are address objects
+#   (cmdb firewall/address); "services" are custom services (cmdb
+#   firewall.service/custom), or None to only understand the ALL service
+# "resolver" is an fgt_object_resolver to use instead of "addresses"/"services";
+#   with one, address and service groups are expanded too
+# each enabled policy is compiled to integer intervals for srcaddr, dstaddr and
+#   service plus interface bitmasks, held in numpy arrays; a block of policies is
+#   compared against every earlier policy at once on the two most selective
+#   fields, the surviving pairs are filtered on the other fields with array
+#   indexing, and only pairs with multi-interval sides are checked in Python
+# objects that cannot be expressed as intervals (FQDN and geography addresses,
+#   ICMP type services, groups without a resolver, etc.) are listed in
+#   "unresolved"; the analysis is conservative around them: a policy using one is
+#   never reported as covered unless the earlier policy matches everything in that
+#   field
+# users, groups, non-"always" schedules and internet services narrow a policy, so
+#   such a policy only covers later policies with the same restrictions
+# requires numpy
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_policy_analyzer:
+    dimensions = (('srcaddr', 0xffffffff), ('dstaddr', 0xffffffff),
+                  ('service', service_max))
+    restriction_fields = ('users', 'groups', 'fsso-groups', 'internet-service-name',
+                          'internet-service-id', 'internet-service-src-name',
+                          'internet-service-src-id')
+
+    def __init__(self, policies, addresses=(), services=None, block_size=256,
+                 resolver=None):
+        if not module_available('numpy'):
+            raise ImportError('fgt_policy_analyzer requires the numpy module')
+        if resolver is None:
+            resolver = fgt_object_resolver()
+            resolver.set_tables(addresses, services=services)
+        self.resolver = resolver
+        self.unresolved = resolver.unresolved
+        self.block_size = block_size
+        self.analyze_time = None
+        self.compile(policies)
+
+    # compile enabled policies into interval and bitmask arrays
+    # per field, each policy gets the bounds of its intervals in three forms:
+    #   outer (as the earlier policy of a cover test), inner (as the later policy)
+    #   and overlap; unresolved and empty fields get bounds that make the array
+    #   tests exact for them, so no extra masks are needed
+    def compile(self, policies):
+        start = time.perf_counter()
+        self.policies = [policy for policy in policies
+                         if policy.get('status', 'enable') != 'disable']
+        count = len(self.policies)
+        self.policyids = [policy['policyid'] for policy in self.policies]
+        self.actions = numpy.array([policy.get('action') == 'accept'
+                                    for policy in self.policies], dtype=bool)
+        self.intervals = {}
+        self.bounds = {}
+        self.simple = {}
+        for dimension, maximum in self.dimensions:
+            merged_list = []
+            bounds = numpy.zeros((6, count), dtype=numpy.uint32)
+            simple = numpy.ones(count, dtype=bool)
+            for index, policy in enumerate(self.policies):
+                intervals = self.resolver.policy_ranges(policy, dimension)
+                merged_list.append(intervals)
+                if intervals is None:
+                    # covers nothing but empty fields, covered only by full fields
+                    bounds[:, index] = (maximum, 0, 0, maximum, 0, maximum)
+                elif intervals:
+                    low = intervals[0][0]
+                    high = intervals[-1][1]
+                    bounds[:, index] = (low, high, low, high, low, high)
+                    simple[index] = len(intervals) == 1
+                else:
+                    # matches nothing; left to the exact check
+                    bounds[:, index] = (maximum, 0, maximum, 0, maximum, 0)
+                    simple[index] = False
+            self.intervals[dimension] = merged_list
+            self.bounds[dimension] = bounds
+            self.simple[dimension] = simple
+        # fields where fewest policies match everything are tested first
+        self.order = sorted((dimension for dimension, maximum in self.dimensions),
+                            key=lambda dimension: int(numpy.count_nonzero(
+                                self.bounds[dimension][0] == 0)))
+        # interfaces as bitmasks split into 64-bit words
+        self.interfaces = {}
+        self.any_interface = {}
+        for dimension in ('srcintf', 'dstintf'):
+            names = [set(ref_names(policy.get(dimension, [])))
+                     for policy in self.policies]
+            bit = {}
+            for name_set in names:
+                for name in name_set:
+                    bit.setdefault(name, len(bit))
+            words = numpy.zeros((count, max(1, (len(bit) + 63) // 64)),
+                                dtype=numpy.uint64)
+            any_interface = numpy.zeros(count, dtype=bool)
+            for index, name_set in enumerate(names):
+                any_interface[index] = 'any' in name_set
+                for name in name_set:
+                    position = bit[name]
+                    words[index, position // 64] |= numpy.uint64(1 << (position % 64))
+            self.interfaces[dimension] = words
+            self.any_interface[dimension] = any_interface
+        # restrictions; 0 means unrestricted
+        restriction_ids = {(): 0}
+        self.restriction = numpy.zeros(count, dtype=numpy.int64)
+        for index, policy in enumerate(self.policies):
+            key = self.restrictions(policy)
+            self.restriction[index] = restriction_ids.setdefault(key,
+                                                                 len(restriction_ids))
+        self.compile_time = time.perf_counter() - start
+
+    # fields that narrow a policy beyond interfaces, addresses and services
+    def restrictions(self, policy):
+        key = []
+        if policy.get('schedule', 'always') != 'always':
+            key.append(('schedule', policy['schedule']))
+        for field in self.restriction_fields:
+            value = policy.get(field)
+            if value:
+                key.append((field, tuple(sorted(ref_names(value))) or str(value)))
+        return tuple(key)
+
+    # array index pairs (later, earlier) that pass "test" on the first two fields,
+    #   for one block of later policies against every earlier policy
+    def candidates(self, start, end, test):
+        matrix = None
+        for dimension in self.order[:2]:
+            bounds = self.bounds[dimension]
+            result = test(bounds[:, :end], bounds[:, start:end])
+            matrix = result if matrix is None else matrix & result
+        # only earlier policies; the last columns are the block itself
+        matrix[:, start:end] &= numpy.tri(end - start, k=-1, dtype=bool)
+        # nonzero() is slow on a mostly empty matrix, so find the rows first
+        rows = numpy.flatnonzero(matrix.any(axis=1))
+        later, earlier = numpy.nonzero(matrix[rows])
+        return rows[later] + start, earlier
+
+    # earlier outer bounds contain later inner bounds
+    @staticmethod
+    def cover_test(earlier, later):
+        return ((earlier[0][None, :] <= later[2][:, None]) &
+                (earlier[1][None, :] >= later[3][:, None]))
+
+    # earlier and later overlap bounds intersect
+    @staticmethod
+    def overlap_test(earlier, later):
+        return ((earlier[4][None, :] <= later[5][:, None]) &
+                (later[4][:, None] <= earlier[5][None, :]))
+
+    # keep the pairs where the earlier policy may cover the later one in every field
+    def filter_cover(self, later, earlier):
+        keep = ((self.restriction[earlier] == 0) |
+                (self.restriction[earlier] == self.restriction[later]))
+        for dimension in self.order[2:]:
+            bounds = self.bounds[dimension]
+            keep &= ((bounds[0][earlier] <= bounds[2][later]) &
+                     (bounds[1][earlier] >= bounds[3][later]))
+        for dimension, words in self.interfaces.items():
+            any_interface = self.any_interface[dimension]
+            missing = (words[later] & ~words[earlier]).any(axis=1)
+            keep &= any_interface[earlier] | (~any_interface[later] & ~missing)
+        return later[keep], earlier[keep]
+
+    # keep the pairs that may overlap in every field
+    def filter_overlap(self, later, earlier):
+        keep = numpy.ones(len(later), dtype=bool)
+        for dimension in self.order[2:]:
+            bounds = self.bounds[dimension]
+            keep &= ((bounds[4][earlier] <= bounds[5][later]) &
+                     (bounds[4][later] <= bounds[5][earlier]))
+        for dimension, words in self.interfaces.items():
+            any_interface = self.any_interface[dimension]
+            shared = (words[later] & words[earlier]).any(axis=1)
+            keep &= any_interface[earlier] | any_interface[later] | shared
+        return later[keep], earlier[keep]
+
+    # exact interval check of one pair where a side has several intervals
+    # "cover" selects the cover test; otherwise the overlap test, where unresolved
+    #   fields may always overlap
+    def exact(self, later, earlier, cover):
+        for dimension, maximum in self.dimensions:
+            if self.simple[dimension][earlier] and self.simple[dimension][later]:
+                continue
+            outer = self.intervals[dimension][earlier]
+            inner = self.intervals[dimension][later]
+            if not cover:
+                match = (outer is None or inner is None or
+                         intervals_intersect(outer, inner))
+            elif inner is None:
+                match = outer == [(0, maximum)]
+            elif outer is None:
+                match = not inner
+            else:
+                match = intervals_cover(outer, inner)
+            if not match:
+                return False
+        return True
+
+    # return fgt_policy_finding objects for policies that can never match because
+    #   an earlier policy matches all of their traffic; only the first such earlier
+    #   policy is reported
+    def shadowed(self):
+        start_time = time.perf_counter()
+        findings = []
+        count = len(self.policies)
+        for start in range(0, count, self.block_size):
+            end = min(count, start + self.block_size)
+            later, earlier = self.filter_cover(
+                *self.candidates(start, end, self.cover_test))
+            found = set()
+            for index, by_index in zip(later.tolist(), earlier.tolist()):
+                if index in found:
+                    continue
+                if self.exact(index, by_index, True):
+                    found.add(index)
+                    if self.actions[index] == self.actions[by_index]:
+                        kind = 'redundant'
+                    else:
+                        kind = 'shadowed'
+                    findings.append(fgt_policy_finding(kind, self.policyids[index],
+                                                       self.policyids[by_index]))
+        self.analyze_time = time.perf_counter() - start_time
+        return findings
+
+    # return fgt_policy_finding objects for pairs of policies that match some of the
+    #   same traffic; if "conflicts_only" is True, only pairs with different actions
+    # stops after "limit" findings if given
+    def overlaps(self, conflicts_only=True, limit=None):
+        findings = []
+        count = len(self.policies)
+        for start in range(0, count, self.block_size):
+            end = min(count, start + self.block_size)
+            later, earlier = self.candidates(start, end, self.overlap_test)
+            if conflicts_only:
+                keep = self.actions[later] != self.actions[earlier]
+                later, earlier = later[keep], earlier[keep]
+            later, earlier = self.filter_overlap(later, earlier)
+            for index, by_index in zip(later.tolist(), earlier.tolist()):
+                if self.exact(index, by_index, False):
+                    findings.append(fgt_policy_finding('overlap', self.policyids[index],
+                                                       self.policyids[by_index]))
+                    if limit is not None and len(findings) >= limit:
+                        return findings
+        return findings
@@ -3,7 +3,7 @@
 # file: fgt_api.py
 # author: jason mueller
 # created: 2018-12-26
-# last modified: 2019-03-11
+# last modified: 2026-10-18
 
 # purpose:
 # FortiGate API module for use with token-based authentication
@@ -27,14 +27,1292 @@
 
 # python version: 3.7.2
 
-import requests
-import urllib3
+import array
+import bisect
+import codecs
+import collections
+import concurrent.futures
+import datetime
+import heapq
+import importlib
+import ipaddress
+import json
+import mmap
+import os
+import queue
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import urllib.parse
+import warnings
+
+
+# fgt_lazy_module
+# stand-in for a module that is imported on first attribute access
+# the module-level name is then rebound to the real module, so later lookups cost
+#   nothing extra; used for the HTTP stack and other dependencies that take
+#   longer to import than a short script takes to run
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_lazy_module:
+    def __init__(self, name, global_name=None, namespace=None):
+        self.lazy_name = name
+        self.lazy_global = global_name or name
+        # globals() of the module the name is rebound in, this module by default
+        self.lazy_namespace = globals() if namespace is None else namespace
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.lazy_name)
+        self.lazy_namespace[self.lazy_global] = module
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return '<lazy module %r>' % self.lazy_name
+
+
+# return True if a module can be imported (importing it if needed)
+# created: 2026-10-18
+# last modified: 2026-10-18
+def module_available(name):
+    if sys.modules.get(name) is not None:
+        return True
+    try:
+        importlib.import_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+# HTTP stack, imported on first request
+requests = fgt_lazy_module('requests')
+urllib3 = fgt_lazy_module('urllib3')
+asyncio = fgt_lazy_module('asyncio')
+# stdlib transport (fgt_http_transport)
+http_client = fgt_lazy_module('http.client', 'http_client')
+ssl = fgt_lazy_module('ssl')
+select = fgt_lazy_module('select')
+zlib = fgt_lazy_module('zlib')
+
+# optional modules, imported on first use
+# aiohttp is only required by fgt_api_async
+aiohttp = fgt_lazy_module('aiohttp')
+
+# modules split out of this one, imported on first use
+# policy analysis (analyze_policies)
+fgt_analyzer = fgt_lazy_module('fgt_analyzer')
+# address import pipeline (import_addresses)
+fgt_import = fgt_lazy_module('fgt_import')
+
+# orjson is an optional C-accelerated decoder used for whole-response decoding
+#   and for encoding result records; the stdlib json module is used when it is
+#   missing
+try:
+    import orjson
+    json_loads = orjson.loads
+
+    # orjson output keeps its 1 KB working buffer; copy it so small records stay small
+    def json_dumps(obj):
+        return memoryview(orjson.dumps(obj)).tobytes()
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+
+# fgt_session_pool
+# keep-alive HTTP(S) connection pool that can be owned by one fgt_api_token object
+#   or shared by several objects that point at the same FortiGate
+# connections (and their TLS sessions) are reused between requests, so only the
+#   first request to a host pays for the TCP and TLS handshakes
+# "pool_size" is the max number of idle connections kept per host
+# "idle_timeout" is the number of seconds a pool may sit unused before its
+#   connections are dropped and rebuilt on next use; 0 or None disables the check
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_session_pool:
+    def __init__(self, pool_size=10, idle_timeout=60):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.last_used = 0
+        self.session = None
+
+    # build a new requests session with a pooled adapter for http and https
+    def new_session(self):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1,
+                                                pool_maxsize=self.pool_size,
+                                                pool_block=False)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    # return the pooled session, rebuilding it if it has been idle too long
+    def get_session(self):
+        with self.lock:
+            now = time.monotonic()
+            if (self.session is not None and self.idle_timeout and
+                now - self.last_used > self.idle_timeout):
+                self.session.close()
+                self.session = None
+            if self.session is None:
+                self.session = self.new_session()
+            self.last_used = now
+            return self.session
+
+    # close all pooled connections; pool will reconnect on next use
+    def close(self):
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+
+# registry of shared connection pools keyed by (protocol, host, port)
+shared_pools = {}
+shared_pools_lock = threading.Lock()
+
+
+# get (or create) the shared connection pool for a protocol/host/port
+# pool_size and idle_timeout only apply when the pool is first created
+# created: 2026-10-18
+# last modified: 2026-10-18
+def get_shared_pool(protocol, host, port, pool_size=10, idle_timeout=60):
+    pool_key = (protocol, host, str(port))
+    with shared_pools_lock:
+        if pool_key not in shared_pools:
+            shared_pools[pool_key] = fgt_session_pool(pool_size, idle_timeout)
+        return shared_pools[pool_key]
+
+
+# close and forget every shared connection pool
+# created: 2026-10-18
+# last modified: 2026-10-18
+def close_shared_pools():
+    with shared_pools_lock:
+        for pool in shared_pools.values():
+            pool.close()
+        shared_pools.clear()
+
+
+# fgt_connect_error
+# raised by fgt_http_transport when a connection cannot be opened, i.e. the request
+#   never reached the FortiGate
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_connect_error(ConnectionError):
+    pass
+
+
+# True if an exception was caused by a failed TLS certificate verification,
+#   directly or wrapped by requests/urllib3 (arguments, "reason", cause, context)
+# created: 2026-10-18
+# last modified: 2026-10-18
+def cert_verify_error(error):
+    if 'ssl' not in sys.modules:
+        return False
+    pending = [error]
+    seen = 0
+    while pending and seen < 16:
+        error = pending.pop()
+        seen += 1
+        if isinstance(error, ssl.SSLCertVerificationError):
+            return True
+        pending.extend(cause for cause in ((error.__cause__, error.__context__,
+                                            getattr(error, 'reason', None)) +
+                                           tuple(error.args))
+                       if isinstance(cause, BaseException))
+    return False
+
+
+# fgt_retry_policy
+# retry settings for fgt_api_token requests
+# "retries" is the max number of retries after the first attempt
+# the delay before retry n is a random value between 0 and
+#   min(max_backoff, backoff * 2 ** n) seconds (exponential backoff, full jitter);
+#   a Retry-After header on a 429/503 response is honored instead, up to max_backoff
+# responses with a status in "statuses" are retried, as are connection errors and
+#   timeouts, but only for methods in "methods" (idempotent by default); other
+#   methods are retried only when the request never reached the FortiGate
+#   (connect timeout) or was refused with 429/503
+# TLS certificate verification failures are never retried
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_retry_policy:
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30, statuses=(429, 503),
+                 methods=('GET', 'PUT', 'DELETE')):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+        self.methods = methods
+
+    # True if a response (or exception) for a method may be retried
+    def retryable(self, method, response, error):
+        if error is not None:
+            # a certificate that failed verification will fail again
+            if cert_verify_error(error):
+                return False
+            if isinstance(error, fgt_connect_error):
+                return True
+            # requests errors, checked only if the requests transport is loaded
+            if 'requests' in sys.modules:
+                if isinstance(error, requests.exceptions.ConnectTimeout):
+                    return True
+                if isinstance(error, requests.exceptions.RequestException):
+                    return method in self.methods and isinstance(
+                        error, (requests.exceptions.ConnectionError,
+                                requests.exceptions.Timeout))
+            # aiohttp errors (fgt_api_async), checked only if aiohttp is loaded
+            if 'aiohttp' in sys.modules:
+                if isinstance(error, aiohttp.ClientConnectorError):
+                    return True
+                if isinstance(error, aiohttp.ClientError):
+                    return method in self.methods
+            # fgt_http_transport errors, and asyncio timeouts
+            return method in self.methods and isinstance(
+                error, (OSError, http_client.HTTPException))
+        if response.status_code in (429, 503):
+            return response.status_code in self.statuses
+        return method in self.methods and response.status_code in self.statuses
+
+    # seconds to wait before retry number "attempt" (0-based)
+    def delay(self, attempt, response=None):
+        if response is not None:
+            try:
+                return min(self.max_backoff,
+                           float(response.headers['Retry-After']))
+            except Exception:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+# fgt_rate_limiter
+# thread-safe token bucket; "rate" is requests per second, "burst" the bucket size
+# one limiter can be used by one device or shared by a whole fleet
+# "rate" must be positive (ValueError otherwise); no limiter means no limit
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_rate_limiter:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        if not self.rate > 0:
+            raise ValueError('rate must be positive, not %r' % rate)
+        if burst is None:
+            burst = max(1.0, self.rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # reserve one token; returns the seconds to wait before using it
+    # the token is reserved under the lock and the caller waits outside it, so
+    #   waiting callers are served in arrival order (fgt_api_async awaits the wait)
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    # take one token, sleeping until it is available; returns seconds waited
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+# escape a Prometheus label value
+# created: 2026-10-18
+# last modified: 2026-10-18
+def prom_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# format a Prometheus label set from (name, value) pairs
+# created: 2026-10-18
+# last modified: 2026-10-18
+def prom_labels(pairs):
+    return '{' + ','.join('%s="%s"' % (name, prom_label(value))
+                          for name, value in pairs) + '}'
+
+
+# fgt_metrics
+# per-endpoint request metrics for one or more fgt_api_token objects
+# every series is labeled by device name, vdom, endpoint (cmdb table or monitor
+#   path, without object names) and HTTP method
+# latency histograms are kept per phase:
+#   total     whole call, including retries and rate-limit waits
+#   server    request sent to response headers parsed (includes connect and TLS
+#             setup when a new connection was needed; requests does not expose
+#             those separately)
+#   transfer  reading the response body (not recorded for streamed responses);
+#             timed on the last attempt only
+#   wait      rate-limit waits, retry backoff and earlier failed attempts
+# share one object between clients with fgt_api_token.set_metrics(metrics)
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_metrics:
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    label_names = ('device', 'vdom', 'endpoint', 'method')
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(buckets or self.default_buckets)
+        self.lock = threading.Lock()
+        # label tuple + (status,) -> count
+        self.requests = collections.Counter()
+        # label tuple + (error class,) -> count
+        self.errors = collections.Counter()
+        # label tuple -> count
+        self.bytes_out = collections.Counter()
+        self.bytes_in = collections.Counter()
+        self.retries = collections.Counter()
+        self.throttled = collections.Counter()
+        # label tuple + (phase,) -> [bucket counts..., sum, count]
+        self.histograms = {}
+
+    # add one observation to a histogram (caller holds the lock)
+    # bucket counts are cumulative, as in the exposition format
+    def observe(self, key, seconds):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                histogram[index] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+    # record one completed call
+    # "attempt" is the time of the last attempt, if known; the rest of "elapsed" is
+    #   recorded as the wait phase
+    # "sent" is the size of the request body in bytes (see json_body_size())
+    def record(self, device, vdom, endpoint, method, response, error, elapsed,
+               stream=False, attempt=None, sent=0):
+        labels = (device, vdom, endpoint, method)
+        if attempt is None:
+            attempt = elapsed
+        with self.lock:
+            self.observe(labels + ('total',), elapsed)
+            self.observe(labels + ('wait',), max(0.0, elapsed - attempt))
+            if response is None:
+                self.requests[labels + ('none',)] += 1
+                self.errors[labels + (type(error).__name__ if error else 'none',)] += 1
+                return
+            self.requests[labels + (str(response.status_code),)] += 1
+            if response.status_code >= 400:
+                self.errors[labels + ('http_' + str(response.status_code),)] += 1
+            # transports other than requests may not time the server separately
+            server = getattr(response, 'elapsed', None)
+            server = attempt if server is None else server.total_seconds()
+            self.observe(labels + ('server',), server)
+            if not stream:
+                self.observe(labels + ('transfer',), max(0.0, attempt - server))
+                self.bytes_in[labels] += len(response.content)
+            else:
+                try:
+                    self.bytes_in[labels] += int(response.headers['Content-Length'])
+                except Exception:
+                    pass
+            if sent:
+                self.bytes_out[labels] += sent
+            self.retries[labels] += getattr(response, 'retries', 0)
+            self.throttled[labels] += getattr(response, 'throttled', 0)
+
+    # return all metrics in the Prometheus text exposition format
+    def exposition(self):
+        lines = []
+        with self.lock:
+            lines.append('# HELP fgt_api_requests_total API calls by final status.')
+            lines.append('# TYPE fgt_api_requests_total counter')
+            for key, count in sorted(self.requests.items()):
+                lines.append('fgt_api_requests_total%s %d' % (prom_labels(
+                    zip(self.label_names + ('status',), key)), count))
+            lines.append('# HELP fgt_api_errors_total Failed API calls by error class.')
+            lines.append('# TYPE fgt_api_errors_total counter')
+            for key, count in sorted(self.errors.items()):
+                lines.append('fgt_api_errors_total%s %d' % (prom_labels(
+                    zip(self.label_names + ('error',), key)), count))
+            for name, help_text, counter in (
+                    ('fgt_api_request_bytes_total', 'Request body bytes sent.',
+                     self.bytes_out),
+                    ('fgt_api_response_bytes_total', 'Response body bytes received.',
+                     self.bytes_in),
+                    ('fgt_api_retries_total', 'Retried attempts.', self.retries),
+                    ('fgt_api_throttled_total', 'Requests delayed by rate limits.',
+                     self.throttled)):
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s counter' % name)
+                for key, count in sorted(counter.items()):
+                    lines.append('%s%s %d' % (name, prom_labels(
+                        zip(self.label_names, key)), count))
+            name = 'fgt_api_request_duration_seconds'
+            lines.append('# HELP %s API call latency by phase.' % name)
+            lines.append('# TYPE %s histogram' % name)
+            for key, histogram in sorted(self.histograms.items()):
+                pairs = list(zip(self.label_names + ('phase',), key))
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append('%s_bucket%s %d' % (
+                        name, prom_labels(pairs + [('le', repr(bound))]), count))
+                lines.append('%s_bucket%s %d' % (
+                    name, prom_labels(pairs + [('le', '+Inf')]), histogram[-1]))
+                lines.append('%s_sum%s %r' % (name, prom_labels(pairs), histogram[-2]))
+                lines.append('%s_count%s %d' % (name, prom_labels(pairs),
+                                                 histogram[-1]))
+        return '\n'.join(lines) + '\n'
+
+
+# size in bytes of a JSON request body as requests and aiohttp encode it
+# created: 2026-10-18
+# last modified: 2026-10-18
+def json_body_size(json_data):
+    if json_data is None:
+        return 0
+    return len(json.dumps(json_data).encode('utf-8'))
+
+
+# fgt_api_error
+# raised by helpers that cannot return a partial result (e.g. paged iterators)
+# "response" is the failed response object, or None if no response was received
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_api_error(Exception):
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+# return the "results" list from a cmdb response, raising fgt_api_error on failure
+# a single-object response is returned as a one-item list
+# created: 2026-10-18
+# last modified: 2026-10-18
+def page_results(response):
+    if response is None:
+        raise fgt_api_error('no response from FortiGate')
+    if response.status_code != 200:
+        raise fgt_api_error('HTTP status ' + str(response.status_code), response)
+    try:
+        results = json_loads(response.content)['results']
+    except Exception:
+        raise fgt_api_error('response has no results', response)
+    if type(results) is not list:
+        results = [results]
+    return results
+
+
+# return the config revision reported in a FortiOS response, or None
+# a multi-VDOM response reports the revision of its first VDOM
+# created: 2026-10-18
+# last modified: 2026-10-18
+def response_revision(response):
+    try:
+        data = json_loads(response.content)
+        if type(data) is list:
+            data = data[0]
+        return data.get('revision')
+    except Exception:
+        return None
+
+
+# fgt_response_cache
+# LRU cache of successful GET responses, keyed on URL plus URL parameters and the
+#   Authorization header, so a cache shared by objects with different tokens
+#   never serves one token's data to another
+# "max_entries" is the max number of cached responses (least recently used go first)
+# "ttl" is the number of seconds a response is served without asking the FortiGate
+# if "revalidate" is True, an expired response that carries a config "revision" is
+#   checked with a one-object request for the same URL; if the revision has not
+#   changed, the cached response is kept and its ttl restarts
+# entries for a cmdb table are dropped by invalidate() when it is written to,
+#   before and after the write; a response to a GET sent before an invalidate()
+#   is not stored, so data read while a write was in flight is never cached
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_response_cache:
+    def __init__(self, max_entries=256, ttl=60, revalidate=True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.revalidate = revalidate
+        # key -> [response, revision, stored_at]
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        # incremented by invalidate() and clear(); see put()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.invalidated = 0
+        self.evicted = 0
+
+    # build a cache key from a URL, its URL parameters and the Authorization header
+    def key(self, api_url, params, headers=None):
+        return (api_url,
+                tuple(sorted((str(name), str(value)) for name, value in params.items())),
+                (headers or {}).get('Authorization'))
+
+    # return the entry for a key (most recently used), or None
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    # True if an entry is within its ttl
+    def fresh(self, entry):
+        return time.monotonic() - entry[2] < self.ttl
+
+    # store a response, evicting the least recently used entries over max_entries
+    # "generation" is the value of self.generation when the request was sent; the
+    #   response is not stored if anything was invalidated since then
+    def put(self, key, response, revision, generation=None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = [response, revision, time.monotonic()]
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evicted += 1
+
+    # restart the ttl of an entry whose revision was confirmed
+    def touch(self, entry):
+        with self.lock:
+            entry[2] = time.monotonic()
+            self.revalidated += 1
+
+    # count a hit or a miss
+    def count(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # drop every entry whose URL starts with url_prefix
+    def invalidate(self, url_prefix):
+        with self.lock:
+            self.generation += 1
+            for key in [key for key in self.entries if key[0].startswith(url_prefix)]:
+                del self.entries[key]
+                self.invalidated += 1
+
+    # drop every entry
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.invalidated += len(self.entries)
+            self.entries.clear()
+
+    # return cache counters as a dict
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits,
+                    'misses': self.misses, 'revalidated': self.revalidated,
+                    'invalidated': self.invalidated, 'evicted': self.evicted}
+
+
+# fgt_single_flight
+# collapse identical GET requests that are in flight at the same time into one
+# the first caller for a key sends the request; callers arriving before it
+#   finishes wait for it and get the same response object (or exception)
+# keys are the URL plus every URL parameter (vdom, filter, format, ...) and header,
+#   so requests that could return different data are never merged
+# one object can be shared by several fgt_api_token objects; thread callers and
+#   asyncio callers (fgt_api_async) are tracked separately, asyncio callers per
+#   event loop
+# a write to a cmdb table drops that table's keys (invalidate()), so a GET made
+#   after the write never joins one that was sent before it
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_single_flight:
+    def __init__(self):
+        # key -> concurrent.futures.Future (threads)
+        self.calls = {}
+        # event loop -> {key -> asyncio task}
+        self.async_calls = {}
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.saved = 0
+
+    # build a key from a URL, URL parameters and headers
+    def key(self, api_url, params, headers):
+        return (api_url,
+                tuple(sorted((str(name), str(value)) for name, value in params.items())),
+                tuple(sorted((str(name), str(value)) for name, value in headers.items())))
+
+    # return send() for the key, sending it only if no identical call is in flight
+    def call(self, key, send):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = concurrent.futures.Future()
+                self.sent += 1
+            else:
+                self.saved += 1
+        if not leader:
+            return future.result()
+        try:
+            result = send()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                if self.calls.get(key) is future:
+                    del self.calls[key]
+
+    # coroutine counterpart of call(); "send" returns a coroutine
+    # the request runs as its own task in the caller's event loop, so a cancelled
+    #   caller does not cancel it for the others, and callers in another loop
+    #   never await it
+    async def call_async(self, key, send):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            tasks = self.async_calls.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                self.sent += 1
+                task = tasks[key] = loop.create_task(send())
+                task.add_done_callback(
+                    lambda done: self.async_done(loop, key, done))
+            else:
+                self.saved += 1
+        return await asyncio.shield(task)
+
+    # forget a finished asyncio task (done callback)
+    def async_done(self, loop, key, task):
+        with self.lock:
+            tasks = self.async_calls.get(loop)
+            if tasks is not None and tasks.get(key) is task:
+                del tasks[key]
+                if not tasks:
+                    del self.async_calls[loop]
+
+    # drop the keys of every call whose URL starts with url_prefix; calls still
+    #   running finish for their callers, but later callers send a new request
+    def invalidate(self, url_prefix):
+        with self.lock:
+            for calls in [self.calls] + list(self.async_calls.values()):
+                for key in [key for key in calls if key[0].startswith(url_prefix)]:
+                    del calls[key]
+            for loop in [loop for loop, tasks in self.async_calls.items() if not tasks]:
+                del self.async_calls[loop]
+
+    # return counters as a dict: requests sent and requests saved by coalescing
+    def stats(self):
+        with self.lock:
+            return {'sent': self.sent, 'saved': self.saved,
+                    'in_flight': len(self.calls) + sum(
+                        len(tasks) for tasks in self.async_calls.values())}
+
+
+# fgt_bulk_result
+# outcome of one item of a bulk operation
+# "index" is the item's position in the input, "key" its name (or other id)
+# "response" is the response object (None if no response was received)
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_bulk_result:
+    def __init__(self, index, key, response, error, elapsed):
+        self.index = index
+        self.key = key
+        self.response = response
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def status_code(self):
+        if self.response is not None:
+            return self.response.status_code
+
+    @property
+    def ok(self):
+        return self.response is not None and self.response.status_code == 200
+
+    def __repr__(self):
+        return ('fgt_bulk_result(key=%r, status_code=%r, elapsed=%.3f)' %
+                (self.key, self.status_code, self.elapsed))
+
+
+# fgt_bulk_report
+# per-item results of a bulk operation, in input order
+# "transaction" is None (not requested), 'committed', 'aborted' or 'unsupported'
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_bulk_report:
+    def __init__(self):
+        self.results = []
+        self.transaction = None
+
+    @property
+    def succeeded(self):
+        return sum(1 for result in self.results if result.ok)
+
+    @property
+    def failed(self):
+        return len(self.results) - self.succeeded
+
+    # results that did not succeed
+    def failures(self):
+        return [result for result in self.results if not result.ok]
+
+
+# fgt_vdom_result
+# outcome of reading one VDOM in a multi-VDOM query
+# "count" is the number of results received, "error" the exception (usually
+#   fgt_api_error) that ended the read, or None
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_vdom_result:
+    def __init__(self, vdom):
+        self.vdom = vdom
+        self.count = 0
+        self.error = None
+        self.elapsed = 0.0
+
+    @property
+    def status_code(self):
+        response = getattr(self.error, 'response', None)
+        if response is not None:
+            return response.status_code
+        if self.error is None:
+            return 200
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return ('fgt_vdom_result(vdom=%r, count=%d, error=%r, elapsed=%.3f)' %
+                (self.vdom, self.count, self.error, self.elapsed))
+
+
+# fgt_vdom_report
+# per-VDOM results of a multi-VDOM query, in the order the VDOMs were requested
+# "mode" is 'parallel' (one paged read per VDOM) or 'split' (one request, split)
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_vdom_report:
+    def __init__(self):
+        self.results = {}
+        self.mode = None
+
+    # return the result for a VDOM, creating it if needed
+    def vdom(self, vdom):
+        if vdom not in self.results:
+            self.results[vdom] = fgt_vdom_result(vdom)
+        return self.results[vdom]
+
+    @property
+    def succeeded(self):
+        return sum(1 for result in self.results.values() if result.ok)
+
+    @property
+    def failed(self):
+        return len(self.results) - self.succeeded
+
+    # VDOM results that did not succeed
+    def failures(self):
+        return [result for result in self.results.values() if not result.ok]
+
+
+# json_results_parser
+# incremental parser that yields the items of the "results" array of a FortiOS
+#   response while the body is still being read
+# "chunks" is an iterable of bytes (e.g. response.iter_content())
+# only one result (plus the unread part of the current chunk) is held in memory;
+#   each result is decoded with the stdlib decoder, whose scanner is implemented in C
+# a multi-VDOM response (a list of response objects) yields the results of every VDOM
+# meant for cmdb table reads; a "results" value that is not a list (e.g. some
+#   monitor endpoints) yields nothing, use a normal api_get() for those
+# created: 2026-10-18
+# last modified: 2026-10-18
+class json_results_parser:
+    whitespace = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, chunks, key='results'):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    # append the next chunk to the unread part of the buffer
+    def fill(self):
+        for chunk in self.chunks:
+            text = self.text_decoder.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(b'', True)
+        self.pos = 0
+        self.eof = True
+
+    # return the next non-whitespace character without consuming it (None at end)
+    def peek(self):
+        while True:
+            self.pos = self.whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return None
+            self.fill()
+
+    # consume an expected structural character
+    def expect(self, chars):
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError('expected %r at offset %d' % (chars, self.pos))
+        self.pos += 1
+        return char
+
+    # decode the next complete JSON value
+    # a number that ends at the end of the buffer, or is followed by more number
+    #   characters, may be truncated, so a value is only accepted once the
+    #   character after it (or the end of the body) has been seen
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+                if ((end < len(self.buffer) and
+                     self.buffer[end] not in '0123456789.eE+-') or self.eof):
+                    self.pos = end
+                    return obj
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    # yield the results of one response object
+    def object_results(self):
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            name = self.value()
+            self.expect(':')
+            if name == self.key and self.peek() == '[':
+                self.pos += 1
+                if self.peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield self.value()
+                        if self.expect(',]') == ']':
+                            break
+            else:
+                self.value()
+            if self.expect(',}') == '}':
+                return
+
+    # yield every result in the response
+    def __iter__(self):
+        if self.peek() == '[':
+            self.pos += 1
+            if self.peek() == ']':
+                return
+            while True:
+                yield from self.object_results()
+                if self.expect(',]') == ']':
+                    return
+        else:
+            yield from self.object_results()
+
+
+# yield result dicts from a streamed response, then release the connection
+# raises fgt_api_error on HTTP errors, malformed JSON or a body that cannot be read
+#   (whatever the transport raises: requests, http.client, socket or zlib errors)
+# created: 2026-10-18
+# last modified: 2026-10-18
+def stream_results(response, chunk_size=65536):
+    try:
+        if response.status_code != 200:
+            raise fgt_api_error('HTTP status ' + str(response.status_code), response)
+        try:
+            yield from json_results_parser(response.iter_content(chunk_size))
+        except ValueError as e:
+            raise fgt_api_error('invalid JSON in response: ' + str(e), response)
+        except Exception as e:
+            raise fgt_api_error('response body not received: ' + str(e), response)
+    finally:
+        response.close()
+
+
+# fgt_record
+# compact, read-only model of one cmdb object
+# a record holds the object as compact JSON bytes and decodes it on the first
+#   attribute access into __slots__ attributes, so objects that are only counted,
+#   filtered by key or passed along cost a bytes object each instead of a dict
+# "fields" maps API field names to attribute names ('start-ip' -> start_ip);
+#   fields missing from the object (e.g. not in a "format" projection) are None,
+#   and fields not in "fields" are kept in "extra"
+# reference lists ([{'name': ...}, ...]) in "ref_fields" become tuples of names;
+#   q_origin_key (a copy of the key) is dropped
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_record:
+    __slots__ = ('raw', 'extra')
+    fields = ()
+    decoders = ()
+    attributes = {}
+    key_field = 'name'
+    ref_fields = frozenset()
+    # fields with few distinct values, interned so decoded records share them
+    interned_fields = frozenset()
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    # (field, attribute, 'ref'/'intern'/None) for decode(), built once per class
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.decoders = tuple((field, attribute,
+                              'ref' if field in cls.ref_fields else
+                              'intern' if field in cls.interned_fields else None)
+                             for field, attribute in cls.fields)
+        cls.attributes = dict(cls.fields)
+
+    # build a record from a decoded object dict
+    @classmethod
+    def from_object(cls, obj):
+        return cls(json_dumps(obj))
+
+    # decode the JSON into the slot attributes
+    def decode(self):
+        obj = json_loads(self.raw)
+        obj.pop('q_origin_key', None)
+        pop = obj.pop
+        for field, attribute, kind in self.decoders:
+            value = pop(field, None)
+            if kind is not None and value is not None:
+                if kind == 'ref':
+                    value = tuple(sys.intern(str(ref['name'])) if type(ref) is dict
+                                  else ref for ref in value)
+                elif type(value) is str:
+                    value = sys.intern(value)
+            setattr(self, attribute, value)
+        self.extra = obj or None
+        self.raw = None
+
+    # only called for attributes that are not set yet, i.e. before decode()
+    def __getattr__(self, attribute):
+        if attribute != 'raw' and self.raw is not None:
+            self.decode()
+            return getattr(self, attribute)
+        raise AttributeError(attribute)
+
+    @property
+    def decoded(self):
+        return self.raw is None
+
+    # the key field's value (name or policyid)
+    @property
+    def key(self):
+        return self.get(self.key_field)
+
+    # get a field by API name, including fields kept in "extra"
+    def get(self, field, default=None):
+        attribute = self.attributes.get(field)
+        if attribute is not None:
+            value = getattr(self, attribute)
+            return default if value is None else value
+        if self.raw is not None:
+            self.decode()
+        return (self.extra or {}).get(field, default)
+
+    # the object as a dict with API field names; reference lists are returned as
+    #   lists of {'name': ...} dicts, as the API expects them
+    def to_dict(self):
+        if self.raw is not None:
+            return json_loads(self.raw)
+        obj = dict(self.extra or {})
+        for field, attribute in self.fields:
+            value = getattr(self, attribute)
+            if value is None:
+                continue
+            if field in self.ref_fields:
+                value = [{'name': name} for name in value]
+            obj[field] = value
+        return obj
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.key)
+
+
+# fgt_address_record
+# firewall/address object
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_address_record(fgt_record):
+    fields = (('name', 'name'), ('uuid', 'uuid'), ('type', 'type'),
+              ('subnet', 'subnet'), ('start-ip', 'start_ip'), ('end-ip', 'end_ip'),
+              ('fqdn', 'fqdn'), ('country', 'country'), ('wildcard', 'wildcard'),
+              ('associated-interface', 'associated_interface'), ('color', 'color'),
+              ('comment', 'comment'))
+    __slots__ = tuple(attribute for field, attribute in fields)
+    interned_fields = frozenset(('type', 'associated-interface'))
+
+
+# fgt_policy_record
+# firewall/policy object
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_policy_record(fgt_record):
+    fields = (('policyid', 'policyid'), ('name', 'name'), ('uuid', 'uuid'),
+              ('status', 'status'), ('action', 'action'), ('srcintf', 'srcintf'),
+              ('dstintf', 'dstintf'), ('srcaddr', 'srcaddr'), ('dstaddr', 'dstaddr'),
+              ('service', 'service'), ('schedule', 'schedule'), ('users', 'users'),
+              ('groups', 'groups'), ('nat', 'nat'), ('logtraffic', 'logtraffic'),
+              ('comments', 'comments'))
+    __slots__ = tuple(attribute for field, attribute in fields)
+    key_field = 'policyid'
+    ref_fields = frozenset(('srcintf', 'dstintf', 'srcaddr', 'dstaddr', 'service',
+                            'users', 'groups'))
+    interned_fields = frozenset(('status', 'action', 'schedule', 'nat', 'logtraffic'))
+
+
+# fgt_result_set
+# records and metadata of one cmdb response, decoded on first use
+# the response body is decoded once; every result becomes a "record_class" record
+#   and the body and response content are released
+# "status", "http_status", "revision", "vdom", "serial", "version" and "build"
+#   come from the response envelope (the first one for multi-VDOM responses)
+# raises fgt_api_error if the response is not a JSON response with status 200
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_result_set:
+    meta_fields = ('status', 'http_status', 'revision', 'vdom', 'path', 'name',
+                   'serial', 'version', 'build')
+
+    def __init__(self, response, record_class=fgt_record):
+        self.response = response
+        self.record_class = record_class
+        self.status_code = None if response is None else response.status_code
+        self.meta = None
+        self.records = None
+        self.positions = None
+
+    # decode the response body into records
+    def load(self):
+        if self.records is not None:
+            return
+        response = self.response
+        if response is None or response.status_code != 200:
+            raise fgt_api_error('HTTP status ' + str(self.status_code), response)
+        try:
+            body = json_loads(response.content)
+        except ValueError as e:
+            raise fgt_api_error('invalid JSON in response: ' + str(e), response)
+        envelopes = body if type(body) is list else [body]
+        self.meta = {field: envelopes[0].get(field) for field in self.meta_fields
+                     if envelopes and field in envelopes[0]}
+        record_class = self.record_class
+        self.records = [record_class(json_dumps(obj)) for envelope in envelopes
+                        for obj in envelope.get('results', ())]
+        self.response = None
+
+    def __len__(self):
+        self.load()
+        return len(self.records)
+
+    def __iter__(self):
+        self.load()
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        self.load()
+        return self.records[index]
+
+    # get a record by key (name, policyid), or "default"
+    # the key index decodes every record once, on the first call
+    def get(self, key, default=None):
+        self.load()
+        if self.positions is None:
+            self.positions = {record.key: position
+                              for position, record in enumerate(self.records)}
+        position = self.positions.get(key)
+        if position is None:
+            return default
+        return self.records[position]
+
+    # one envelope field, e.g. 'revision'
+    def meta_value(self, field):
+        self.load()
+        return self.meta.get(field)
+
+    @property
+    def status(self):
+        return self.meta_value('status')
+
+    @property
+    def http_status(self):
+        return self.meta_value('http_status')
+
+    @property
+    def revision(self):
+        return self.meta_value('revision')
+
+    @property
+    def vdom(self):
+        return self.meta_value('vdom')
+
+    @property
+    def serial(self):
+        return self.meta_value('serial')
+
+    @property
+    def version(self):
+        return self.meta_value('version')
+
+    @property
+    def build(self):
+        return self.meta_value('build')
+
+
+# fgt_options
+# immutable URL parameters and headers for a single API call
+# pass to any task method as "options"; the client's url_params/http_headers are
+#   copied for that call and the options applied to the copy, so nothing shared is
+#   changed and one client can be used from many threads at once
+# None leaves the client's own setting in place
+# "vdom" data type is string or list of VDOM names; "use_global" True queries all VDOMs
+# "filter" data type is dict in set_filter() format {FILTER:OPERATOR}, a filter
+#   string, or a list of filter strings that must all match
+# "format" data type is list of attributes
+# "start"/"count" data type is integer; "skip"/"with_meta" data type is boolean
+# "params"/"headers" data type is dict; a value of None removes that parameter/header
+# use merge() to derive new options, e.g. base.merge(vdom='dmz')
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_options:
+    __slots__ = ('vdom', 'use_global', 'filter', 'format', 'start', 'count', 'skip',
+                 'with_meta', 'params', 'headers')
+
+    def __init__(self, vdom=None, use_global=None, filter=None, format=None,
+                 start=None, count=None, skip=None, with_meta=None, params=None,
+                 headers=None):
+        if type(vdom) is list:
+            vdom = ','.join(vdom)
+        if type(filter) is dict:
+            filter = self.filter_groups(filter)
+        elif type(filter) is str:
+            filter = (filter,)
+        elif filter is not None:
+            filter = tuple(filter)
+        if format is not None and type(format) is not str:
+            format = '|'.join(str(property) for property in format)
+        if params is not None:
+            params = tuple(dict(params).items())
+        if headers is not None:
+            headers = tuple(dict(headers).items())
+        for name, value in zip(self.__slots__,
+                               (vdom, use_global, filter, format, start, count, skip,
+                                with_meta, params, headers)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('fgt_options objects are immutable; use merge()')
+
+    def __delattr__(self, name):
+        raise AttributeError('fgt_options objects are immutable; use merge()')
+
+    def __repr__(self):
+        return ('fgt_options(' +
+                ', '.join('%s=%r' % (name, value) for name, value in self.items()) + ')')
+
+    # stored values are valid constructor arguments, so objects pickle (e.g. for
+    #   fgt_fleet process pools) by calling the constructor again
+    def __reduce__(self):
+        return (fgt_options, tuple(getattr(self, name) for name in self.__slots__))
+
+    # convert a set_filter() dict to a tuple of filter parameter values
+    # the first term starts a group whatever its operator; after that, "or" terms
+    #   join the previous group with ',', "and" terms start a new group and terms
+    #   with any other operator (e.g. None) are dropped, as set_filter() does
+    # each group is sent as its own "filter" parameter (filter=a,b&filter=c), the
+    #   form FortiOS documents; set_filter() uses the same groups
+    @staticmethod
+    def filter_groups(filters):
+        groups = []
+        for filter, operator in filters.items():
+            if not groups:
+                groups.append(str(filter))
+            elif operator == 'or':
+                groups[-1] = groups[-1] + ',' + str(filter)
+            elif operator == 'and':
+                groups.append(str(filter))
+        return tuple(groups)
+
+    # return new options with some values replaced
+    # arguments are the same as for the constructor
+    def merge(self, **changes):
+        values = dict(self.items())
+        values.update(changes)
+        return fgt_options(**values)
+
+    # yield (name, value) for every value that is set
+    def items(self):
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                yield name, value
+
+    # apply the options to copies of URL parameters and headers
+    # returns (params, headers)
+    def apply(self, url_params, http_headers):
+        params = dict(url_params)
+        headers = dict(http_headers)
+        if self.vdom is not None:
+            params['vdom'] = self.vdom
+            params.pop('global', None)
+        if self.use_global:
+            params['global'] = 1
+            params.pop('vdom', None)
+        if self.filter is not None:
+            params['filter'] = list(self.filter)
+            params.pop('key', None)
+            params.pop('pattern', None)
+        if self.format is not None:
+            params['format'] = self.format
+        if self.start is not None:
+            params['start'] = self.start
+        if self.count is not None:
+            params['count'] = self.count
+        for name, value in (('skip', self.skip), ('with_meta', self.with_meta)):
+            if value:
+                params[name] = 1
+            elif value is not None:
+                params.pop(name, None)
+        for target, values in ((params, self.params), (headers, self.headers)):
+            for name, value in values or ():
+                if value is None:
+                    target.pop(name, None)
+                else:
+                    target[name] = value
+        return params, headers
 
 
 # fgt_api_token
 # class designed for making API queries against FortiOS using token-based authentication
 # created: 2018-12-26
-# last modified: 2018-02-01
+# last modified: 2026-10-18
 class fgt_api_token:
     def __init__(self, name, host, token):
         self.name = name
@@ -49,6 +1327,35 @@ class fgt_api_token:
         self.cert_verify = False
         self.timeout = 3
 
+        # keep-alive connection pool, created on first request
+        # use set_pool() to size it or share_pool() to share it with other objects
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.pool_size = 10
+        self.idle_timeout = 60
+
+        # optional GET response cache, see set_cache()
+        self.cache = None
+        # optional coalescing of identical concurrent GETs, see set_coalesce()
+        self.single_flight = None
+        # optional transport replacing the connection pool, see set_transport()
+        self.transport = None
+
+        # optional retry policy and rate limiters, see set_retry()/set_rate_limit()
+        self.retry_policy = None
+        self.rate_limiters = []
+        # transport counters, see transport_stats()
+        self.stats_lock = threading.Lock()
+        self.call_count = 0
+        self.retry_count = 0
+        self.throttle_count = 0
+        self.throttle_wait = 0.0
+
+        # optional instrumentation, see set_metrics() and add_*_hook()
+        self.metrics = None
+        self.pre_hooks = []
+        self.post_hooks = []
+
         # set default parameters/headers for HTTP request
         self.url_params = {'vdom': self.vdom}
         # set token in HTTP header, so URL can be displayed without showing token
@@ -163,13 +1470,205 @@ class fgt_api_token:
             pass
 
     # set HTTP response timeout
-    # "timeout" data type is integer
+    # "timeout" data type is integer or float (seconds), or a (connect, read) tuple
     def set_timeout(self, timeout):
         try:
-            if type(timeout) is int:
+            if type(timeout) in (int, float) and timeout > 0:
+                self.timeout = timeout
+            elif type(timeout) is tuple and len(timeout) == 2:
                 self.timeout = timeout
         except:
             pass
+
+    # set retry policy for API requests (see fgt_retry_policy)
+    # "policy" may be an existing fgt_retry_policy; otherwise one is built from the
+    #   other arguments; retries=0 disables retrying
+    def set_retry(self, retries=3, backoff=0.5, max_backoff=30, policy=None):
+        try:
+            if isinstance(policy, fgt_retry_policy):
+                self.retry_policy = policy
+            elif type(retries) is int and retries > 0:
+                self.retry_policy = fgt_retry_policy(retries, backoff, max_backoff)
+            else:
+                self.retry_policy = None
+        except:
+            pass
+
+    # add a token-bucket rate limit for this object's requests
+    # "rate" is requests per second; "limiter" may be an existing fgt_rate_limiter,
+    #   e.g. one shared by every device of a fleet; limits add up, so a device can
+    #   have its own limit and share a fleet-wide one
+    def set_rate_limit(self, rate=None, burst=None, limiter=None):
+        try:
+            if isinstance(limiter, fgt_rate_limiter):
+                self.rate_limiters.append(limiter)
+            elif rate is not None and rate > 0:
+                self.rate_limiters.append(fgt_rate_limiter(rate, burst))
+        except:
+            pass
+
+    # remove all rate limits from this object
+    def unset_rate_limit(self):
+        self.rate_limiters = []
+
+    # record per-endpoint metrics for this object's requests (see fgt_metrics)
+    # "metrics" may be an existing fgt_metrics shared with other objects
+    def set_metrics(self, metrics=None):
+        if metrics is None:
+            metrics = fgt_metrics()
+        if isinstance(metrics, fgt_metrics):
+            self.metrics = metrics
+        return self.metrics
+
+    # stop recording metrics
+    def unset_metrics(self):
+        self.metrics = None
+
+    # add a callback run before every request
+    # called as hook(client, method, api_url, params, headers); params and headers
+    #   are copies of the dicts about to be sent and may be changed by the hook,
+    #   for that request only
+    # exceptions raised by hooks are reported as warnings and otherwise ignored
+    def add_pre_hook(self, hook):
+        if callable(hook):
+            self.pre_hooks.append(hook)
+
+    # add a callback run after every request
+    # called as hook(client, method, api_url, response, error, elapsed); response is
+    #   None and error the last exception if no response was received
+    def add_post_hook(self, hook):
+        if callable(hook):
+            self.post_hooks.append(hook)
+
+    # remove all pre- and post-request hooks
+    def clear_hooks(self):
+        self.pre_hooks = []
+        self.post_hooks = []
+
+    # return the metrics endpoint label for an API URL
+    # cmdb URLs are reduced to their table (cmdb/firewall/address), so object names
+    #   do not create new series; monitor URLs keep their path
+    def endpoint_label(self, api_url):
+        path = api_url.split('/api/v2/', 1)[-1].strip('/')
+        if path.startswith('cmdb/'):
+            return '/'.join(path.split('/')[:3])
+        return path
+
+    # return transport counters: calls, retries, throttled requests and seconds spent
+    #   waiting for the rate limiters
+    def transport_stats(self):
+        with self.stats_lock:
+            return {'calls': self.call_count, 'retries': self.retry_count,
+                    'throttled': self.throttle_count,
+                    'throttle_wait': self.throttle_wait}
+
+    # set connection pool size and idle timeout for this object
+    # "pool_size" data type is integer; "idle_timeout" data type is integer (seconds)
+    # replaces the current pool, so call before making requests or after close()
+    def set_pool(self, pool_size=10, idle_timeout=60):
+        try:
+            if type(pool_size) is int and pool_size > 0 and type(idle_timeout) is int:
+                self.pool_size = pool_size
+                self.idle_timeout = idle_timeout
+                self.pool = fgt_session_pool(pool_size, idle_timeout)
+        except:
+            pass
+
+    # share one connection pool among all objects pointing at the same host/port
+    # "pool" may be an existing fgt_session_pool; if None, the module registry is used
+    # if you change protocol or port, call share_pool() again after that call
+    def share_pool(self, pool=None):
+        try:
+            if pool is None:
+                pool = get_shared_pool(self.protocol, self.host, self.port,
+                                       self.pool_size, self.idle_timeout)
+            if isinstance(pool, fgt_session_pool):
+                self.pool = pool
+        except:
+            pass
+
+    # return the pooled session used for API requests, creating the pool if needed
+    # the pool is created under a lock, so concurrent first requests share one pool
+    def get_session(self):
+        pool = self.pool
+        if pool is None:
+            with self.pool_lock:
+                if self.pool is None:
+                    self.pool = fgt_session_pool(self.pool_size, self.idle_timeout)
+                pool = self.pool
+        return pool.get_session()
+
+    # enable the GET response cache (see fgt_response_cache)
+    # "cache" may be an existing fgt_response_cache to share it with other objects
+    # writes through api_post/api_put/api_delete drop the cached entries of the cmdb
+    #   table they touch (e.g. add_address drops cached firewall/address/ reads)
+    def set_cache(self, max_entries=256, ttl=60, revalidate=True, cache=None):
+        try:
+            if isinstance(cache, fgt_response_cache):
+                self.cache = cache
+            elif type(max_entries) is int and max_entries > 0:
+                self.cache = fgt_response_cache(max_entries, ttl, revalidate)
+        except:
+            pass
+
+    # disable the GET response cache
+    def unset_cache(self):
+        self.cache = None
+
+    # return cache hit/miss counters, or None if caching is disabled
+    def cache_stats(self):
+        if self.cache is not None:
+            return self.cache.stats()
+
+    # enable coalescing of identical concurrent GET requests (see fgt_single_flight)
+    # "single_flight" may be an existing fgt_single_flight to share it with other
+    #   objects for the same FortiGate and token
+    # POST, PUT and DELETE requests are never coalesced
+    def set_coalesce(self, single_flight=None):
+        if isinstance(single_flight, fgt_single_flight):
+            self.single_flight = single_flight
+        else:
+            self.single_flight = fgt_single_flight()
+
+    # disable GET request coalescing
+    def unset_coalesce(self):
+        self.single_flight = None
+
+    # return coalescing counters, or None if coalescing is disabled
+    def coalesce_stats(self):
+        if self.single_flight is not None:
+            return self.single_flight.stats()
+
+    # send requests through a transport object instead of the connection pool
+    # a transport has request(client, method, api_url, params, headers, json_data,
+    #   stream) returning a requests.Response; see fgt_cassette_recorder and
+    #   fgt_cassette_replay in fgt_cassette.py
+    # retries, rate limits, caching, coalescing and metrics work as usual on top
+    def set_transport(self, transport):
+        if callable(getattr(transport, 'request', None)):
+            self.transport = transport
+
+    # send requests over the connection pool again
+    def unset_transport(self):
+        self.transport = None
+
+    # return the URL prefix of the cmdb table an API URL belongs to
+    # e.g. .../api/v2/cmdb/firewall/address/host1 -> .../api/v2/cmdb/firewall/address/
+    # non-cmdb URLs are returned unchanged
+    def cmdb_table(self, api_url):
+        if not api_url.startswith(self.cmdb_base):
+            return api_url
+        path = api_url[len(self.cmdb_base):].split('/')
+        return self.cmdb_base + '/'.join(path[:2]) + '/'
+
+    # close pooled connections held by this object
+    # note: closing a shared pool affects every object using it
+    def close(self):
+        try:
+            if self.pool is not None:
+                self.pool.close()
+        except:
+            pass
     
     # set with_meta in URL parameters to include meta data in in API response
     def set_metadata(self):
@@ -327,27 +1826,16 @@ class fgt_api_token:
     # "filter" data type is dict in format {FILTER:OPERATOR}
     # valid operators are "and" and "or"
     # setting a filter will unset the "key" and "pattern" URL parameters
+    # "or" terms are joined with ',' and every "and" term starts a new group; each
+    #   group is sent as its own "filter" parameter (see fgt_options.filter_groups())
     def set_filter(self, filters):
         try:
             if type(filters) is dict and len(filters.keys()) > 0:
-                lc = 0
-                for filter in filters.keys():
-                    try:
-                        if filters[filter] in ['or','and'] and lc > 0:
-                            if filters[filter] == 'or':
-                                filter_text = filter_text + ',filter=' + str(filter)
-                            else:
-                                filter_text = filter_text + '&filter=' + str(filter)
-                        elif lc == 0:
-                            filter_text = 'filter=' + str(filter) 
-                        lc += 1
-                    except:
-                        continue
-                self.url_params['filter'] = filter_text
-                if 'key' in url_params.keys():
-                    del url_params['key']
-                if 'pattern' in url_params.keys():
-                    del url_params['pattern']
+                self.url_params['filter'] = list(fgt_options.filter_groups(filters))
+                if 'key' in self.url_params.keys():
+                    del self.url_params['key']
+                if 'pattern' in self.url_params.keys():
+                    del self.url_params['pattern']
         except:
             pass
 
@@ -395,13 +1883,23 @@ class fgt_api_token:
         except:
             pass
 
+    # return (params, headers) for a single call
+    # with "options" (an fgt_options object), copies of url_params/http_headers with
+    #   the options applied; without, the shared url_params/http_headers themselves
+    def call_args(self, options=None):
+        if options is None:
+            return self.url_params, self.http_headers
+        return options.apply(self.url_params, self.http_headers)
+
     # disable TLS warnings if cert verify is off; else enable warnings
     # set per API request, since multiple FGTs in same script may have diff requirements
+    # only urllib3's InsecureRequestWarning is switched; the application's other
+    #   warning filters are left alone
     def set_url_warn(self, cert_verify):
         if not cert_verify:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         else:
-            warnings.resetwarnings()
+            warnings.simplefilter('default', urllib3.exceptions.InsecureRequestWarning)
 
             
     #####
@@ -409,67 +1907,226 @@ class fgt_api_token:
     # HTTP get, post, put, and delete
     #####
 
+    # send HTTP request to FGT API with explicit URL parameters and headers
+    # used by the api_* methods below and by callers that must not touch the
+    #   shared url_params/http_headers (e.g. background page prefetch)
+    # if "stream" is True, the body is left unread for the caller to consume
+    # GET requests go through the response cache when it is enabled; other methods
+    #   invalidate the cached entries of the table they write to
+    # identical GET requests already in flight are joined when coalescing is enabled;
+    #   other methods stop later GETs of the table from joining earlier ones
+    def api_request(self, method, api_url, params, headers, json_data=None,
+                    stream=False):
+        if method == 'GET' and not stream:
+            single_flight = self.single_flight
+            if single_flight is not None:
+                key = single_flight.key(api_url, params, headers)
+                return single_flight.call(
+                    key, lambda: self.get_request(api_url, params, headers))
+            return self.get_request(api_url, params, headers)
+        if method != 'GET' and (self.cache is not None or
+                                self.single_flight is not None):
+            # invalidated again once the write is done, in case a concurrent GET
+            #   cached or started a read of the table while it was in flight
+            table = self.cmdb_table(api_url)
+            self.invalidate_reads(table)
+            try:
+                return self.send_request(method, api_url, params, headers, json_data,
+                                         stream)
+            finally:
+                self.invalidate_reads(table)
+        return self.send_request(method, api_url, params, headers, json_data, stream)
+
+    # drop cached and in-flight reads of a cmdb table, around a write to it
+    def invalidate_reads(self, table):
+        if self.cache is not None:
+            self.cache.invalidate(table)
+        if self.single_flight is not None:
+            self.single_flight.invalidate(table)
+
+    # send a (non-streamed) GET request, through the response cache when enabled
+    def get_request(self, api_url, params, headers):
+        if self.cache is not None:
+            return self.cached_get(api_url, params, headers)
+        return self.send_request('GET', api_url, params, headers)
+
+    # send HTTP request to FGT API, bypassing the response cache
+    # requests wait for the rate limiters and are retried according to the retry
+    #   policy; the response gets "retries", "throttled" and "throttle_wait"
+    #   attributes for this call
+    # returns None if no response was received after the last attempt
+    def send_request(self, method, api_url, params, headers, json_data=None,
+                     stream=False):
+        instrumented = self.metrics is not None or self.pre_hooks or self.post_hooks
+        if instrumented:
+            if self.pre_hooks:
+                params, headers = self.run_pre_hooks(method, api_url, params, headers)
+            call_start = time.perf_counter()
+        policy = self.retry_policy
+        retries = 0
+        throttled = 0
+        throttle_wait = 0.0
+        while True:
+            for limiter in self.rate_limiters:
+                wait = limiter.acquire()
+                if wait > 0:
+                    throttled += 1
+                    throttle_wait += wait
+            response = None
+            error = None
+            attempt_start = time.perf_counter()
+            try:
+                if self.transport is not None:
+                    response = self.transport.request(self, method, api_url, params,
+                                                      headers, json_data, stream)
+                else:
+                    self.set_url_warn(self.cert_verify)
+                    session = self.get_session()
+                    response = session.request(method, api_url,
+                                               params = params,
+                                               headers = headers,
+                                               json = json_data,
+                                               verify = self.cert_verify,
+                                               timeout = self.timeout,
+                                               stream = stream)
+            except Exception as e:
+                error = e
+            if (policy is None or retries >= policy.retries or
+                not policy.retryable(method, response, error)):
+                break
+            delay = policy.delay(retries, response)
+            if response is not None:
+                response.close()
+            retries += 1
+            time.sleep(delay)
+        self.count_call(response, retries, throttled, throttle_wait)
+        if instrumented:
+            now = time.perf_counter()
+            self.finish_call(method, api_url, params, json_data, response, error,
+                             now - call_start, stream, now - attempt_start)
+        return response
+
+    # run the pre-request hooks on copies of params and headers; returns the copies
+    # hooks get (and the request sends) copies, so a hook cannot change the
+    #   object's own url_params/http_headers
+    def run_pre_hooks(self, method, api_url, params, headers):
+        params = dict(params)
+        headers = dict(headers)
+        for hook in self.pre_hooks:
+            self.run_hook(hook, method, api_url, params, headers)
+        return params, headers
+
+    # record a finished call in the metrics and run the post-request hooks
+    # "elapsed" is the whole call, "attempt" its last attempt (see fgt_metrics)
+    def finish_call(self, method, api_url, params, json_data, response, error,
+                    elapsed, stream, attempt):
+        if self.metrics is not None:
+            if 'global' in params:
+                vdom = 'global'
+            else:
+                vdom = params.get('vdom', '')
+            try:
+                self.metrics.record(self.name, vdom, self.endpoint_label(api_url),
+                                    method, response, error, elapsed, stream,
+                                    attempt, json_body_size(json_data))
+            except Exception as e:
+                warnings.warn('fgt_api metrics failed: %r' % e)
+        for hook in self.post_hooks:
+            self.run_hook(hook, method, api_url, response, error, elapsed)
+
+    # add one call to the transport counters and set "retries", "throttled" and
+    #   "throttle_wait" on its response
+    def count_call(self, response, retries, throttled, throttle_wait):
+        with self.stats_lock:
+            self.call_count += 1
+            self.retry_count += retries
+            self.throttle_count += throttled
+            self.throttle_wait += throttle_wait
+        if response is not None:
+            response.retries = retries
+            response.throttled = throttled
+            response.throttle_wait = throttle_wait
+
+    # run a pre- or post-request hook; an exception raised by the hook is turned
+    #   into a warning, so the request still returns its response (or None)
+    def run_hook(self, hook, *args):
+        try:
+            hook(self, *args)
+        except Exception as e:
+            warnings.warn('fgt_api hook %r failed: %r' % (hook, e))
+
+    # send HTTP get request through the response cache
+    # an expired entry is revalidated against the config revision if possible
+    def cached_get(self, api_url, params, headers):
+        cache = self.cache
+        key = cache.key(api_url, params, headers)
+        entry = cache.get(key)
+        if entry is not None:
+            if cache.fresh(entry):
+                cache.count(True)
+                return entry[0]
+            if cache.revalidate and entry[1] is not None:
+                check_params = dict(params)
+                check_params['start'] = 0
+                check_params['count'] = 1
+                check = self.send_request('GET', api_url, check_params, headers)
+                if (check is not None and check.status_code == 200 and
+                    response_revision(check) == entry[1]):
+                    cache.touch(entry)
+                    cache.count(True)
+                    return entry[0]
+        cache.count(False)
+        generation = cache.generation
+        response = self.send_request('GET', api_url, params, headers)
+        if response is not None and response.status_code == 200:
+            revision = None
+            if cache.revalidate:
+                revision = response_revision(response)
+            cache.put(key, response, revision, generation)
+        return response
+
+    # "options" (an fgt_options object) applies to that call only; calls with options
+    #   leave url_params/http_headers untouched and skip clear_info(), so they are
+    #   safe to make from many threads at once
+
     # send HTTP get request to FGT API
-    def api_get(self, api_url):
-        try:
-            self.set_url_warn(self.cert_verify)
-            response = requests.get(api_url,
-                                    params = self.url_params,
-                                    headers = self.http_headers,
-                                    verify = self.cert_verify,
-                                    timeout = self.timeout)
-            self.clear_info()            
-            return response
-        except:
-            return None
+    # if "stream" is True, returns a generator of result dicts that are decoded
+    #   incrementally as the body arrives, instead of the response object
+    #   (see stream_results); returns None if no response was received
+    def api_get(self, api_url, stream=False, options=None):
+        params, headers = self.call_args(options)
+        response = self.api_request('GET', api_url, params, headers, stream=stream)
+        if response is not None:
+            if options is None:
+                self.clear_info()
+            if stream:
+                return stream_results(response)
+        return response
 
     # send HTTP post request to FGT API
     # json_data should be type dict
-    def api_post(self, api_url, json_data):
-        try:
-            self.set_url_warn(self.cert_verify)
-            response = requests.post(api_url,
-                                     params = self.url_params,
-                                     headers = self.http_headers,
-                                     json = json_data,
-                                     verify = self.cert_verify,
-                                     timeout = self.timeout)
-            return response
-        except:
-            return None
+    def api_post(self, api_url, json_data, options=None):
+        params, headers = self.call_args(options)
+        return self.api_request('POST', api_url, params, headers, json_data)
 
     # send HTTP put to FGT API
     # json_data should be type None if no json data is required or a dict
-    def api_put(self, api_url, json_data):
-        try:
-            self.set_url_warn(self.cert_verify)
-            response = requests.put(api_url,
-                                    params = self.url_params,
-                                    headers = self.http_headers,
-                                    json = json_data,
-                                    verify = self.cert_verify,
-                                    timeout = self.timeout)
-            return response
-        except:
-            return None
+    def api_put(self, api_url, json_data, options=None):
+        params, headers = self.call_args(options)
+        return self.api_request('PUT', api_url, params, headers, json_data)
 
     # send HTTP delete to FGT API
-    def api_delete(self, api_url):
-        try:
-            self.set_url_warn(self.cert_verify)
-            response = requests.delete(api_url,
-                                       params = self.url_params,
-                                       headers = self.http_headers,
-                                       verify = self.cert_verify,
-                                       timeout = self.timeout)
-            self.clear_info()            
-            return response
-        except:
-            return None
+    def api_delete(self, api_url, options=None):
+        params, headers = self.call_args(options)
+        response = self.api_request('DELETE', api_url, params, headers)
+        if response is not None and options is None:
+            self.clear_info()
+        return response
 
 
     #####
     # define specific task-based API calls
+    # every task method takes an optional fgt_options object as "options"
     #####
 
     #####
@@ -477,36 +2134,49 @@ class fgt_api_token:
     #####
     
     # retrieve all defined address objects
-    def show_addresses(self):
+    def show_addresses(self, options=None):
         api_url = self.cmdb_addr
-        response = self.api_get(api_url)
+        response = self.api_get(api_url, options=options)
         return response
 
     # retrieve specific named address object
-    def get_address(self, addr_name):
+    def get_address(self, addr_name, options=None):
         if type(addr_name) is str:
             api_url = self.cmdb_addr + addr_name
-            response = self.api_get(api_url)
+            response = self.api_get(api_url, options=options)
             return response
 
+    # retrieve all defined address objects as an fgt_result_set of
+    #   fgt_address_record objects
+    def show_address_records(self, options=None):
+        return fgt_result_set(self.show_addresses(options), fgt_address_record)
+
     # add an address to a FortiGate
     # address object must be a valid dict
-    def add_address(self, addr_object):
+    def add_address(self, addr_object, options=None):
         if type(addr_object) is dict:
             # set URL for adding an address object
             api_url = self.cmdb_addr
             # call generalized API post method
-            response = self.api_post(api_url, addr_object)
+            response = self.api_post(api_url, addr_object, options)
             return response
 
     # delete an address object on a FortiGate
-    def del_address(self, addr_name):
+    def del_address(self, addr_name, options=None):
         if type(addr_name) is str:
             api_url = self.cmdb_addr + addr_name
-            response = self.api_delete(api_url)
+            response = self.api_delete(api_url, options)
             return response
         else:
             return None
+
+    # update an existing address object on a FortiGate
+    # address object must be a valid dict; only the attributes given are changed
+    def update_address(self, addr_name, addr_object, options=None):
+        if type(addr_name) is str and type(addr_object) is dict:
+            api_url = self.cmdb_addr + urllib.parse.quote(addr_name, safe='')
+            response = self.api_put(api_url, addr_object, options)
+            return response
     
 
     #####
@@ -514,116 +2184,2634 @@ class fgt_api_token:
     #####
     
     # show all policies
-    def show_policies(self):
+    def show_policies(self, options=None):
         api_url = self.cmdb_policy
-        response = self.api_get(api_url)
+        response = self.api_get(api_url, options=options)
         return response
 
     # get an individual policy
-    def get_policy(self, policy_index):
+    def get_policy(self, policy_index, options=None):
         if type(policy_index) is int:
             policy_index = str(policy_index)
             api_url = self.cmdb_policy + policy_index
-            response = self.api_get(api_url)
+            response = self.api_get(api_url, options=options)
             return response
 
+    # retrieve all policies as an fgt_result_set of fgt_policy_record objects
+    def show_policy_records(self, options=None):
+        return fgt_result_set(self.show_policies(options), fgt_policy_record)
+
     # add a policy to a FortiGate
     # policy_definition must be dict
-    def add_policy(self, policy_definition):
+    def add_policy(self, policy_definition, options=None):
         if type(policy_definition) is dict:
             api_url = self.cmdb_policy
-            response = self.api_post(api_url, policy_definition)
+            response = self.api_post(api_url, policy_definition, options)
             return response
 
     # query FortiGate policy based on filter criteria provided
     # filter must be a dict with in the format {SEARCHTEXT: OPERATOR};
     #   None can be used in place of operator for first search term
-    def search_policy(self, policy_filter):
+    # with "options", the filter is sent with that call only instead of set_filter()
+    def search_policy(self, policy_filter, options=None):
         if type(policy_filter) is dict:
             api_url = self.cmdb_policy
-            # add filters to URL parameters
-            self.set_filter(policy_filter)
-            response = self.api_get(api_url)
+            if options is None:
+                # add filters to URL parameters
+                self.set_filter(policy_filter)
+            else:
+                options = options.merge(filter=policy_filter)
+            response = self.api_get(api_url, options=options)
             return response
         
     # move a policy on a FortiGate
     # index is "mkey"; ref_index is the index of the policy to move around
-    def move_policy(self, index, ref_index, move_type):
+    # move parameters are added to a copy of the URL parameters
+    def move_policy(self, index, ref_index, move_type, options=None):
         if (type(index) is int and type(ref_index) is int and 
             move_type in ['before', 'after']):
             try:
                 index = str(index)
                 ref_index = str(ref_index)
                 api_url = self.cmdb_policy + index
+                params, headers = self.call_args(options)
                 # add move parameters to URL
-                self.url_params['action'] = 'move'
-                self.url_params[move_type] = ref_index
-                response = self.api_put(api_url, None)
-                # remove move parameters from URL
-                del self.url_params['action']
-                del self.url_params[move_type]
+                params = dict(params)
+                params['action'] = 'move'
+                params[move_type] = ref_index
+                response = self.api_request('PUT', api_url, params, headers)
                 return response            
             except:
                 pass
 
     # delete a policy on a FortiGate
-    def del_policy(self, index):
+    def del_policy(self, index, options=None):
         try:
             index = str(index)
             api_url = self.cmdb_policy + index
-            response = self.api_delete(api_url)
+            response = self.api_delete(api_url, options)
             return response
         except:
             pass
 
+    # reorder policies with the fewest move_policy() calls
+    # "target_order" is a list of every policyid in the order wanted
+    # the current order is read with a policyid-only paged query; see
+    #   fgt_reorder_plan for how the moves are chosen
+    # if "dry_run" is True, the plan is returned without moving anything; otherwise
+    #   moves are sent one at a time and stop at the first failure, with the
+    #   responses kept in plan.responses
+    def reorder_policies(self, target_order, dry_run=False, options=None):
+        read_options = (options or fgt_options()).merge(format=['policyid'])
+        current_order = [policy['policyid']
+                         for policy in self.iter_policies(options=read_options)]
+        plan = fgt_reorder_plan(current_order, target_order)
+        if not dry_run:
+            for policyid, ref_policyid, move_type in plan.moves:
+                response = self.move_policy(policyid, ref_policyid, move_type, options)
+                plan.responses.append(response)
+                if response is None or response.status_code != 200:
+                    break
+        return plan
+
+    # read policies and return an fgt_policy_analyzer (fgt_analyzer.py) for them
+    #   (requires numpy)
+    # address and service objects come from "resolver" (an fgt_object_resolver),
+    #   which is refreshed first, or from a new resolver for this object
+    # keyword arguments are passed to the paged iterators
+    def analyze_policies(self, resolver=None, options=None, **page_options):
+        if resolver is None:
+            resolver = fgt_analyzer.fgt_object_resolver(self)
+        resolver.refresh(options=options, **page_options)
+        policies = list(self.iter_policies(options=options, **page_options))
+        return fgt_analyzer.fgt_policy_analyzer(policies, resolver=resolver)
+
 
     #####
     # monitor branch of API calls
     #####
 
     # get firmware info from a FortiGate
-    def get_firmware(self):
+    def get_firmware(self, options=None):
         api_url = self.monitor_base + 'system/firmware/'
-        response = self.api_get(api_url)
+        response = self.api_get(api_url, options=options)
         return response
 
+    # get per-policy counters (hit count, bytes, packets, sessions) from a FortiGate
+    # counters are cumulative since the policy was created or last cleared;
+    #   see fgt_monitor_poller for per-interval deltas and rates
+    def show_policy_stats(self, options=None):
+        api_url = self.monitor_policy
+        response = self.api_get(api_url, options=options)
+        return response
 
-# validate fortigate country value
-# created: 2019-01-07
-# last modified: 2019-02-10
-def valid_fgt_cn(addr_country):
-    
-    # valid fortigate country codes as of 2019-01-07
-    valid_cn_list = ['ZZ', 'O1', 'AD', 'AE', 'AF', 'AG', 'AI', 'AL', 'AM', 'AN', 'AO',
-                     'AQ', 'AR', 'AS', 'AT', 'AU', 'AW', 'AX', 'AZ', 'BA', 'BB', 'BD',
-                     'BE', 'BF', 'BG', 'BH', 'BI', 'BJ', 'BL', 'BM', 'BN', 'BO', 'BQ',
-                     'BR', 'BS', 'BT', 'BV', 'BW', 'BY', 'BZ', 'CA', 'CC', 'CD', 'CF',
-                     'CG', 'CH', 'CI', 'CK', 'CL', 'CM', 'CN', 'CO', 'CR', 'CU', 'CV',
-                     'CW', 'CX', 'CY', 'CZ', 'DE', 'DJ', 'DK', 'DM', 'DO', 'DZ', 'EC',
-                     'EE', 'EG', 'EH', 'ER', 'ES', 'ET', 'FI', 'FJ', 'FK', 'FM', 'FO',
-                     'FR', 'GA', 'GB', 'GD', 'GE', 'GF', 'GG', 'GH', 'GI', 'GL', 'GM',
-                     'GN', 'GP', 'GQ', 'GR', 'GS', 'GT', 'GU', 'GW', 'GY', 'HK', 'HM',
-                     'HN', 'HR', 'HT', 'HU', 'ID', 'IE', 'IL', 'IM', 'IN', 'IO', 'IQ',
-                     'IR', 'IS', 'IT', 'JE', 'JM', 'JO', 'JP', 'KE', 'KG', 'KH', 'KI',
-                     'KM', 'KN', 'KP', 'KR', 'KW', 'KY', 'KZ', 'LA', 'LB', 'LC', 'LI',
-                     'LK', 'LR', 'LS', 'LT', 'LU', 'LV', 'LY', 'MA', 'MC', 'MD', 'ME',
-                     'MF', 'MG', 'MH', 'MK', 'ML', 'MM', 'MN', 'MO', 'MP', 'MQ', 'MR',
-                     'MS', 'MT', 'MU', 'MV', 'MW', 'MX', 'MY', 'MZ', 'NA', 'NC', 'NE',
-                     'NF', 'NG', 'NI', 'NL', 'NO', 'NP', 'NR', 'NU', 'NZ', 'OM', 'PA',
-                     'PE', 'PF', 'PG', 'PH', 'PK', 'PL', 'PM', 'PN', 'PR', 'PS', 'PT',
-                     'PW', 'PY', 'QA', 'RE', 'RO', 'RS', 'RU', 'RW', 'SA', 'SB', 'SC',
-                     'SD', 'SE', 'SG', 'SH', 'SI', 'SJ', 'SK', 'SL', 'SM', 'SN', 'SO',
-                     'SR', 'SS', 'ST', 'SV', 'SX', 'SY', 'SZ', 'TC', 'TD', 'TF', 'TG',
-                     'TH', 'TJ', 'TK', 'TL', 'TM', 'TN', 'TO', 'TR', 'TT', 'TV', 'TW',
-                     'TZ', 'UA', 'UG', 'UM', 'US', 'UY', 'UZ', 'VA', 'VC', 'VE', 'VG',
-                     'VI', 'VN', 'VU', 'WF', 'WS', 'XK', 'YE', 'YT', 'ZA', 'ZM', 'ZW']
-    
-    if addr_country in valid_cn_list:
-        valid_cn = True
-    else:
-        valid_cn = False
+    # get the config revision reported by a FortiGate, or None
+    # reads a single object from a cmdb table (address table by default), bypassing
+    #   the response cache; the revision changes whenever the configuration changes
+    def config_revision(self, api_url=None, options=None):
+        if api_url is None:
+            api_url = self.cmdb_addr
+        params, headers = self.call_args(options)
+        params = dict(params)
+        params['start'] = 0
+        params['count'] = 1
+        response = self.send_request('GET', api_url, params, headers)
+        if response is not None and response.status_code == 200:
+            return response_revision(response)
+
+
+    #####
+    # paged iterators
+    # tables are read with the start/count URL parameters, one page per request,
+    #   so large tables never arrive as a single response
+    # URL parameters (vdom, filter, format, etc.) are copied when iteration starts
+    #   and clear_info() is applied once, as for a single api_get(); with "options"
+    #   the shared parameters are left alone
+    #####
+
+    # yield pages (lists of result dicts) from a cmdb table URL
+    # "page_size" is the first page's count
+    # if "adaptive" is True, the page size is doubled while pages return faster than
+    #   half of "target_latency" seconds and halved when they are slower than it,
+    #   within min_page_size and max_page_size; target_latency defaults to 1/3 of
+    #   the HTTP timeout
+    # if "prefetch" is True, the next page is requested in a background thread
+    #   while the caller works on the current one
+    # raises fgt_api_error if a page cannot be read, so a table is never silently
+    #   truncated
+    def iter_pages(self, api_url, page_size=1000, adaptive=True, prefetch=False,
+                   target_latency=None, min_page_size=100, max_page_size=10000,
+                   options=None):
+        if options is None:
+            params = dict(self.url_params)
+            headers = dict(self.http_headers)
+            self.clear_info()
+        else:
+            params, headers = self.call_args(options)
+        if target_latency is None:
+            target_latency = self.timeout / 3.0
+
+        def fetch(start, count):
+            page_params = dict(params)
+            page_params['start'] = start
+            page_params['count'] = count
+            fetch_start = time.monotonic()
+            response = self.api_request('GET', api_url, page_params, headers)
+            return response, time.monotonic() - fetch_start
+
+        executor = None
+        if prefetch:
+            executor = concurrent.futures.ThreadPoolExecutor(1)
+        future = None
+        try:
+            start = 0
+            count = page_size
+            while True:
+                page_count = count
+                if future is None:
+                    response, latency = fetch(start, page_count)
+                else:
+                    response, latency = future.result()
+                results = page_results(response)
+                if adaptive:
+                    if latency > target_latency:
+                        count = max(min_page_size, count // 2)
+                    elif latency < target_latency / 2:
+                        count = min(max_page_size, count * 2)
+                # a short (or oversized, if paging was ignored) page is the last one
+                last_page = len(results) != page_count
+                start += len(results)
+                future = None
+                if executor is not None and not last_page:
+                    future = executor.submit(fetch, start, count)
+                yield results
+                if last_page:
+                    break
+        finally:
+            # a caller that stops early must not leave a page request running: a
+            #   prefetch not started yet is cancelled, one already sent is waited for
+            if future is not None:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    # yield result dicts one by one from any cmdb path relative to cmdb_base
+    # e.g. iter_cmdb('firewall/addrgrp/'); keyword arguments as for iter_pages()
+    def iter_cmdb(self, path, **page_options):
+        for page in self.iter_pages(self.cmdb_base + path, **page_options):
+            for result in page:
+                yield result
+
+    # yield address objects one by one
+    def iter_addresses(self, **page_options):
+        for page in self.iter_pages(self.cmdb_addr, **page_options):
+            for result in page:
+                yield result
+
+    # yield policies one by one
+    def iter_policies(self, **page_options):
+        for page in self.iter_pages(self.cmdb_policy, **page_options):
+            for result in page:
+                yield result
+
+    # yield fgt_record objects ("record_class") from a cmdb table URL, page by page
+    # e.g. list(client.iter_records(client.cmdb_addr, fgt_address_record)) keeps a
+    #   large table in memory as compact records instead of dicts
+    def iter_records(self, api_url, record_class=fgt_record, **page_options):
+        for page in self.iter_pages(api_url, **page_options):
+            for result in page:
+                yield record_class.from_object(result)
+
+    # return an fgt_snapshot of cmdb tables saved at "path"
+    # "tables" is a dict of cmdb path -> key field (default_snapshot_tables if None)
+    # the saved snapshot is used if it was taken from this device and VDOM at the
+    #   current config revision; otherwise (or if "force" is True) the tables are
+    #   fetched with the paged iterators and the snapshot is rewritten
+    # the returned snapshot's "fetched" attribute tells which happened
+    def load_snapshot(self, path, tables=None, force=False, options=None,
+                      **page_options):
+        if tables is None:
+            tables = default_snapshot_tables
+        params = self.call_args(options)[0]
+        device = {'host': self.host, 'port': self.port,
+                  'vdom': 'global' if 'global' in params else params.get('vdom')}
+        revision = self.config_revision(options=options)
+        if not force and revision is not None and os.path.exists(path):
+            try:
+                snapshot = fgt_snapshot(path)
+            except (OSError, ValueError, KeyError):
+                snapshot = None
+            if snapshot is not None:
+                if (snapshot.revision == revision and snapshot.device == device and
+                    all(table in snapshot.tables for table in tables)):
+                    return snapshot
+                snapshot.close()
+        write_snapshot(path,
+                       ((table, key_field,
+                         self.iter_cmdb(table, options=options, **page_options))
+                        for table, key_field in tables.items()),
+                       revision, device)
+        snapshot = fgt_snapshot(path)
+        snapshot.fetched = True
+        return snapshot
+
+
+    #####
+    # config transactions (FortiOS 6.4 and later)
+    # cmdb requests sent with the X-TRANSACTION-ID header are applied when the
+    #   transaction is committed, so the device commits once for a whole batch
+    #####
+
+    # start a config transaction; returns the transaction id, or None if the
+    #   firmware does not support transactions
+    # "timeout" is the number of seconds the device keeps the transaction open
+    def transaction_start(self, timeout=60, options=None):
+        params, headers = self.call_args(options)
+        params = dict(params)
+        params['action'] = 'transaction-start'
+        response = self.send_request('POST', self.cmdb_base, params, headers,
+                                     {'timeout': timeout})
+        try:
+            if response.status_code == 200:
+                return json_loads(response.content)['results']['transaction-id']
+        except Exception:
+            pass
+        return None
+
+    # send a transaction action (commit or abort) for a transaction id
+    def transaction_action(self, transaction_id, action, options=None):
+        params, headers = self.call_args(options)
+        params = dict(params)
+        params['action'] = action
+        headers = dict(headers)
+        headers['X-TRANSACTION-ID'] = str(transaction_id)
+        response = self.send_request('POST', self.cmdb_base, params, headers)
+        return response is not None and response.status_code == 200
+
+    # commit a config transaction; returns True on success
+    def transaction_commit(self, transaction_id, options=None):
+        return self.transaction_action(transaction_id, 'transaction-commit', options)
+
+    # abort a config transaction; returns True on success
+    def transaction_abort(self, transaction_id, options=None):
+        return self.transaction_action(transaction_id, 'transaction-abort', options)
+
+
+    #####
+    # bulk operations
+    # requests are sent from a thread pool over this object's connection pool;
+    #   set_pool(pool_size) should be at least "parallelism" so every worker keeps
+    #   its connection
+    # URL parameters and headers are copied once for the whole batch; "options"
+    #   applies to every request in the batch
+    #####
+
+    # send one request per item and yield fgt_bulk_result objects as they finish
+    # "items" is an iterable of (key, api_url, json_data); it is read lazily and at
+    #   most 2 x parallelism requests are queued at once, so memory use is flat
+    # "headers", if given, replaces the call headers (used by run_bulk())
+    def iter_bulk(self, method, items, parallelism=8, headers=None, options=None):
+        if options is None:
+            params = dict(self.url_params)
+            call_headers = dict(self.http_headers)
+            self.clear_info()
+        else:
+            params, call_headers = self.call_args(options)
+        if headers is None:
+            headers = call_headers
+
+        def send(index, key, api_url, json_data):
+            start = time.monotonic()
+            try:
+                response = self.api_request(method, api_url, params, headers, json_data)
+                error = None
+            except Exception as e:
+                response = None
+                error = e
+            return fgt_bulk_result(index, key, response, error, time.monotonic() - start)
+
+        with concurrent.futures.ThreadPoolExecutor(parallelism) as executor:
+            pending = set()
+            for index, (key, api_url, json_data) in enumerate(items):
+                pending.add(executor.submit(send, index, key, api_url, json_data))
+                if len(pending) >= parallelism * 2:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in concurrent.futures.as_completed(pending):
+                yield future.result()
+
+    # run a bulk operation and return an fgt_bulk_report with results in input order
+    # if "transaction" is True and the firmware supports it, the batch runs in one
+    #   config transaction, which is committed if every item succeeded and aborted
+    #   otherwise; without transaction support the batch runs item by item
+    def run_bulk(self, method, items, parallelism=8, transaction=False, options=None):
+        headers = dict(self.call_args(options)[1])
+        transaction_id = None
+        if transaction:
+            transaction_id = self.transaction_start(options=options)
+            if transaction_id is not None:
+                headers['X-TRANSACTION-ID'] = str(transaction_id)
+        report = self.bulk_report(method, items, parallelism, headers, options)
+        if transaction and transaction_id is None:
+            report.transaction = 'unsupported'
+        if transaction_id is not None:
+            if (report.failed == 0 and
+                self.transaction_commit(transaction_id, options)):
+                report.transaction = 'committed'
+            else:
+                self.transaction_abort(transaction_id, options)
+                report.transaction = 'aborted'
+        return report
+
+    # run a bulk operation with the given headers (e.g. carrying an open
+    #   transaction id) and return an fgt_bulk_report with results in input order
+    def bulk_report(self, method, items, parallelism=8, headers=None, options=None):
+        report = fgt_bulk_report()
+        results = list(self.iter_bulk(method, items, parallelism, headers, options))
+        results.sort(key=lambda result: result.index)
+        report.results = results
+        return report
+
+    # add many address objects; "addr_objects" is an iterable of address dicts
+    def add_addresses(self, addr_objects, parallelism=8, transaction=False,
+                      options=None):
+        items = ((addr_object.get('name'), self.cmdb_addr, addr_object)
+                 for addr_object in addr_objects)
+        return self.run_bulk('POST', items, parallelism, transaction, options)
+
+    # update many existing address objects; each dict must include its "name"
+    def update_addresses(self, addr_objects, parallelism=8, transaction=False,
+                         options=None):
+        items = ((addr_object['name'],
+                  self.cmdb_addr + urllib.parse.quote(addr_object['name'], safe=''),
+                  addr_object)
+                 for addr_object in addr_objects)
+        return self.run_bulk('PUT', items, parallelism, transaction, options)
+
+    # delete many address objects; "addr_names" is an iterable of names
+    def del_addresses(self, addr_names, parallelism=8, transaction=False,
+                      options=None):
+        items = ((addr_name,
+                  self.cmdb_addr + urllib.parse.quote(addr_name, safe=''),
+                  None)
+                 for addr_name in addr_names)
+        return self.run_bulk('DELETE', items, parallelism, transaction, options)
+
+    # import address records (dicts, e.g. from fgt_import.read_records()) into the
+    #   FortiGate
+    # records stream through an fgt_import.fgt_address_import (validation,
+    #   normalization and, with "dedupe", deduplication against the addresses already
+    #   configured) and
+    #   straight into iter_bulk(), so memory use does not grow with the input
+    # rejected records and addresses the FortiGate refuses go to "errors" (see
+    #   fgt_address_import); returns the fgt_address_import with its counters
+    def import_addresses(self, records, errors=None, dedupe=True, name_prefix='',
+                         batch_size=1000, parallelism=8, options=None):
+        importer = fgt_import.fgt_address_import(name_prefix, batch_size, dedupe, errors)
+        if dedupe:
+            fields = ['name', 'type']
+            for value_fields in fgt_import.fgt_address_import.value_fields.values():
+                fields.extend(value_fields)
+            read_options = (options or fgt_options()).merge(format=fields)
+            for addr_object in self.iter_addresses(options=read_options):
+                importer.add_existing(addr_object)
+        # addresses sent and not yet answered, for error reporting
+        pending = {}
+
+        def items():
+            for index, address in enumerate(importer.addresses(records)):
+                pending[index] = address
+                yield address['name'], self.cmdb_addr, address
+
+        for result in self.iter_bulk('POST', items(), parallelism, options=options):
+            address = pending.pop(result.index)
+            if result.ok:
+                importer.succeeded += 1
+            else:
+                importer.failed += 1
+                if result.error is not None:
+                    reason = 'error: ' + str(result.error)
+                else:
+                    reason = 'status ' + str(result.status_code)
+                importer.write_error(None, address, reason)
+        return importer
+
+
+    #####
+    # multi-VDOM queries
+    # set_vdom() with a list or set_global() asks the FortiGate for every VDOM in one
+    #   request, which the device answers serially and which often times out with
+    #   many VDOMs; these methods read each VDOM with its own paged requests,
+    #   "parallelism" VDOMs at a time, over this object's connection pool
+    # results stream back as (vdom, result) pairs in arrival order; a VDOM that
+    #   fails is recorded in the fgt_vdom_report and does not stop the others
+    #####
+
+    # return the names of the VDOMs configured on the FortiGate
+    # raises fgt_api_error if the VDOM table cannot be read
+    def vdom_names(self, options=None):
+        options = (options or fgt_options()).merge(format=['name'])
+        response = self.api_get(self.cmdb_base + 'system/vdom/', options=options)
+        return [vdom['name'] for vdom in page_results(response)]
+
+    # yield (vdom, result) pairs for a cmdb table URL across VDOMs
+    # "vdoms" is a list of VDOM names; None reads every VDOM on the FortiGate
+    # pass an fgt_vdom_report as "report" to get per-VDOM counts, timings and errors
+    # if "split_global" is True, a single global (or vdom=a,b,c) request is sent and
+    #   its per-VDOM sections are split apart instead; useful for small tables
+    # other keyword arguments are passed to iter_pages() for each VDOM
+    def iter_vdoms(self, api_url, vdoms=None, parallelism=8, split_global=False,
+                   report=None, options=None, **page_options):
+        if report is None:
+            report = fgt_vdom_report()
+        options = options or fgt_options()
+        if split_global:
+            yield from self.split_vdoms(api_url, vdoms, report, options)
+            return
+        report.mode = 'parallel'
+        if vdoms is None:
+            vdoms = self.vdom_names(options)
+        for vdom in vdoms:
+            report.vdom(vdom)
+        # pages are handed over through a bounded queue, so a slow consumer holds
+        #   the readers back instead of buffering whole tables
+        pages = queue.Queue(parallelism * 2)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def read(vdom):
+            result = report.results[vdom]
+            start = time.monotonic()
+            try:
+                for page in self.iter_pages(api_url, options=options.merge(vdom=vdom),
+                                            **page_options):
+                    result.count += len(page)
+                    if not put((vdom, page)):
+                        break
+            except Exception as e:
+                result.error = e
+            result.elapsed = time.monotonic() - start
+            put((vdom, None))
+
+        executor = concurrent.futures.ThreadPoolExecutor(max(1, parallelism))
+        try:
+            for vdom in vdoms:
+                executor.submit(read, vdom)
+            remaining = len(vdoms)
+            while remaining:
+                vdom, page = pages.get()
+                if page is None:
+                    remaining -= 1
+                    continue
+                for result in page:
+                    yield vdom, result
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    # yield (vdom, result) pairs from one multi-VDOM request
+    def split_vdoms(self, api_url, vdoms, report, options):
+        report.mode = 'split'
+        if vdoms is None:
+            options = options.merge(use_global=True)
+        else:
+            options = options.merge(vdom=vdoms)
+            for vdom in vdoms:
+                report.vdom(vdom)
+        start = time.monotonic()
+        response = self.api_get(api_url, options=options)
+        elapsed = time.monotonic() - start
+        try:
+            if response is None:
+                raise fgt_api_error('no response from FortiGate')
+            try:
+                data = json_loads(response.content)
+            except ValueError as e:
+                raise fgt_api_error('invalid JSON in response: ' + str(e), response)
+            if type(data) is dict:
+                data = [data]
+            if response.status_code != 200:
+                raise fgt_api_error('HTTP status ' + str(response.status_code),
+                                    response)
+        except fgt_api_error as e:
+            if not report.results:
+                report.vdom('global')
+            for result in report.results.values():
+                result.error = e
+                result.elapsed = elapsed
+            return
+        for section in data:
+            result = report.vdom(section.get('vdom', 'global'))
+            result.elapsed = elapsed
+            if section.get('status') == 'error' or section.get('http_status', 200) != 200:
+                result.error = fgt_api_error(
+                    'HTTP status ' + str(section.get('http_status')), response)
+                continue
+            results = section.get('results', [])
+            if type(results) is dict:
+                results = [results]
+            result.count += len(results)
+            for item in results:
+                yield result.vdom, item
+
+    # read a table across VDOMs and return ({vdom: [results]}, fgt_vdom_report)
+    # VDOMs are in the order of the report (the order requested), not the order in
+    #   which their results arrived
+    # arguments are the same as for iter_vdoms()
+    def query_vdoms(self, api_url, vdoms=None, parallelism=8, split_global=False,
+                    options=None, **page_options):
+        report = fgt_vdom_report()
+        results = {}
+        for vdom, result in self.iter_vdoms(api_url, vdoms, parallelism, split_global,
+                                            report, options, **page_options):
+            results.setdefault(vdom, []).append(result)
+        return {vdom: results.get(vdom, []) for vdom in report.results}, report
+
+    # yield (vdom, address object) pairs across VDOMs
+    def iter_vdom_addresses(self, vdoms=None, **vdom_options):
+        return self.iter_vdoms(self.cmdb_addr, vdoms, **vdom_options)
+
+    # yield (vdom, policy) pairs across VDOMs
+    def iter_vdom_policies(self, vdoms=None, **vdom_options):
+        return self.iter_vdoms(self.cmdb_policy, vdoms, **vdom_options)
+
+
+# fgt_async_response
+# minimal response object returned by fgt_api_async
+# mirrors the parts of requests.Response that scripts normally use; the body is read
+#   completely before the connection is handed back to the pool
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_async_response:
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+# fgt_http_response
+# response of fgt_http_transport, with the parts of the requests.Response interface
+#   used by this module (status_code, headers, content, text, json(), ok, elapsed,
+#   iter_content(), close())
+# the body is read on first use of "content", or chunk by chunk with iter_content()
+#   for streamed requests; the connection goes back to the transport's pool once
+#   the body has been read, and is closed if the body is left unread
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_http_response(fgt_async_response):
+    def __init__(self, url, raw, elapsed, release):
+        self.url = url
+        self.raw = raw
+        self.status_code = raw.status
+        self.headers = raw.headers
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+        self.request = None
+        self.release = release
+        self.body = None
+        self.decoder = None
+        if (raw.headers.get('Content-Encoding') or '').lower() == 'gzip':
+            self.decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    @property
+    def content(self):
+        if self.body is None:
+            self.body = b''.join(self.iter_content(65536))
+        return self.body
+
+    # yield decoded chunks of the body
+    def iter_content(self, chunk_size=65536):
+        if self.body is not None:
+            for start in range(0, len(self.body), chunk_size):
+                yield self.body[start:start + chunk_size]
+            return
+        raw = self.raw
+        while True:
+            chunk = raw.read(chunk_size)
+            if not chunk:
+                break
+            if self.decoder is not None:
+                chunk = self.decoder.decompress(chunk)
+                if not chunk:
+                    continue
+            yield chunk
+        if self.decoder is not None:
+            chunk = self.decoder.flush()
+            if chunk:
+                yield chunk
+        self.finish(True)
+
+    # hand the connection back (or close it if the body was not read)
+    def finish(self, complete):
+        release = self.release
+        if release is not None:
+            self.release = None
+            release(complete and not self.raw.will_close)
+
+    def close(self):
+        self.finish(self.raw.isclosed())
+
+
+# fgt_http_transport
+# minimal transport on the standard library's http.client, for short scripts
+#   that should not pay for importing requests and urllib3
+# keeps up to "pool_size" idle keep-alive connections per host and reuses them;
+#   idle connections the FortiGate has closed are skipped, and a request that
+#   fails on a reused connection is sent again on a new one if it never left or
+#   its method is idempotent (a POST is never sent twice)
+# responses are gzip-compressed if the FortiGate supports it
+# use with fgt_api_token.set_transport(); one transport can be shared by several
+#   objects and threads
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_http_transport:
+    # characters left as they are when quoting URL paths (as requests does)
+    safe_path = "!#$%&'()*+,/:;=?@[]~"
+    # methods sent again when a reused connection fails after the request was sent
+    resend_methods = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+    def __init__(self, pool_size=10, compress=True):
+        self.pool_size = pool_size
+        self.compress = compress
+        self.lock = threading.Lock()
+        # (scheme, host, port, cert_verify) -> idle connections
+        self.idle = {}
+        self.contexts = {}
+
+    # return an idle connection for a host, or open a new one
+    # returns (connection, reused); raises fgt_connect_error if it cannot connect
+    # idle connections the FortiGate has closed are dropped, not returned
+    def get_connection(self, key, timeout):
+        while True:
+            with self.lock:
+                idle = self.idle.get(key)
+                connection = idle.pop() if idle else None
+            if connection is None:
+                break
+            if self.dropped(connection):
+                connection.close()
+                continue
+            connection.timeout = timeout
+            connection.sock.settimeout(timeout)
+            return connection, True
+        scheme, host, port, cert_verify = key
+        if scheme == 'https':
+            context = self.contexts.get(cert_verify)
+            if context is None:
+                if cert_verify:
+                    context = ssl.create_default_context()
+                else:
+                    context = ssl._create_unverified_context()
+                self.contexts[cert_verify] = context
+            connection = http_client.HTTPSConnection(host, port, timeout=timeout,
+                                                     context=context)
+        else:
+            connection = http_client.HTTPConnection(host, port, timeout=timeout)
+        try:
+            connection.connect()
+        except OSError as e:
+            connection.close()
+            raise fgt_connect_error('cannot connect to %s:%s: %s' % (host, port, e))
+        return connection, False
+
+    # True if an idle connection was closed by the other end (its socket is
+    #   readable: EOF, or data nobody asked for)
+    @staticmethod
+    def dropped(connection):
+        sock = connection.sock
+        if sock is None:
+            return True
+        try:
+            return bool(select.select([sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    # return a connection to the pool, or close it
+    def release(self, key, connection, reusable):
+        if reusable:
+            with self.lock:
+                idle = self.idle.setdefault(key, [])
+                if len(idle) < self.pool_size:
+                    idle.append(connection)
+                    return
+        connection.close()
+
+    # send a request for "client"; the body is read unless "stream" is True
+    def request(self, client, method, api_url, params, headers, json_data, stream):
+        url = urllib.parse.urlsplit(api_url)
+        target = urllib.parse.quote(url.path, safe=self.safe_path)
+        if params:
+            target += '?' + urllib.parse.urlencode(params, doseq=True)
+        request_headers = dict(headers)
+        if self.compress:
+            request_headers['Accept-Encoding'] = 'gzip'
+        body = None
+        if json_data is not None:
+            body = json.dumps(json_data).encode('utf-8')
+            request_headers['Content-Type'] = 'application/json'
+        timeout = client.timeout
+        if type(timeout) is tuple:
+            timeout = max(timeout)
+        key = (url.scheme, url.hostname, url.port or (443 if url.scheme == 'https'
+                                                      else 80), client.cert_verify)
+        while True:
+            connection, reused = self.get_connection(key, timeout)
+            start = time.perf_counter()
+            sent = False
+            try:
+                connection.request(method, target, body, request_headers)
+                sent = True
+                raw = connection.getresponse()
+                break
+            except (http_client.RemoteDisconnected, ConnectionResetError,
+                    BrokenPipeError):
+                connection.close()
+                # a reused connection closed in the meantime is retried on a new
+                #   one, unless the FortiGate may already have acted on the request
+                if not reused or (sent and method not in self.resend_methods):
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+        response = fgt_http_response(
+            api_url, raw, time.perf_counter() - start,
+            lambda reusable: self.release(key, connection, reusable))
+        if not stream:
+            try:
+                response.content
+            except BaseException:
+                response.finish(False)
+                raise
+        return response
+
+    # close every idle connection
+    def close(self):
+        with self.lock:
+            for idle in self.idle.values():
+                for connection in idle:
+                    connection.close()
+            self.idle.clear()
+
+
+# fgt_async_pool
+# aiohttp session shared by one or more fgt_api_async objects
+# "limit" is the total number of open connections for the pool
+# "limit_per_host" is the number of open connections per FortiGate
+# "max_concurrency" is the number of requests allowed in flight at once across every
+#   object using this pool; requests above the cap wait for a free slot
+# "idle_timeout" is the number of seconds an idle keep-alive connection is kept open
+# the session and semaphore are created on first use inside the running event loop
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_async_pool:
+    def __init__(self, limit=100, limit_per_host=10, max_concurrency=1000,
+                 idle_timeout=60):
+        if not module_available('aiohttp'):
+            raise ImportError('fgt_async_pool requires the aiohttp module')
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.max_concurrency = max_concurrency
+        self.idle_timeout = idle_timeout
+        self.session = None
+        self.semaphore = None
+
+    # return the aiohttp session, creating it in the current event loop if needed
+    def get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit,
+                                             limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.idle_timeout)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    # close the aiohttp session and all of its connections
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            self.semaphore = None
+
+
+# stand-in for an fgt_api_token method that fgt_api_async cannot run: the method
+#   is built on blocking requests (or threads) and would otherwise call the
+#   coroutine api_request() without awaiting it
+# created: 2026-10-18
+# last modified: 2026-10-18
+def sync_only(name):
+    def method(self, *args, **kwargs):
+        raise TypeError('%s() is not available on fgt_api_async; use an '
+                        'fgt_api_token object' % name)
+    method.__name__ = name
+    return method
+
+
+# fgt_api_async
+# asyncio counterpart of fgt_api_token; every task method is a coroutine
+# the paged iterators are async generators; helpers built on threads (bulk
+#   operations, VDOM fan-out, snapshots, policy analysis, reordering) and custom
+#   transports are only available on fgt_api_token and raise TypeError here
+# settings (vdom, port, filters, headers, etc.) are made with the same set_* methods
+#   as fgt_api_token
+# URL parameters and headers are copied when a request is made, so settings can be
+#   changed for the next request while earlier requests are still in flight
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_api_async(fgt_api_token):
+    def __init__(self, name, host, token, pool=None):
+        super().__init__(name, host, token)
+        # aiohttp pool, created on first request if one is not provided
+        # pass the same fgt_async_pool to many objects for a global concurrency cap
+        self.pool = pool
+
+    # set connection limits for this object
+    # replaces the current pool, so call before making requests
+    def set_limits(self, limit=100, limit_per_host=10, max_concurrency=1000,
+                   idle_timeout=60):
+        try:
+            if (type(limit) is int and type(limit_per_host) is int and
+                type(max_concurrency) is int and max_concurrency > 0):
+                self.pool = fgt_async_pool(limit, limit_per_host, max_concurrency,
+                                           idle_timeout)
+        except ImportError:
+            raise
+        except:
+            pass
+
+    # set per-host pool size and idle timeout, same arguments as fgt_api_token
+    def set_pool(self, pool_size=10, idle_timeout=60):
+        if type(pool_size) is int and pool_size > 0 and type(idle_timeout) is int:
+            self.pool_size = pool_size
+            self.idle_timeout = idle_timeout
+            self.set_limits(limit_per_host=pool_size, idle_timeout=idle_timeout)
+
+    # use an existing fgt_async_pool shared with other fgt_api_async objects
+    def share_pool(self, pool=None):
+        if isinstance(pool, fgt_async_pool):
+            self.pool = pool
+
+    # return the aiohttp session used for API requests
+    def get_session(self):
+        if self.pool is None:
+            self.pool = fgt_async_pool(limit_per_host=self.pool_size,
+                                       idle_timeout=self.idle_timeout)
+        return self.pool.get_session()
+
+    # close the aiohttp session used by this object
+    # note: closing a shared pool affects every object using it
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+
+    # send an HTTP request to FGT API
+    # GET requests go through the response cache when it is enabled (see set_cache());
+    #   other methods invalidate the cached entries of the table they write to
+    # identical GET requests already in flight are joined when coalescing is enabled;
+    #   other methods stop later GETs of the table from joining earlier ones
+    async def api_request(self, method, api_url, params, headers, json_data=None):
+        if method == 'GET':
+            single_flight = self.single_flight
+            if single_flight is not None:
+                key = single_flight.key(api_url, params, headers)
+                return await single_flight.call_async(
+                    key, lambda: self.get_async(api_url, params, headers))
+            return await self.get_async(api_url, params, headers)
+        if self.cache is not None or self.single_flight is not None:
+            # invalidated again once the write is done, as for fgt_api_token
+            table = self.cmdb_table(api_url)
+            self.invalidate_reads(table)
+            try:
+                return await self.send_async(method, api_url, params, headers,
+                                             json_data)
+            finally:
+                self.invalidate_reads(table)
+        return await self.send_async(method, api_url, params, headers, json_data)
+
+    # send a GET request, through the response cache when enabled
+    async def get_async(self, api_url, params, headers):
+        if self.cache is not None:
+            return await self.cached_get_async(api_url, params, headers)
+        return await self.send_async('GET', api_url, params, headers)
+
+    # send a GET request through the response cache; works as cached_get() does for
+    #   fgt_api_token, and the cache may be shared with fgt_api_token objects
+    async def cached_get_async(self, api_url, params, headers):
+        cache = self.cache
+        key = cache.key(api_url, params, headers)
+        entry = cache.get(key)
+        if entry is not None:
+            if cache.fresh(entry):
+                cache.count(True)
+                return entry[0]
+            if cache.revalidate and entry[1] is not None:
+                check_params = dict(params)
+                check_params['start'] = '0'
+                check_params['count'] = '1'
+                check = await self.send_async('GET', api_url, check_params, headers)
+                if (check is not None and check.status_code == 200 and
+                    response_revision(check) == entry[1]):
+                    cache.touch(entry)
+                    cache.count(True)
+                    return entry[0]
+        cache.count(False)
+        generation = cache.generation
+        response = await self.send_async('GET', api_url, params, headers)
+        if response is not None and response.status_code == 200:
+            revision = None
+            if cache.revalidate:
+                revision = response_revision(response)
+            cache.put(key, response, revision, generation)
+        return response
+
+    # send an HTTP request to FGT API without coalescing
+    # requests wait for the rate limiters (without blocking the event loop) and are
+    #   retried according to the retry policy, as for fgt_api_token; the response
+    #   gets "retries", "throttled" and "throttle_wait" attributes for this call
+    # metrics and pre-/post-request hooks work as for fgt_api_token; hooks are
+    #   called from the event loop, so they must not block
+    # returns None on errors, like fgt_api_token; cancellation is always re-raised
+    async def send_async(self, method, api_url, params, headers, json_data=None):
+        instrumented = self.metrics is not None or self.pre_hooks or self.post_hooks
+        if instrumented:
+            if self.pre_hooks:
+                params, headers = self.run_pre_hooks(method, api_url, params, headers)
+            call_start = time.perf_counter()
+        policy = self.retry_policy
+        retries = 0
+        throttled = 0
+        throttle_wait = 0.0
+        while True:
+            for limiter in self.rate_limiters:
+                wait = limiter.reserve()
+                if wait > 0:
+                    throttled += 1
+                    throttle_wait += wait
+                    await asyncio.sleep(wait)
+            response = None
+            error = None
+            attempt_start = time.perf_counter()
+            try:
+                response = await self.request_async(method, api_url, params, headers,
+                                                    json_data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+            if (policy is None or retries >= policy.retries or
+                not policy.retryable(method, response, error)):
+                break
+            delay = policy.delay(retries, response)
+            retries += 1
+            await asyncio.sleep(delay)
+        self.count_call(response, retries, throttled, throttle_wait)
+        if instrumented:
+            now = time.perf_counter()
+            self.finish_call(method, api_url, params, json_data, response, error,
+                             now - call_start, False, now - attempt_start)
+        return response
+
+    # send one HTTP request attempt; errors are raised
+    # the body is read inside the timeout, and a cancelled request releases both its
+    #   connection and its concurrency slot
+    async def request_async(self, method, api_url, params, headers, json_data=None):
+        session = self.get_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        ssl = None if self.cert_verify else False
+        async with self.pool.semaphore:
+            async with session.request(method, api_url,
+                                       params = params,
+                                       headers = headers,
+                                       json = json_data,
+                                       ssl = ssl,
+                                       timeout = timeout) as resp:
+                content = await resp.read()
+                return fgt_async_response(str(resp.url), resp.status,
+                                          resp.headers, content)
+
+    # copy URL parameters and headers for a single request, with "options" applied
+    # aiohttp only accepts str/int/float values, so everything is sent as str;
+    #   list values (e.g. several filters) are sent as repeated parameters
+    def request_args(self, options=None):
+        params, headers = self.call_args(options)
+        params = {key: [str(item) for item in value] if type(value) is list
+                  else str(value) for key, value in params.items()}
+        return params, dict(headers)
+
+
+    #####
+    # define set of generalized API coroutines for supported HTTP methods
+    # parameters and headers are copied before the first await
+    # "options" works as for fgt_api_token; calls with options skip clear_info()
+    #####
+
+    # send HTTP get request to FGT API
+    async def api_get(self, api_url, options=None):
+        params, headers = self.request_args(options)
+        if options is None:
+            self.clear_info()
+        return await self.api_request('GET', api_url, params, headers)
+
+    # send HTTP post request to FGT API
+    # json_data should be type dict
+    async def api_post(self, api_url, json_data, options=None):
+        params, headers = self.request_args(options)
+        return await self.api_request('POST', api_url, params, headers, json_data)
+
+    # send HTTP put to FGT API
+    # json_data should be type None if no json data is required or a dict
+    async def api_put(self, api_url, json_data, options=None):
+        params, headers = self.request_args(options)
+        return await self.api_request('PUT', api_url, params, headers, json_data)
+
+    # send HTTP delete to FGT API
+    async def api_delete(self, api_url, options=None):
+        params, headers = self.request_args(options)
+        if options is None:
+            self.clear_info()
+        return await self.api_request('DELETE', api_url, params, headers)
+
+
+    #####
+    # define specific task-based API coroutines
+    # same arguments and return values as fgt_api_token
+    #####
+
+    # retrieve all defined address objects
+    async def show_addresses(self, options=None):
+        return await self.api_get(self.cmdb_addr, options)
+
+    # retrieve specific named address object
+    async def get_address(self, addr_name, options=None):
+        if type(addr_name) is str:
+            return await self.api_get(self.cmdb_addr + addr_name, options)
+
+    # retrieve all defined address objects as an fgt_result_set of
+    #   fgt_address_record objects
+    async def show_address_records(self, options=None):
+        return fgt_result_set(await self.show_addresses(options), fgt_address_record)
+
+    # add an address to a FortiGate
+    # address object must be a valid dict
+    async def add_address(self, addr_object, options=None):
+        if type(addr_object) is dict:
+            return await self.api_post(self.cmdb_addr, addr_object, options)
+
+    # delete an address object on a FortiGate
+    async def del_address(self, addr_name, options=None):
+        if type(addr_name) is str:
+            return await self.api_delete(self.cmdb_addr + addr_name, options)
+        else:
+            return None
+
+    # update an existing address object on a FortiGate
+    async def update_address(self, addr_name, addr_object, options=None):
+        if type(addr_name) is str and type(addr_object) is dict:
+            api_url = self.cmdb_addr + urllib.parse.quote(addr_name, safe='')
+            return await self.api_put(api_url, addr_object, options)
+
+    # show all policies
+    async def show_policies(self, options=None):
+        return await self.api_get(self.cmdb_policy, options)
+
+    # get an individual policy
+    async def get_policy(self, policy_index, options=None):
+        if type(policy_index) is int:
+            return await self.api_get(self.cmdb_policy + str(policy_index), options)
+
+    # retrieve all policies as an fgt_result_set of fgt_policy_record objects
+    async def show_policy_records(self, options=None):
+        return fgt_result_set(await self.show_policies(options), fgt_policy_record)
+
+    # add a policy to a FortiGate
+    # policy_definition must be dict
+    async def add_policy(self, policy_definition, options=None):
+        if type(policy_definition) is dict:
+            return await self.api_post(self.cmdb_policy, policy_definition, options)
+
+    # query FortiGate policy based on filter criteria provided
+    # filter must be a dict with in the format {SEARCHTEXT: OPERATOR}
+    async def search_policy(self, policy_filter, options=None):
+        if type(policy_filter) is dict:
+            if options is None:
+                self.set_filter(policy_filter)
+            else:
+                options = options.merge(filter=policy_filter)
+            return await self.api_get(self.cmdb_policy, options)
+
+    # move a policy on a FortiGate
+    # index is "mkey"; ref_index is the index of the policy to move around
+    async def move_policy(self, index, ref_index, move_type, options=None):
+        if (type(index) is int and type(ref_index) is int and
+            move_type in ['before', 'after']):
+            api_url = self.cmdb_policy + str(index)
+            params, headers = self.request_args(options)
+            params['action'] = 'move'
+            params[move_type] = str(ref_index)
+            return await self.api_request('PUT', api_url, params, headers)
+
+    # delete a policy on a FortiGate
+    async def del_policy(self, index, options=None):
+        return await self.api_delete(self.cmdb_policy + str(index), options)
+
+    # get firmware info from a FortiGate
+    async def get_firmware(self, options=None):
+        return await self.api_get(self.monitor_base + 'system/firmware/', options)
+
+    # get per-policy counters from a FortiGate
+    async def show_policy_stats(self, options=None):
+        return await self.api_get(self.monitor_policy, options)
+
+    # get the config revision reported by a FortiGate, or None
+    async def config_revision(self, api_url=None, options=None):
+        if api_url is None:
+            api_url = self.cmdb_addr
+        params, headers = self.request_args(options)
+        params['start'] = '0'
+        params['count'] = '1'
+        response = await self.send_async('GET', api_url, params, headers)
+        if response is not None and response.status_code == 200:
+            return response_revision(response)
+
+
+    #####
+    # paged iterators, as async generators
+    # same arguments as for fgt_api_token; with "prefetch" the next page is
+    #   requested in a task while the caller works on the current one
+    #####
+
+    # yield pages (lists of result dicts) from a cmdb table URL
+    async def iter_pages(self, api_url, page_size=1000, adaptive=True, prefetch=False,
+                         target_latency=None, min_page_size=100, max_page_size=10000,
+                         options=None):
+        params, headers = self.request_args(options)
+        if options is None:
+            self.clear_info()
+        if target_latency is None:
+            target_latency = self.timeout / 3.0
+
+        async def fetch(start, count):
+            page_params = dict(params)
+            page_params['start'] = str(start)
+            page_params['count'] = str(count)
+            fetch_start = time.monotonic()
+            response = await self.api_request('GET', api_url, page_params, headers)
+            return response, time.monotonic() - fetch_start
+
+        task = None
+        try:
+            start = 0
+            count = page_size
+            while True:
+                page_count = count
+                if task is None:
+                    response, latency = await fetch(start, page_count)
+                else:
+                    response, latency = await task
+                    task = None
+                results = page_results(response)
+                if adaptive:
+                    if latency > target_latency:
+                        count = max(min_page_size, count // 2)
+                    elif latency < target_latency / 2:
+                        count = min(max_page_size, count * 2)
+                last_page = len(results) != page_count
+                start += len(results)
+                if prefetch and not last_page:
+                    task = asyncio.ensure_future(fetch(start, count))
+                yield results
+                if last_page:
+                    break
+        finally:
+            # a caller that stops early must not leave a page request running
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
 
-    return valid_cn        
+    # yield result dicts one by one from any cmdb path relative to cmdb_base
+    async def iter_cmdb(self, path, **page_options):
+        async for page in self.iter_pages(self.cmdb_base + path, **page_options):
+            for result in page:
+                yield result
+
+    # yield address objects one by one
+    async def iter_addresses(self, **page_options):
+        async for page in self.iter_pages(self.cmdb_addr, **page_options):
+            for result in page:
+                yield result
+
+    # yield policies one by one
+    async def iter_policies(self, **page_options):
+        async for page in self.iter_pages(self.cmdb_policy, **page_options):
+            for result in page:
+                yield result
+
+    # yield fgt_record objects ("record_class") from a cmdb table URL
+    async def iter_records(self, api_url, record_class=fgt_record, **page_options):
+        async for page in self.iter_pages(api_url, **page_options):
+            for result in page:
+                yield record_class.from_object(result)
+
+    # return the names of the VDOMs configured on the FortiGate
+    async def vdom_names(self, options=None):
+        options = (options or fgt_options()).merge(format=['name'])
+        response = await self.api_get(self.cmdb_base + 'system/vdom/', options)
+        return [vdom['name'] for vdom in page_results(response)]
+
+
+    #####
+    # config transactions, as for fgt_api_token
+    # writes join a transaction with the X-TRANSACTION-ID header (fgt_options)
+    #####
+
+    # start a config transaction; returns the transaction id, or None
+    async def transaction_start(self, timeout=60, options=None):
+        params, headers = self.request_args(options)
+        params['action'] = 'transaction-start'
+        response = await self.send_async('POST', self.cmdb_base, params, headers,
+                                         {'timeout': timeout})
+        try:
+            if response.status_code == 200:
+                return json_loads(response.content)['results']['transaction-id']
+        except Exception:
+            pass
+        return None
+
+    # send a transaction action (commit or abort) for a transaction id
+    async def transaction_action(self, transaction_id, action, options=None):
+        params, headers = self.request_args(options)
+        params['action'] = action
+        headers['X-TRANSACTION-ID'] = str(transaction_id)
+        response = await self.send_async('POST', self.cmdb_base, params, headers)
+        return response is not None and response.status_code == 200
+
+    # commit a config transaction; returns True on success
+    async def transaction_commit(self, transaction_id, options=None):
+        return await self.transaction_action(transaction_id, 'transaction-commit',
+                                             options)
+
+    # abort a config transaction; returns True on success
+    async def transaction_abort(self, transaction_id, options=None):
+        return await self.transaction_action(transaction_id, 'transaction-abort',
+                                             options)
+
+
+    #####
+    # fgt_api_token helpers that block or use threads; use an fgt_api_token for
+    #   these (see sync_only())
+    #####
+    set_transport = sync_only('set_transport')
+    send_request = sync_only('send_request')
+    get_request = sync_only('get_request')
+    cached_get = sync_only('cached_get')
+    reorder_policies = sync_only('reorder_policies')
+    analyze_policies = sync_only('analyze_policies')
+    load_snapshot = sync_only('load_snapshot')
+    iter_bulk = sync_only('iter_bulk')
+    run_bulk = sync_only('run_bulk')
+    bulk_report = sync_only('bulk_report')
+    add_addresses = sync_only('add_addresses')
+    update_addresses = sync_only('update_addresses')
+    del_addresses = sync_only('del_addresses')
+    import_addresses = sync_only('import_addresses')
+    iter_vdoms = sync_only('iter_vdoms')
+    split_vdoms = sync_only('split_vdoms')
+    query_vdoms = sync_only('query_vdoms')
+    iter_vdom_addresses = sync_only('iter_vdom_addresses')
+    iter_vdom_policies = sync_only('iter_vdom_policies')
+
+
+# fgt_device_client
+# build an fgt_api_token (or subclass) object from an inventory entry
+# "device" data type is dict with keys name, host, token and optional keys
+#   protocol ('https' or 'http'), vdom, port, cert_verify, timeout, rate_limit
+#   (requests per second), retries
+# created: 2026-10-18
+# last modified: 2026-10-18
+def fgt_device_client(device, client_class=fgt_api_token):
+    client = client_class(device['name'], device['host'], device['token'])
+    if device.get('protocol') == 'http':
+        # set directly: set_protocol() prints a warning to stdout
+        client.protocol = 'http'
+        client.set_port(device.get('port', 80))
+    if 'port' in device:
+        client.set_port(device['port'])
+    if 'vdom' in device:
+        client.set_vdom(device['vdom'])
+    if 'cert_verify' in device:
+        client.set_sslverify(device['cert_verify'])
+    if 'timeout' in device:
+        client.set_timeout(device['timeout'])
+    if 'rate_limit' in device:
+        client.set_rate_limit(device['rate_limit'])
+    if 'retries' in device:
+        client.set_retry(device['retries'])
+    return client
+
+
+# fgt_fleet_result
+# result of one task run against one device by fgt_fleet
+# "result" is whatever the task returned; "error" is the exception raised, if any
+# "elapsed" is the task run time in seconds
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_fleet_result:
+    def __init__(self, name, result, error, elapsed):
+        self.name = name
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return ('fgt_fleet_result(name=%r, error=%r, elapsed=%.3f)' %
+                (self.name, self.error, self.elapsed))
+
+
+# run a task against one client and wrap the outcome in an fgt_fleet_result
+# "task" is a method name (e.g. 'get_firmware') or a callable taking the client
+#   as its first argument
+# created: 2026-10-18
+# last modified: 2026-10-18
+def fgt_fleet_call(client, task, args=(), kwargs=None):
+    start = time.monotonic()
+    try:
+        if callable(task):
+            result = task(client, *args, **(kwargs or {}))
+        else:
+            result = getattr(client, task)(*args, **(kwargs or {}))
+        error = None
+    except Exception as e:
+        result = None
+        error = e
+    return fgt_fleet_result(client.name, result, error, time.monotonic() - start)
+
+
+# process pool worker: build a client in the worker process, run the task, close it
+# created: 2026-10-18
+# last modified: 2026-10-18
+def fgt_fleet_process_call(device, task, args=(), kwargs=None):
+    client = fgt_device_client(device)
+    try:
+        return fgt_fleet_call(client, task, args, kwargs)
+    finally:
+        client.close()
+
+
+# fgt_fleet
+# run one fgt_api_token task across many devices in parallel
+# "inventory" is an iterable of device dicts (see fgt_device_client)
+# "max_in_flight" is the max number of devices being worked on at once
+# "timeout" is the per-device time limit in seconds; an inventory entry may override
+#   it with its own "timeout" key, which is also used as the HTTP timeout
+# "use_processes" runs tasks in a process pool instead of a thread pool; tasks and
+#   their arguments and results must then be picklable
+# "rate_limit" is a fleet-wide limit in requests per second shared by every device
+#   (thread mode only; per-device limits come from the inventory); 0 or None is
+#   no limit
+# results stream back as each device finishes, so slow devices do not hold back
+#   fast ones; a device over its time limit is reported with a TimeoutError and
+#   its worker is abandoned (its HTTP timeout still bounds how long it runs)
+# the time limit counts from when a device's task starts running, and the slot of
+#   an abandoned worker is not given to another device until that worker finishes
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_fleet:
+    # seconds between checks for submitted tasks that have not started yet
+    start_poll = 0.05
+
+    def __init__(self, inventory, max_in_flight=32, timeout=30, use_processes=False,
+                 rate_limit=None):
+        self.devices = [dict(device) for device in inventory]
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self.rate_limiter = None
+        if rate_limit:
+            self.rate_limiter = fgt_rate_limiter(rate_limit)
+        # thread mode reuses one client (and its connection pool) per device
+        self.clients = {}
+        self.clients_lock = threading.Lock()
+
+    # return the cached client for a device, creating it if needed
+    def get_client(self, device):
+        with self.clients_lock:
+            if device['name'] not in self.clients:
+                client = fgt_device_client(device)
+                if self.rate_limiter is not None:
+                    client.set_rate_limit(limiter=self.rate_limiter)
+                self.clients[device['name']] = client
+            return self.clients[device['name']]
+
+    # submit a task for one device to the executor
+    def submit(self, executor, device, task, args, kwargs):
+        if self.use_processes:
+            return executor.submit(fgt_fleet_process_call, device, task, args, kwargs)
+        return executor.submit(fgt_fleet_call, self.get_client(device), task,
+                               args, kwargs)
+
+    # run a task on every device and yield fgt_fleet_result objects as they finish
+    # e.g. for res in fleet.run('add_address', addr_object): ...
+    def run(self, task, *args, **kwargs):
+        if self.use_processes:
+            executor = concurrent.futures.ProcessPoolExecutor(self.max_in_flight)
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(self.max_in_flight)
+        devices = collections.deque(self.devices)
+        # future -> [device name, time limit, start time (None until it runs)]
+        pending = {}
+        # timed-out tasks that are still running; they keep their worker busy, so
+        #   their slots are not refilled until they finish
+        abandoned = set()
+        try:
+            while True:
+                # keep at most max_in_flight devices running
+                while devices and len(pending) + len(abandoned) < self.max_in_flight:
+                    device = dict(devices.popleft())
+                    device.setdefault('timeout', self.timeout)
+                    future = self.submit(executor, device, task, args, kwargs)
+                    pending[future] = [device['name'], device['timeout'], None]
+                if not pending and not devices:
+                    break
+                # a device's time limit counts from when its task starts running;
+                #   tasks not started yet are checked again after a short wait
+                now = time.monotonic()
+                wait = None
+                for future, entry in pending.items():
+                    if entry[2] is None and (future.running() or future.done()):
+                        entry[2] = now
+                    if entry[2] is None:
+                        remaining = self.start_poll
+                    else:
+                        remaining = entry[2] + entry[1] - now
+                    wait = remaining if wait is None else min(wait, remaining)
+                done, not_done = concurrent.futures.wait(
+                    list(pending) + list(abandoned),
+                    timeout=None if wait is None else max(0, wait),
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                abandoned -= done
+                for future in done:
+                    if future not in pending:
+                        continue
+                    name, limit, start = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield fgt_fleet_result(name, None, e,
+                                               time.monotonic() - (start or now))
+                now = time.monotonic()
+                for future in not_done:
+                    entry = pending.get(future)
+                    if entry is None or entry[2] is None or now < entry[2] + entry[1]:
+                        continue
+                    del pending[future]
+                    if not future.cancel():
+                        abandoned.add(future)
+                    yield fgt_fleet_result(entry[0], None,
+                                           TimeoutError('device timed out'),
+                                           now - entry[2])
+        finally:
+            executor.shutdown(wait=False)
+
+    # run a task on every device and return a dict of device name -> fgt_fleet_result
+    def run_all(self, task, *args, **kwargs):
+        return {res.name: res for res in self.run(task, *args, **kwargs)}
+
+    # close connection pools held by cached clients
+    def close(self):
+        with self.clients_lock:
+            for client in self.clients.values():
+                client.close()
+            self.clients.clear()
+
+
+# fgt_ring_buffer
+# fixed-size time series of float samples, oldest samples overwritten first
+# one array.array('d') per field plus one for timestamps, so each sample costs
+#   8 bytes per field no matter how many samples are kept
+# "fields" is a sequence of field names; "capacity" the number of samples kept
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_ring_buffer:
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self.times = array.array('d', bytes(8 * capacity))
+        self.columns = [array.array('d', bytes(8 * capacity)) for field in self.fields]
+        # next position to write, and number of samples held
+        self.head = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    # add a sample; "values" are in field order
+    def append(self, timestamp, values):
+        head = self.head
+        self.times[head] = timestamp
+        for column, value in zip(self.columns, values):
+            column[head] = value
+        self.head = (head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    # positions of the held samples, oldest first
+    def positions(self):
+        start = (self.head - self.size) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(self.size)]
+
+    # timestamps, oldest first
+    def timestamps(self):
+        return [self.times[position] for position in self.positions()]
+
+    # values of one field, oldest first
+    def column(self, field):
+        column = self.columns[self.fields.index(field)]
+        return [column[position] for position in self.positions()]
+
+    # most recent sample as a dict (including "time"), or None if empty
+    def latest(self):
+        if self.size == 0:
+            return None
+        position = (self.head - 1) % self.capacity
+        sample = {'time': self.times[position]}
+        for field, column in zip(self.fields, self.columns):
+            sample[field] = column[position]
+        return sample
+
+    # bytes used by the sample arrays
+    @property
+    def nbytes(self):
+        return (len(self.columns) + 1) * 8 * self.capacity
+
+
+# return the increase of a cumulative counter between two readings
+# a reading lower than the last one means the counter was reset (reboot, policy
+#   change or cleared counters), so the new reading is the increase since then
+# created: 2026-10-18
+# last modified: 2026-10-18
+def counter_delta(previous, current):
+    if current >= previous:
+        return current - previous
+    return current
+
+
+# fgt_monitor_device
+# polling state of one device in an fgt_monitor_poller
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_monitor_device:
+    def __init__(self, client, interval):
+        self.client = client
+        self.interval = interval
+        self.latency = None
+        self.polls = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_poll = None
+        # (vdom, policyid) -> (timestamp, counter readings)
+        self.previous = {}
+
+
+# fgt_monitor_poller
+# poll policy counters (monitor firewall/policy) from many devices on a schedule
+#   and keep per-interval deltas and rates in a ring buffer per policy
+# "inventory" is an iterable of device dicts (see fgt_device_client) or
+#   fgt_api_token objects
+# "interval" is the base polling interval in seconds; a device whose response time
+#   exceeds "load_ratio" of its interval is polled less often (up to
+#   "max_interval", default 10 x interval), and failed polls double the interval;
+#   intervals return to the base as the device recovers
+# "counters" are cumulative fields stored as <field>_delta and <field>_rate (per
+#   second); "gauges" are stored as read
+# "capacity" is the number of samples kept per policy
+# "callback", if given, is called as callback(name, timestamp, samples) after each
+#   poll, with samples a dict of (vdom, policyid) -> sample dict
+# the first poll of a device only sets the counter baseline
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_monitor_poller:
+    def __init__(self, inventory, interval=60, capacity=1440,
+                 counters=('hit_count', 'bytes', 'packets'),
+                 gauges=('active_sessions',), parallelism=8, max_interval=None,
+                 load_ratio=0.1, callback=None):
+        self.interval = interval
+        self.max_interval = max_interval or interval * 10
+        self.load_ratio = load_ratio
+        self.capacity = capacity
+        self.counters = tuple(counters)
+        self.gauges = tuple(gauges)
+        self.fields = (tuple(field + suffix for field in self.counters
+                             for suffix in ('_delta', '_rate')) + self.gauges)
+        self.parallelism = parallelism
+        self.callback = callback
+        self.devices = {}
+        for device in inventory:
+            if not isinstance(device, fgt_api_token):
+                device = fgt_device_client(device)
+            self.devices[device.name] = fgt_monitor_device(device, interval)
+        # (device name, vdom, policyid) -> fgt_ring_buffer
+        self.series = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    # poll one device now and record its samples; returns the samples dict
+    # raises fgt_api_error if the counters cannot be read
+    def poll(self, name):
+        device = self.devices[name]
+        client = device.client
+        start = time.monotonic()
+        try:
+            response = client.show_policy_stats(options=fgt_options())
+            if response is None:
+                raise fgt_api_error('no response from FortiGate')
+            if response.status_code != 200:
+                raise fgt_api_error('HTTP status ' + str(response.status_code),
+                                    response)
+            try:
+                data = json_loads(response.content)
+            except ValueError as e:
+                raise fgt_api_error('invalid JSON in response: ' + str(e), response)
+        except fgt_api_error as e:
+            device.errors += 1
+            device.last_error = e
+            device.interval = min(self.max_interval, device.interval * 2)
+            raise
+        latency = time.monotonic() - start
+        timestamp = time.time()
+        samples = self.record(name, device, data, timestamp)
+        device.polls += 1
+        device.last_poll = timestamp
+        device.last_error = None
+        self.adapt(device, latency)
+        if self.callback is not None:
+            self.callback(name, timestamp, samples)
+        return samples
+
+    # update a device's latency average and polling interval after a good poll
+    def adapt(self, device, latency):
+        if device.latency is None:
+            device.latency = latency
+        else:
+            device.latency = 0.7 * device.latency + 0.3 * latency
+        wanted = max(self.interval, device.latency / self.load_ratio)
+        # recover gradually from an error backoff
+        if wanted < device.interval:
+            wanted = max(wanted, device.interval / 2)
+        device.interval = min(self.max_interval, wanted)
+
+    # turn one monitor response into samples and store them
+    def record(self, name, device, data, timestamp):
+        if type(data) is dict:
+            data = [data]
+        samples = {}
+        for section in data:
+            vdom = section.get('vdom', device.client.vdom)
+            results = section.get('results') or []
+            for stats in results:
+                if 'policyid' not in stats:
+                    continue
+                key = (vdom, stats['policyid'])
+                readings = tuple(float(stats.get(field) or 0)
+                                 for field in self.counters)
+                previous = device.previous.get(key)
+                device.previous[key] = (timestamp, readings)
+                if previous is None:
+                    continue
+                elapsed = max(timestamp - previous[0], 1e-6)
+                values = []
+                for before, after in zip(previous[1], readings):
+                    delta = counter_delta(before, after)
+                    values.append(delta)
+                    values.append(delta / elapsed)
+                values.extend(float(stats.get(field) or 0) for field in self.gauges)
+                samples[key] = dict(zip(self.fields, values))
+                ring = self.series.get((name,) + key)
+                if ring is None:
+                    with self.lock:
+                        ring = self.series.setdefault(
+                            (name,) + key, fgt_ring_buffer(self.capacity, self.fields))
+                ring.append(timestamp, values)
+        return samples
+
+    # return the ring buffer of one policy, or None
+    def policy_series(self, name, policyid, vdom=None):
+        if vdom is None:
+            vdom = self.devices[name].client.vdom
+        return self.series.get((name, vdom, policyid))
+
+    # latest sample of every policy, as (device name, vdom, policyid) -> sample dict
+    def latest(self, name=None):
+        with self.lock:
+            series = list(self.series.items())
+        return {key: ring.latest() for key, ring in series
+                if name is None or key[0] == name}
+
+    # per-device polling state
+    def device_stats(self):
+        return {name: {'interval': device.interval, 'latency': device.latency,
+                       'polls': device.polls, 'errors': device.errors,
+                       'last_error': device.last_error}
+                for name, device in self.devices.items()}
+
+    # poll devices on schedule until stop() is called or "duration" seconds pass
+    # every device is polled once at the start; each device is then polled again
+    #   its own interval after its last poll finished, at most "parallelism" at once
+    def run(self, duration=None):
+        end = None if duration is None else time.monotonic() + duration
+        due = [(time.monotonic(), name) for name in self.devices]
+        heapq.heapify(due)
+        pending = {}
+        executor = concurrent.futures.ThreadPoolExecutor(self.parallelism)
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                if end is not None and now >= end:
+                    break
+                while due and due[0][0] <= now and len(pending) < self.parallelism:
+                    name = heapq.heappop(due)[1]
+                    pending[executor.submit(self.poll, name)] = name
+                wait = 1.0
+                if due and len(pending) < self.parallelism:
+                    wait = max(0, due[0][0] - now)
+                if end is not None:
+                    wait = min(wait, max(0, end - now))
+                if pending:
+                    done, not_done = concurrent.futures.wait(
+                        pending, timeout=wait,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                else:
+                    done = ()
+                    self.stop_event.wait(wait)
+                for future in done:
+                    name = pending.pop(future)
+                    # errors are kept in the device state; polling continues
+                    future.exception()
+                    heapq.heappush(due, (time.monotonic() +
+                                         self.devices[name].interval, name))
+        finally:
+            executor.shutdown(wait=True)
+
+    # run the scheduler in a background thread
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    # stop the scheduler and wait for polls in progress
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    # close connection pools held by the device clients
+    def close(self):
+        for device in self.devices.values():
+            device.client.close()
+
+
+# convert an IPv4 address string to an integer
+# created: 2026-10-18
+# last modified: 2026-10-18
+def ip_to_int(ip):
+    return int(ipaddress.IPv4Address(ip))
+
+
+# return (start, end) integers for an IPv4 subnet or range
+# accepts "10.0.0.0/24", "10.0.0.0 255.255.255.0", "10.0.0.1-10.0.0.9" or a single IP
+# created: 2026-10-18
+# last modified: 2026-10-18
+def ip_interval(text):
+    text = text.strip()
+    if '-' in text:
+        start, end = text.split('-', 1)
+        return ip_to_int(start.strip()), ip_to_int(end.strip())
+    # "ip mask" with any amount of whitespace, or "ip/prefix"
+    network = ipaddress.IPv4Network('/'.join(text.replace('/', ' ').split()),
+                                    strict=False)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+# return (start, end) integers for an ipmask or iprange address object, or None
+# created: 2026-10-18
+# last modified: 2026-10-18
+def addr_interval(addr_object):
+    try:
+        addr_type = addr_object.get('type', 'ipmask')
+        if addr_type == 'ipmask':
+            return ip_interval(addr_object['subnet'])
+        if addr_type == 'iprange':
+            return (ip_to_int(addr_object['start-ip']),
+                    ip_to_int(addr_object['end-ip']))
+    except Exception:
+        pass
+    return None
+
+
+# split an integer IPv4 interval into the fewest CIDR blocks
+# returns a list of (prefix length, network integer)
+# created: 2026-10-18
+# last modified: 2026-10-18
+def cidr_blocks(start, end):
+    blocks = []
+    while start <= end:
+        # largest block aligned on start that does not pass end
+        size = (start & -start) if start else 1 << 32
+        while start + size - 1 > end:
+            size >>= 1
+        blocks.append((33 - size.bit_length(), start))
+        start += size
+    return blocks
+
+
+# return the names of references in a policy field ([{'name': ...}, ...])
+# created: 2026-10-18
+# last modified: 2026-10-18
+def ref_names(refs):
+    try:
+        return [ref['name'] for ref in refs]
+    except Exception:
+        return []
+
+
+# snapshot file layout
+#   magic (8 bytes) | metadata offset, metadata length (2 x uint64 little endian)
+#   per table: objects as compact JSON back to back | object offsets (uint64, native
+#     byte order, count + 1 entries, relative to the table start) | keys (JSON list)
+#   metadata (JSON): revision, device, byte order and per-table offsets
+snapshot_magic = b'FGTSNAP1'
+
+# cmdb tables saved by fgt_api_token.load_snapshot() by default: path -> key field
+default_snapshot_tables = {'firewall/address/': 'name', 'firewall/policy/': 'policyid'}
+
+
+# write a snapshot file
+# "tables" is an iterable of (table name, key field, iterable of objects); objects
+#   are written as they arrive, so a table never has to be held in memory
+# the file is written next to "path" and renamed into place when complete; the
+#   partial file is removed if reading the tables or writing fails
+# created: 2026-10-18
+# last modified: 2026-10-18
+def write_snapshot(path, tables, revision=None, device=None):
+    temp_path = path + '.tmp'
+    table_info = {}
+    try:
+        with open(temp_path, 'wb') as out:
+            out.write(snapshot_magic + bytes(16))
+            for name, key_field, objects in tables:
+                data_offset = out.tell()
+                offsets = array.array('Q', [0])
+                keys = []
+                position = 0
+                for obj in objects:
+                    blob = json.dumps(obj, separators=(',', ':')).encode()
+                    out.write(blob)
+                    position += len(blob)
+                    offsets.append(position)
+                    keys.append(obj.get(key_field))
+                # align the offsets array
+                out.write(bytes(-out.tell() % 8))
+                index_offset = out.tell()
+                out.write(offsets.tobytes())
+                keys_blob = json.dumps(keys, separators=(',', ':')).encode()
+                keys_offset = out.tell()
+                out.write(keys_blob)
+                table_info[name] = {'key': key_field, 'count': len(keys),
+                                    'data': data_offset, 'index': index_offset,
+                                    'keys': keys_offset, 'keys_length': len(keys_blob)}
+            meta = json.dumps({'revision': revision, 'device': device,
+                               'byteorder': sys.byteorder, 'created': time.time(),
+                               'tables': table_info}).encode()
+            meta_offset = out.tell()
+            out.write(meta)
+            out.seek(len(snapshot_magic))
+            out.write(struct.pack('<QQ', meta_offset, len(meta)))
+    except BaseException:
+        # do not leave a partial file behind
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    os.replace(temp_path, path)
+
+
+# fgt_snapshot_table
+# one table of an fgt_snapshot; objects are decoded from the memory map only when
+#   they are accessed
+# the key list is decoded on the first lookup by key
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_snapshot_table:
+    def __init__(self, buffer, name, info):
+        self.buffer = buffer
+        self.name = name
+        self.key_field = info['key']
+        self.count = info['count']
+        self.data = info['data']
+        self.keys_range = (info['keys'], info['keys'] + info['keys_length'])
+        index = info['index']
+        self.offsets = memoryview(buffer)[index:index + 8 * (self.count + 1)].cast('Q')
+        self.key_list = None
+        self.positions = None
+
+    def __len__(self):
+        return self.count
+
+    # decode the object at a position
+    def object_at(self, position):
+        start = self.data + self.offsets[position]
+        end = self.data + self.offsets[position + 1]
+        return json_loads(self.buffer[start:end])
+
+    # yield every object in table order
+    def __iter__(self):
+        for position in range(self.count):
+            yield self.object_at(position)
+
+    # list of object keys in table order
+    def keys(self):
+        if self.key_list is None:
+            self.key_list = json_loads(self.buffer[self.keys_range[0]:self.keys_range[1]])
+        return self.key_list
+
+    # get an object by key, or "default"
+    def get(self, key, default=None):
+        if self.positions is None:
+            self.positions = {obj_key: position
+                              for position, obj_key in enumerate(self.keys())}
+        position = self.positions.get(key)
+        if position is None:
+            return default
+        return self.object_at(position)
+
+    def __getitem__(self, key):
+        obj = self.get(key)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    # release the memory map view
+    def release(self):
+        self.offsets.release()
+
+
+# fgt_snapshot
+# read-only, memory-mapped snapshot of cmdb tables written by write_snapshot()
+# opening a snapshot reads only its metadata; tables are looked up with table()
+#   or snapshot['firewall/address/']
+# raises ValueError if the file is not a snapshot or was written on a machine with
+#   a different byte order
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_snapshot:
+    def __init__(self, path):
+        self.path = path
+        # True when load_snapshot() had to fetch the tables from the FortiGate
+        self.fetched = False
+        with open(path, 'rb') as snapshot_file:
+            self.buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self.buffer[:len(snapshot_magic)] != snapshot_magic:
+                raise ValueError('not a snapshot file: ' + path)
+            meta_offset, meta_length = struct.unpack_from('<QQ', self.buffer,
+                                                          len(snapshot_magic))
+            self.meta = json.loads(self.buffer[meta_offset:meta_offset + meta_length])
+            if self.meta['byteorder'] != sys.byteorder:
+                raise ValueError('snapshot written with a different byte order')
+        except Exception:
+            self.buffer.close()
+            raise
+        self.revision = self.meta['revision']
+        self.device = self.meta['device']
+        self.tables = {name: fgt_snapshot_table(self.buffer, name, info)
+                       for name, info in self.meta['tables'].items()}
+
+    # return a table by name (cmdb path, e.g. 'firewall/address/')
+    def table(self, name):
+        return self.tables[name]
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    # close the memory map
+    def close(self):
+        for table in self.tables.values():
+            table.release()
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# fgt_mirror
+# local, indexed copy of the address and policy tables of one FortiGate
+# indexes:
+#   name -> address object, policyid -> policy
+#   IP index: every ipmask/iprange address is stored as CIDR blocks, one dict and one
+#     sorted list per prefix length, so containment and overlap queries cost a few
+#     dict lookups and bisects per prefix length instead of a table scan
+#   address name -> policyids that reference it in srcaddr/dstaddr
+#   interface name -> policyids, for srcintf and dstintf
+# refresh() checks the config revision first and, when it has changed, applies only
+#   the objects that differ, so unchanged objects are not re-indexed
+# group membership is not expanded; references are the names used in each policy
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_mirror:
+    def __init__(self, client):
+        self.client = client
+        self.revision = None
+        self.addresses = {}
+        self.policies = {}
+        # prefix length -> {network integer: set of address names}
+        self.ip_blocks = [dict() for plen in range(33)]
+        # prefix length -> sorted list of network integers in ip_blocks
+        self.ip_sorted = [list() for plen in range(33)]
+        # address name -> (start, end, blocks)
+        self.addr_ranges = {}
+        self.addr_policies = collections.defaultdict(set)
+        self.srcintf_policies = collections.defaultdict(set)
+        self.dstintf_policies = collections.defaultdict(set)
+
+    #####
+    # index maintenance
+    #####
+
+    # add an address object to the indexes, replacing any object with the same name
+    def index_address(self, addr_object):
+        name = addr_object['name']
+        if name in self.addresses:
+            self.unindex_address(name)
+        self.addresses[name] = addr_object
+        interval = addr_interval(addr_object)
+        if interval is None:
+            return
+        blocks = cidr_blocks(interval[0], interval[1])
+        self.addr_ranges[name] = (interval[0], interval[1], blocks)
+        for plen, net in blocks:
+            names = self.ip_blocks[plen].get(net)
+            if names is None:
+                names = self.ip_blocks[plen][net] = set()
+                bisect.insort(self.ip_sorted[plen], net)
+            names.add(name)
+
+    # remove an address object from the indexes
+    def unindex_address(self, name):
+        self.addresses.pop(name, None)
+        addr_range = self.addr_ranges.pop(name, None)
+        if addr_range is None:
+            return
+        for plen, net in addr_range[2]:
+            names = self.ip_blocks[plen][net]
+            names.discard(name)
+            if not names:
+                del self.ip_blocks[plen][net]
+                nets = self.ip_sorted[plen]
+                del nets[bisect.bisect_left(nets, net)]
+
+    # policy fields used by the reverse indexes
+    def policy_refs(self, policy):
+        return (ref_names(policy.get('srcaddr', [])) + ref_names(policy.get('dstaddr', [])),
+                ref_names(policy.get('srcintf', [])),
+                ref_names(policy.get('dstintf', [])))
+
+    # add a policy to the indexes, replacing any policy with the same policyid
+    def index_policy(self, policy):
+        policyid = policy['policyid']
+        if policyid in self.policies:
+            self.unindex_policy(policyid)
+        self.policies[policyid] = policy
+        addrs, srcintfs, dstintfs = self.policy_refs(policy)
+        for name in addrs:
+            self.addr_policies[name].add(policyid)
+        for name in srcintfs:
+            self.srcintf_policies[name].add(policyid)
+        for name in dstintfs:
+            self.dstintf_policies[name].add(policyid)
+
+    # remove a policy from the indexes
+    def unindex_policy(self, policyid):
+        policy = self.policies.pop(policyid, None)
+        if policy is None:
+            return
+        addrs, srcintfs, dstintfs = self.policy_refs(policy)
+        for index, names in ((self.addr_policies, addrs),
+                             (self.srcintf_policies, srcintfs),
+                             (self.dstintf_policies, dstintfs)):
+            for name in names:
+                index[name].discard(policyid)
+                if not index[name]:
+                    del index[name]
+
+    # apply a fresh copy of a table, touching only objects that changed
+    # returns (added, changed, removed)
+    def apply_table(self, current, objects, key, index, unindex):
+        added = changed = 0
+        seen = set()
+        for obj in objects:
+            obj_key = obj[key]
+            seen.add(obj_key)
+            old = current.get(obj_key)
+            if old is None:
+                added += 1
+            elif old != obj:
+                changed += 1
+            else:
+                continue
+            index(obj)
+        removed = [obj_key for obj_key in current if obj_key not in seen]
+        for obj_key in removed:
+            unindex(obj_key)
+        return added, changed, len(removed)
+
+    #####
+    # loading from the FortiGate
+    #####
+
+    # load or refresh both tables from the FortiGate
+    # if "force" is False and the config revision is unchanged, nothing is fetched
+    # returns a dict of per-table (added, changed, removed) counts, or None if the
+    #   revision was unchanged
+    # keyword arguments are passed to fgt_api_token.iter_pages()
+    def refresh(self, force=False, **page_options):
+        revision = self.client.config_revision()
+        if not force and revision is not None and revision == self.revision:
+            return None
+        report = {}
+        report['addresses'] = self.apply_table(
+            self.addresses, self.client.iter_addresses(**page_options), 'name',
+            self.index_address, self.unindex_address)
+        report['policies'] = self.apply_table(
+            self.policies, self.client.iter_policies(**page_options), 'policyid',
+            self.index_policy, self.unindex_policy)
+        self.revision = revision
+        return report
+
+    #####
+    # queries
+    #####
+
+    # get an address object by name
+    def address(self, name):
+        return self.addresses.get(name)
+
+    # get a policy by policyid
+    def policy(self, policyid):
+        return self.policies.get(policyid)
+
+    # names of ipmask/iprange addresses that contain an IP address
+    def addresses_containing(self, ip):
+        ip = ip_to_int(ip)
+        names = set()
+        for plen in range(33):
+            net = ip & (((1 << plen) - 1) << (32 - plen))
+            names.update(self.ip_blocks[plen].get(net, ()))
+        return sorted(names)
+
+    # names of addresses with a block inside the interval [start, end]
+    def blocks_within(self, start, end):
+        names = set()
+        for plen in range(33):
+            nets = self.ip_sorted[plen]
+            size = 1 << (32 - plen)
+            for pos in range(bisect.bisect_left(nets, start), len(nets)):
+                net = nets[pos]
+                if net + size - 1 > end:
+                    break
+                names.update(self.ip_blocks[plen][net])
+        return names
+
+    # names of addresses that overlap a subnet or range (see ip_interval)
+    def addresses_overlapping(self, subnet):
+        start, end = ip_interval(subnet)
+        names = set()
+        for plen, net in cidr_blocks(start, end):
+            # addresses containing this block
+            for shorter in range(plen + 1):
+                mask = ((1 << shorter) - 1) << (32 - shorter)
+                names.update(self.ip_blocks[shorter].get(net & mask, ()))
+            # addresses inside this block
+            names.update(self.blocks_within(net, net + (1 << (32 - plen)) - 1))
+        return sorted(names)
+
+    # names of addresses entirely inside a subnet or range (see ip_interval)
+    def addresses_within(self, subnet):
+        start, end = ip_interval(subnet)
+        return sorted(name for name in self.blocks_within(start, end)
+                      if self.addr_ranges[name][0] >= start and
+                      self.addr_ranges[name][1] <= end)
+
+    # policyids that reference an address (or group) name in srcaddr or dstaddr
+    def policies_using(self, addr_name):
+        return sorted(self.addr_policies.get(addr_name, ()))
+
+    # policyids from srcintf to dstintf; either may be None to match any interface
+    def policies_between(self, srcintf=None, dstintf=None):
+        if srcintf is None and dstintf is None:
+            return sorted(self.policies)
+        if srcintf is None:
+            return sorted(self.dstintf_policies.get(dstintf, ()))
+        if dstintf is None:
+            return sorted(self.srcintf_policies.get(srcintf, ()))
+        return sorted(self.srcintf_policies.get(srcintf, set()) &
+                      self.dstintf_policies.get(dstintf, set()))
+
+
+# normalize a cmdb value for comparison, or (with sort=False) for sending
+# drops q_origin_key from references, turns a list of names into a list of
+#   {'name': ...} references and, if "sort" is True, sorts references by name
+# created: 2026-10-18
+# last modified: 2026-10-18
+def normalize_value(value, sort=True):
+    if type(value) is dict:
+        return {key: normalize_value(item, sort) for key, item in value.items()
+                if key != 'q_origin_key'}
+    if type(value) is list:
+        items = [{'name': item} if type(item) is str else normalize_value(item, sort)
+                 for item in value]
+        if sort and all(type(item) is dict and 'name' in item for item in items):
+            items.sort(key=lambda item: str(item['name']))
+        return items
+    return value
+
+
+# True if a desired field value matches the current value
+# subnets are compared as IP intervals, so "10.0.0.0/24" matches
+#   "10.0.0.0 255.255.255.0"
+# created: 2026-10-18
+# last modified: 2026-10-18
+def same_value(field, current, desired):
+    if field == 'subnet' and type(current) is str and type(desired) is str:
+        try:
+            return ip_interval(current) == ip_interval(desired)
+        except Exception:
+            pass
+    return normalize_value(current) == normalize_value(desired)
+
+
+# fgt_sync_plan
+# minimal set of changes that brings one cmdb table to a desired state
+# "creates" is a list of desired objects
+# "updates" is a list of (key, url_key, {field: (current, desired)})
+# "deletes" is a list of (key, url_key)
+# url_key is the value used in the object URL (name for addresses, policyid for
+#   policies), key is the value used to match desired and current objects
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_sync_plan:
+    def __init__(self, table, api_url):
+        self.table = table
+        self.api_url = api_url
+        self.creates = []
+        self.updates = []
+        self.deletes = []
+
+    # number of changes in the plan
+    def __len__(self):
+        return len(self.creates) + len(self.updates) + len(self.deletes)
+
+    # request items (key, api_url, json_data) for fgt_api_token.run_bulk()
+    # shorthand in desired values (e.g. srcaddr: ['all']) is sent in the
+    #   [{'name': ...}] form FortiOS expects
+    def create_items(self):
+        return [(obj.get('name'), self.api_url, normalize_value(obj, sort=False))
+                for obj in self.creates]
+
+    def update_items(self):
+        return [(key, self.api_url + urllib.parse.quote(str(url_key), safe=''),
+                 {field: normalize_value(change[1], sort=False)
+                  for field, change in changes.items()})
+                for key, url_key, changes in self.updates]
+
+    def delete_items(self):
+        return [(key, self.api_url + urllib.parse.quote(str(url_key), safe=''), None)
+                for key, url_key in self.deletes]
+
+    # dry-run output, one line per change
+    def format(self):
+        lines = []
+        for obj in self.creates:
+            lines.append('+ %s %s %s' % (self.table, obj.get('name'), json.dumps(obj)))
+        for key, url_key, changes in self.updates:
+            for field, (current, desired) in sorted(changes.items()):
+                lines.append('~ %s %s %s: %s -> %s' %
+                             (self.table, key, field, json.dumps(current),
+                              json.dumps(desired)))
+        for key, url_key in self.deletes:
+            lines.append('- %s %s' % (self.table, key))
+        lines.append('%s: %d to create, %d to update, %d to delete' %
+                     (self.table, len(self.creates), len(self.updates),
+                      len(self.deletes)))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format()
+
+
+# compare current and desired objects of one table and fill a fgt_sync_plan
+# only the fields present in a desired object are compared and sent
+# if "prune" is True, current objects missing from the desired state are deleted
+# created: 2026-10-18
+# last modified: 2026-10-18
+def diff_table(plan, current_objects, desired_objects, key, url_key, prune=False):
+    current = {obj[key]: obj for obj in current_objects}
+    seen = set()
+    for desired in desired_objects:
+        obj_key = desired[key]
+        seen.add(obj_key)
+        obj = current.get(obj_key)
+        if obj is None:
+            plan.creates.append(desired)
+            continue
+        changes = {}
+        for field, value in desired.items():
+            if field == url_key:
+                continue
+            if field not in obj or not same_value(field, obj[field], value):
+                changes[field] = (obj.get(field), value)
+        if changes:
+            plan.updates.append((obj_key, obj[url_key], changes))
+    if prune:
+        for obj_key, obj in current.items():
+            if obj_key not in seen:
+                plan.deletes.append((obj_key, obj[url_key]))
+    return plan
+
+
+# fgt_sync
+# reconcile address objects and policies on a FortiGate with a desired state
+# plan_*() read the current table once, projected with "format" to the fields used
+#   by the desired state, and return a fgt_sync_plan; print it for a dry run
+# apply() sends only the planned creates (POST), updates (PUT of changed fields)
+#   and deletes (DELETE), in dependency order: addresses are created before
+#   policies and deleted after them
+# with "transaction", every step runs in one config transaction that is committed
+#   only if every change succeeded, so a failed sync leaves the device unchanged
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_sync:
+    def __init__(self, client):
+        self.client = client
+
+    # read a table projected to the fields used by the desired objects
+    def current_table(self, iter_table, desired_objects, key, url_key, page_options):
+        fields = {key, url_key}
+        for desired in desired_objects:
+            fields.update(desired.keys())
+        options = page_options.get('options') or fgt_options()
+        page_options = dict(page_options, options=options.merge(format=sorted(fields)))
+        return list(iter_table(**page_options))
+
+    # plan address changes; "desired" is an iterable of address dicts keyed by name
+    def plan_addresses(self, desired, prune=False, **page_options):
+        desired = list(desired)
+        plan = fgt_sync_plan('address', self.client.cmdb_addr)
+        current = self.current_table(self.client.iter_addresses, desired, 'name',
+                                     'name', page_options)
+        return diff_table(plan, current, desired, 'name', 'name', prune)
+
+    # plan policy changes; "desired" is an iterable of policy dicts
+    # "key" is the field used to match policies ('policyid' or a unique 'name')
+    def plan_policies(self, desired, key='policyid', prune=False, **page_options):
+        desired = list(desired)
+        plan = fgt_sync_plan('policy', self.client.cmdb_policy)
+        current = self.current_table(self.client.iter_policies, desired, key,
+                                     'policyid', page_options)
+        return diff_table(plan, current, desired, key, 'policyid', prune)
+
+    # apply plans and return a list of (table, action, fgt_bulk_report)
+    # policies are created one at a time so they keep the order of the plan
+    # every report carries the state of the shared transaction, if one was used
+    def apply(self, address_plan=None, policy_plan=None, parallelism=8,
+              transaction=False, options=None):
+        steps = []
+        if address_plan is not None:
+            steps.append((address_plan, 'create', 'POST',
+                          address_plan.create_items(), parallelism))
+            steps.append((address_plan, 'update', 'PUT',
+                          address_plan.update_items(), parallelism))
+        if policy_plan is not None:
+            steps.append((policy_plan, 'create', 'POST',
+                          policy_plan.create_items(), 1))
+            steps.append((policy_plan, 'update', 'PUT',
+                          policy_plan.update_items(), parallelism))
+            steps.append((policy_plan, 'delete', 'DELETE',
+                          policy_plan.delete_items(), parallelism))
+        if address_plan is not None:
+            steps.append((address_plan, 'delete', 'DELETE',
+                          address_plan.delete_items(), parallelism))
+        client = self.client
+        headers = None
+        transaction_id = None
+        if transaction:
+            transaction_id = client.transaction_start(options=options)
+            if transaction_id is not None:
+                headers = dict(client.call_args(options)[1])
+                headers['X-TRANSACTION-ID'] = str(transaction_id)
+        reports = []
+        for plan, action, method, items, workers in steps:
+            if items:
+                report = client.bulk_report(method, items, workers, headers, options)
+                reports.append((plan.table, action, report))
+                # the transaction is aborted anyway, so later steps are not sent
+                if transaction_id is not None and report.failed:
+                    break
+        state = None
+        if transaction and transaction_id is None:
+            state = 'unsupported'
+        elif transaction_id is not None:
+            if (all(report.failed == 0 for table, action, report in reports) and
+                client.transaction_commit(transaction_id, options)):
+                state = 'committed'
+            else:
+                client.transaction_abort(transaction_id, options)
+                state = 'aborted'
+        for table, action, report in reports:
+            report.transaction = state
+        return reports
+
+
+# return the indices of one longest strictly increasing subsequence of "values"
+# patience sorting, O(n log n)
+# created: 2026-10-18
+# last modified: 2026-10-18
+def longest_increasing_subsequence(values):
+    # tails[k] is the index of the smallest tail of an increasing run of length k+1
+    tails = []
+    tail_values = []
+    previous = [-1] * len(values)
+    for index, value in enumerate(values):
+        pos = bisect.bisect_left(tail_values, value)
+        if pos > 0:
+            previous[index] = tails[pos - 1]
+        if pos == len(tails):
+            tails.append(index)
+            tail_values.append(value)
+        else:
+            tails[pos] = index
+            tail_values[pos] = value
+    result = []
+    index = tails[-1] if tails else -1
+    while index != -1:
+        result.append(index)
+        index = previous[index]
+    result.reverse()
+    return result
+
+
+# fgt_reorder_plan
+# minimal policy moves that turn "current" order into "target" order
+# policies on a longest increasing subsequence (by target position) stay put, every
+#   other policy is moved once, in target order, next to a policy already in place
+# "moves" is a list of (policyid, ref_policyid, 'before'|'after')
+# "naive_calls" is the number of policies whose position changes, i.e. the PUTs
+#   needed when every out-of-place policy is moved; "saved_calls" is the difference
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_reorder_plan:
+    def __init__(self, current, target):
+        current = list(current)
+        target = list(target)
+        if sorted(current) != sorted(target) or len(set(target)) != len(target):
+            raise ValueError('target order must contain every current policyid once')
+        position = {policyid: index for index, policyid in enumerate(target)}
+        stay = set(current[index] for index in
+                   longest_increasing_subsequence([position[p] for p in current]))
+        self.current = current
+        self.target = target
+        self.moves = []
+        for index, policyid in enumerate(target):
+            if policyid in stay:
+                continue
+            if index > 0:
+                self.moves.append((policyid, target[index - 1], 'after'))
+            else:
+                # first policy: put it before the first policy that stays
+                ref = next(p for p in target if p in stay)
+                self.moves.append((policyid, ref, 'before'))
+        self.naive_calls = sum(1 for index, policyid in enumerate(current)
+                               if target[index] != policyid)
+        self.saved_calls = self.naive_calls - len(self.moves)
+        # responses of executed moves, filled by fgt_api_token.reorder_policies()
+        self.responses = []
+
+    def format(self):
+        lines = ['move %s %s %s' % move for move in self.moves]
+        lines.append('%d moves (%d without planning, %d calls saved)' %
+                     (len(self.moves), self.naive_calls, self.saved_calls))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format()
+
+
+# valid fortigate country codes as of 2019-01-07, as one string that is split
+#   into a set by country_codes() on first use
+fgt_country_data = (
+    'ZZ O1 AD AE AF AG AI AL AM AN AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG '
+    'BH BI BJ BL BM BN BO BQ BR BS BT BV BW BY BZ CA CC CD CF CG CH CI CK CL CM '
+    'CN CO CR CU CV CW CX CY CZ DE DJ DK DM DO DZ EC EE EG EH ER ES ET FI FJ FK '
+    'FM FO FR GA GB GD GE GF GG GH GI GL GM GN GP GQ GR GS GT GU GW GY HK HM HN '
+    'HR HT HU ID IE IL IM IN IO IQ IR IS IT JE JM JO JP KE KG KH KI KM KN KP KR '
+    'KW KY KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME MF MG MH MK ML MM MN '
+    'MO MP MQ MR MS MT MU MV MW MX MY MZ NA NC NE NF NG NI NL NO NP NR NU NZ OM '
+    'PA PE PF PG PH PK PL PM PN PR PS PT PW PY QA RE RO RS RU RW SA SB SC SD SE '
+    'SG SH SI SJ SK SL SM SN SO SR SS ST SV SX SY SZ TC TD TF TG TH TJ TK TL TM '
+    'TN TO TR TT TV TW TZ UA UG UM US UY UZ VA VC VE VG VI VN VU WF WS XK YE YT '
+    'ZA ZM ZW')
+fgt_country_codes = None
+
+
+# return the set of valid fortigate country codes
+# created: 2026-10-18
+# last modified: 2026-10-18
+def country_codes():
+    global fgt_country_codes
+    if fgt_country_codes is None:
+        fgt_country_codes = frozenset(fgt_country_data.split())
+    return fgt_country_codes
+
+
+# validate fortigate country value
+# created: 2019-01-07
+# last modified: 2026-10-18
+def valid_fgt_cn(addr_country):
+    try:
+        return addr_country in country_codes()
+    except TypeError:
+        return False
 
 
 # receive fgt color value, change all invalid colors to 0
@@ -638,3 +4826,12 @@ def color_std(color_index):
         color_index = 0
 
     return color_index
+
+
+# "python -m fgt_api" runs the fleet export command line in fgt_export.py
+# fgt_export imports this module as fgt_api; registering the running __main__
+#   module under that name keeps it from being loaded a second time
+if __name__ == '__main__':
+    sys.modules['fgt_api'] = sys.modules[__name__]
+    import fgt_export
+    sys.exit(fgt_export.main())
@@ -0,0 +1,268 @@
+#!/usr/local/bin/python3
+
+# file: fgt_cassette.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# record FortiGate API traffic to a cassette file and replay it later without a
+#   FortiGate, for offline tests and load generation
+
+# notes:
+# both classes are transports for fgt_api_token.set_transport()
+# a cassette is a JSON lines file with one request/response exchange per line;
+#   ".gz" files are compressed
+# see replay_scaling() for driving many replayed clients at once
+
+import base64
+import gzip
+import json
+import threading
+import time
+import urllib.parse
+
+from fgt_api import (fgt_api_error, fgt_api_token, fgt_lazy_module, json_loads)
+
+# HTTP stack, imported on first request
+requests = fgt_lazy_module('requests', namespace=globals())
+
+
+# response headers left out of cassettes
+cassette_skip_headers = frozenset(('date', 'set-cookie', 'connection', 'keep-alive',
+                                   'content-length', 'transfer-encoding',
+                                   'content-encoding'))
+
+
+# open a cassette file for reading or writing text, gzip-compressed if the name
+#   ends with .gz
+# created: 2026-10-18
+# last modified: 2026-10-18
+def open_cassette(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+# URL parameters as a sorted list of [name, value] with string values, as stored
+#   in cassettes; access_token is left out so tokens never reach the cassette
+# created: 2026-10-18
+# last modified: 2026-10-18
+def cassette_params(params):
+    items = []
+    for name, value in (params or {}).items():
+        if name == 'access_token':
+            continue
+        if type(value) in (list, tuple):
+            value = [str(item) for item in value]
+        else:
+            value = str(value)
+        items.append([name, value])
+    items.sort()
+    return items
+
+
+# match key of a request: method, URL path and cassette_params() (and the body)
+# the host is not part of the key, so a cassette recorded from one FortiGate
+#   replays against any host
+# created: 2026-10-18
+# last modified: 2026-10-18
+def cassette_key(method, path, params, json_data=None, match_body=False):
+    key = [method, path, params]
+    if match_body:
+        key.append(json_data)
+    return json.dumps(key, sort_keys=True, separators=(',', ':'))
+
+
+# fgt_cassette_recorder
+# transport that sends requests over the client's connection pool and appends
+#   each exchange to a cassette file (JSON lines, gzip if the name ends in .gz)
+# a line holds method, URL path, parameters, request body, status, response
+#   headers, body and elapsed seconds; the Authorization header and access_token
+#   are never written
+# streamed responses are read in full so they can be recorded
+# use with fgt_api_token.set_transport(); close() when done
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_cassette_recorder:
+    def __init__(self, path, append=False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open_cassette(path, 'a' if append else 'w')
+        self.recorded = 0
+
+    # send a request for "client" and record it
+    def request(self, client, method, api_url, params, headers, json_data, stream):
+        client.set_url_warn(client.cert_verify)
+        session = client.get_session()
+        start = time.perf_counter()
+        response = session.request(method, api_url, params=params, headers=headers,
+                                   json=json_data, verify=client.cert_verify,
+                                   timeout=client.timeout, stream=stream)
+        content = response.content
+        elapsed = time.perf_counter() - start
+        exchange = {'method': method, 'path': urllib.parse.urlsplit(api_url).path,
+                    'params': cassette_params(params),
+                    'json': json_data, 'status': response.status_code,
+                    'headers': {name: value for name, value in response.headers.items()
+                                if name.lower() not in cassette_skip_headers},
+                    'elapsed': round(elapsed, 6)}
+        try:
+            exchange['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            exchange['body64'] = base64.b64encode(content).decode('ascii')
+        line = json.dumps(exchange, separators=(',', ':')) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.recorded += 1
+        return response
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+# fgt_cassette_replay
+# transport that answers requests from a cassette written by fgt_cassette_recorder,
+#   with no network
+# requests are matched on method, URL path and parameters (and the JSON body if
+#   "match_body" is True); repeated requests get the recorded responses in order,
+#   and once they run out start again from the first ("cycle"), keep returning the
+#   last one ("last") or fail ("error")
+# if "latency" is True each response is delayed by its recorded time divided by
+#   "speed"; "max_concurrency" limits how many requests are answered at once, as a
+#   stand-in for a device that can only work on so many requests in parallel
+# a request without a recording fails like a connection error (the response is
+#   None) and its key is added to "missed"; requests whose parameters depend on
+#   timing, such as adaptive page sizes, only replay reliably with
+#   iter_pages(adaptive=False)
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_cassette_replay:
+    def __init__(self, path, latency=False, speed=1.0, max_concurrency=None,
+                 exhausted='cycle', match_body=False):
+        self.latency = latency
+        self.speed = speed
+        self.exhausted = exhausted
+        self.match_body = match_body
+        self.lock = threading.Lock()
+        self.slots = None
+        if max_concurrency:
+            self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.exchanges = {}
+        self.positions = {}
+        self.missed = set()
+        self.replayed = 0
+        with open_cassette(path, 'r') as cassette:
+            for line in cassette:
+                if not line.strip():
+                    continue
+                exchange = json_loads(line)
+                key = cassette_key(exchange['method'], exchange['path'],
+                                   exchange['params'], exchange.get('json'), match_body)
+                if 'body64' in exchange:
+                    body = base64.b64decode(exchange['body64'])
+                else:
+                    body = exchange['body'].encode('utf-8')
+                self.exchanges.setdefault(key, []).append(
+                    (exchange['status'], exchange['headers'], body,
+                     exchange.get('elapsed', 0.0)))
+
+    # recorded exchange for a request key, following the "exhausted" rule
+    def next_exchange(self, key):
+        with self.lock:
+            exchanges = self.exchanges.get(key)
+            if exchanges is None:
+                self.missed.add(key)
+                return None
+            position = self.positions.get(key, 0)
+            if position >= len(exchanges):
+                if self.exhausted == 'cycle':
+                    position = 0
+                elif self.exhausted == 'last':
+                    position = len(exchanges) - 1
+                else:
+                    self.missed.add(key)
+                    return None
+            self.positions[key] = position + 1
+            self.replayed += 1
+            return exchanges[position]
+
+    # answer a request for "client" from the cassette
+    def request(self, client, method, api_url, params, headers, json_data, stream):
+        key = cassette_key(method, urllib.parse.urlsplit(api_url).path,
+                           cassette_params(params), json_data, self.match_body)
+        exchange = self.next_exchange(key)
+        if exchange is None:
+            raise fgt_api_error('no recorded response for ' + method + ' ' + api_url)
+        status, response_headers, body, elapsed = exchange
+        if self.slots is not None:
+            self.slots.acquire()
+        try:
+            if self.latency and elapsed > 0:
+                time.sleep(elapsed / self.speed)
+        finally:
+            if self.slots is not None:
+                self.slots.release()
+        response = requests.Response()
+        response.status_code = status
+        response.headers = requests.structures.CaseInsensitiveDict(response_headers)
+        response._content = body
+        response._content_consumed = True
+        response.encoding = 'utf-8'
+        response.url = api_url
+        return response
+
+    # rewind every request to its first recorded response
+    def rewind(self):
+        with self.lock:
+            self.positions.clear()
+            self.missed.clear()
+            self.replayed = 0
+
+    def close(self):
+        pass
+
+
+# run "script(client)" against a cassette from 1, 2, 4... threads and report the
+#   throughput at each level, with no network
+# each level gets a fresh replay transport shared by one client per thread (made
+#   with "client_class"); every thread runs the script "repeat" times and a run
+#   that raises an exception is counted in "errors"
+# other keyword arguments are passed to fgt_cassette_replay (latency, speed,
+#   max_concurrency, ...)
+# returns {threads: {'runs', 'errors', 'requests', 'seconds', 'runs_per_second',
+#   'requests_per_second', 'missed'}}
+# created: 2026-10-18
+# last modified: 2026-10-18
+def replay_scaling(path, script, concurrency=(1, 2, 4, 8, 16), repeat=10,
+                   client_class=None, **replay_options):
+    if client_class is None:
+        client_class = fgt_api_token
+    results = {}
+    for threads in concurrency:
+        transport = fgt_cassette_replay(path, **replay_options)
+        errors = []
+
+        def worker():
+            client = client_class('replay', '127.0.0.1', 'replay')
+            client.set_transport(transport)
+            for run in range(repeat):
+                try:
+                    script(client)
+                except Exception as e:
+                    errors.append(e)
+
+        workers = [threading.Thread(target=worker) for index in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        results[threads] = {'runs': threads * repeat, 'errors': len(errors),
+                            'requests': transport.replayed,
+                            'seconds': elapsed,
+                            'runs_per_second': threads * repeat / elapsed,
+                            'requests_per_second': transport.replayed / elapsed,
+                            'missed': len(transport.missed)}
+    return results
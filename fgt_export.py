@@ -0,0 +1,449 @@
+#!/usr/local/bin/python3
+
+# file: fgt_export.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# fleet export command line: read endpoints from every FortiGate in an inventory
+#   file and write the objects to one JSON lines, Parquet or Arrow file
+
+# notes:
+# python -m fgt_api inventory.csv -e addresses policies -o export.jsonl
+#   (python -m fgt_export works too)
+# see main() for the options
+# pyarrow is only required for Parquet/Arrow exports
+
+import argparse
+import gzip
+import importlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from fgt_api import (fgt_fleet, fgt_lazy_module, fgt_options, json_dumps,
+                     module_available, page_results)
+from fgt_import import read_records
+
+# pyarrow is only required for Parquet/Arrow exports
+pyarrow = fgt_lazy_module('pyarrow', namespace=globals())
+
+
+# endpoints known to the export command: name -> (branch, path)
+# other endpoints can be given as cmdb/<path>/ or monitor/<path>/
+export_endpoints = {
+    'addresses': ('cmdb', 'firewall/address/'),
+    'addrgrps': ('cmdb', 'firewall/addrgrp/'),
+    'policies': ('cmdb', 'firewall/policy/'),
+    'services': ('cmdb', 'firewall.service/custom/'),
+    'servicegrps': ('cmdb', 'firewall.service/group/'),
+    'interfaces': ('cmdb', 'system/interface/'),
+    'vdoms': ('cmdb', 'system/vdom/'),
+    'firmware': ('monitor', 'system/firmware/'),
+    'policy-stats': ('monitor', 'firewall/policy/')}
+
+
+# return (branch, path) for an export endpoint name; raises ValueError if unknown
+# created: 2026-10-18
+# last modified: 2026-10-18
+def export_endpoint(name):
+    if name in export_endpoints:
+        return export_endpoints[name]
+    branch, separator, path = name.partition('/')
+    if branch in ('cmdb', 'monitor') and path:
+        if not path.endswith('/'):
+            path += '/'
+        return branch, path
+    raise ValueError('unknown endpoint: ' + name)
+
+
+# read an inventory file (.json list, JSON lines or .csv) into device dicts
+# CSV values are converted to the types fgt_device_client() expects; a device
+#   without "token" may name an environment variable holding it in "token_env"
+# created: 2026-10-18
+# last modified: 2026-10-18
+def read_inventory(path):
+    if path.lower().endswith('.json'):
+        with open(path) as inventory_file:
+            records = json.load(inventory_file)
+    else:
+        records = read_records(path)
+    devices = []
+    for device in records:
+        device = dict(device)
+        for field, convert in (('port', int), ('timeout', float),
+                               ('rate_limit', float), ('retries', int)):
+            if type(device.get(field)) is str:
+                device[field] = convert(device[field])
+        if type(device.get('cert_verify')) is str:
+            device['cert_verify'] = device['cert_verify'].lower() in ('true', 'yes', '1')
+        if 'token' not in device and 'token_env' in device:
+            device['token'] = os.environ[device['token_env']]
+        devices.append(device)
+    return devices
+
+
+# fgt_export_stats
+# progress counters shared by export workers, the writer and the progress thread
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_export_stats:
+    def __init__(self, devices):
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.devices = devices
+        self.done = 0
+        self.failed = 0
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, rows=0, size=0, done=0, failed=0):
+        with self.lock:
+            self.rows += rows
+            self.bytes += size
+            self.done += done
+            self.failed += failed
+
+    # one progress line
+    def line(self):
+        with self.lock:
+            elapsed = max(time.monotonic() - self.start_time, 1e-9)
+            return ('[%7.1fs] devices %d/%d (%d failed)  rows %d  %.0f rows/s  '
+                    '%.2f MB/s' % (elapsed, self.done, self.devices, self.failed,
+                                   self.rows, self.rows / elapsed,
+                                   self.bytes / elapsed / 1e6))
+
+
+# fgt_jsonl_writer
+# export writer for JSON lines: one {"device", "vdom", "endpoint", "object"} line
+#   per object, to a file (gzip if the name ends in .gz) or to stdout ('-')
+# rows are encoded by prepare() in the export workers; write() only writes bytes
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_jsonl_writer:
+    def __init__(self, path):
+        if path == '-':
+            self.file = sys.stdout.buffer
+        elif path.endswith('.gz'):
+            self.file = gzip.open(path, 'wb', compresslevel=1)
+        else:
+            self.file = open(path, 'wb')
+
+    # encode one page of objects; returns (payload, rows, bytes)
+    def prepare(self, endpoint, device, vdom, objects):
+        # the tags are the same for the whole page, so they are encoded once
+        prefix = json_dumps({'device': device, 'vdom': vdom, 'endpoint': endpoint,
+                             'object': None})[:-5]
+        payload = b''.join([prefix + json_dumps(obj) + b'}\n' for obj in objects])
+        return payload, len(objects), len(payload)
+
+    def write(self, payload):
+        self.file.write(payload)
+
+    def close(self):
+        if self.file is sys.stdout.buffer:
+            self.file.flush()
+        else:
+            self.file.close()
+
+
+# fgt_columnar_writer
+# export writer for Parquet or Arrow IPC files: one file per endpoint in the
+#   output directory (<endpoint>.parquet or <endpoint>.arrow)
+# columns are "device", "vdom" and the object's top-level fields (renamed to
+#   object.<field> if they clash); lists and dicts are stored as JSON text
+# the column types come from the first batch of an endpoint: int64, double and
+#   bool where every value fits, otherwise string; fields first seen later, and
+#   values that do not fit their column, are kept in the "_extra" JSON column
+# requires pyarrow
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_columnar_writer:
+    tag_columns = ('device', 'vdom')
+
+    def __init__(self, path, file_format='parquet', batch_rows=10000):
+        if not module_available('pyarrow'):
+            raise ImportError('Parquet/Arrow export requires the pyarrow module')
+        importlib.import_module('pyarrow.ipc')
+        importlib.import_module('pyarrow.parquet')
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.file_format = file_format
+        self.batch_rows = batch_rows
+        # endpoint -> [rows, schema, file writer]
+        self.tables = {}
+
+    # flatten one page of objects into row dicts; returns (payload, rows, bytes)
+    def prepare(self, endpoint, device, vdom, objects):
+        rows = []
+        size = 0
+        for obj in objects:
+            row = {'device': device, 'vdom': vdom}
+            for field, value in obj.items():
+                if field in self.tag_columns:
+                    field = 'object.' + field
+                if type(value) in (list, dict):
+                    value = json.dumps(value, separators=(',', ':'))
+                    size += len(value)
+                elif type(value) is str:
+                    size += len(value)
+                else:
+                    size += 8
+                row[field] = value
+            rows.append(row)
+        return (endpoint, rows), len(rows), size
+
+    def write(self, payload):
+        endpoint, rows = payload
+        table = self.tables.setdefault(endpoint, [[], None, None])
+        table[0].extend(rows)
+        if len(table[0]) >= self.batch_rows:
+            self.flush(endpoint, table)
+
+    # column type for a list of values
+    @staticmethod
+    def column_type(values):
+        types = set(type(value) for value in values if value is not None)
+        if types == {bool}:
+            return pyarrow.bool_()
+        if types == {int}:
+            return pyarrow.int64()
+        if types and types <= {int, float}:
+            return pyarrow.float64()
+        return pyarrow.string()
+
+    # write buffered rows of one endpoint as a record batch
+    def flush(self, endpoint, table):
+        rows, schema, writer = table
+        if not rows:
+            return
+        if schema is None:
+            fields = {}
+            for row in rows:
+                for field in row:
+                    fields.setdefault(field, None)
+            schema = pyarrow.schema(
+                [(field, self.column_type([row.get(field) for row in rows]))
+                 for field in fields] + [('_extra', pyarrow.string())])
+            file_name = os.path.join(self.path, endpoint.replace('/', '_') + '.' +
+                                     self.file_format)
+            if self.file_format == 'parquet':
+                writer = pyarrow.parquet.ParquetWriter(file_name, schema)
+            else:
+                writer = pyarrow.ipc.new_file(file_name, schema)
+            table[1] = schema
+            table[2] = writer
+        columns = {field.name: [] for field in schema}
+        extras = columns['_extra']
+        # (name, column, Python types accepted as is, or None for string columns)
+        checks = []
+        for field in schema:
+            if field.name == '_extra':
+                continue
+            if field.type == pyarrow.string():
+                accepted = None
+            elif field.type == pyarrow.int64():
+                accepted = (int,)
+            elif field.type == pyarrow.float64():
+                accepted = (int, float)
+            else:
+                accepted = (bool,)
+            checks.append((field.name, columns[field.name], accepted))
+        for row in rows:
+            extra = None
+            for name, column, accepted in checks:
+                value = row.pop(name, None)
+                if value is not None:
+                    if accepted is None:
+                        if type(value) is not str:
+                            value = json.dumps(value)
+                    elif type(value) not in accepted:
+                        extra = extra or {}
+                        extra[name] = value
+                        value = None
+                column.append(value)
+            if row:
+                extra = extra or {}
+                extra.update(row)
+            extras.append(None if extra is None else json.dumps(extra))
+        writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+        table[0] = []
+
+    def close(self):
+        for endpoint, table in self.tables.items():
+            self.flush(endpoint, table)
+            if table[2] is not None:
+                table[2].close()
+
+
+# export chosen endpoints from one device, passing each page to "emit"
+# emit(endpoint, device name, vdom, objects) is called from this thread
+# "vdoms" is a list of VDOM names, ['all'] for every VDOM, or None for the
+#   device's own VDOM; cmdb endpoints are read with paged, prefetched requests
+# returns the number of objects exported
+# created: 2026-10-18
+# last modified: 2026-10-18
+def export_device(client, endpoints, vdoms, emit, page_size=1000,
+                  request_timeout=None):
+    if request_timeout is not None:
+        client.set_timeout(request_timeout)
+    if vdoms == ['all']:
+        vdoms = client.vdom_names()
+    elif not vdoms:
+        vdoms = [client.vdom]
+    count = 0
+    for vdom in vdoms:
+        options = fgt_options(vdom=vdom)
+        for endpoint in endpoints:
+            branch, path = export_endpoint(endpoint)
+            if branch == 'cmdb':
+                for page in client.iter_pages(client.cmdb_base + path, page_size,
+                                              prefetch=True, options=options):
+                    emit(endpoint, client.name, vdom, page)
+                    count += len(page)
+            else:
+                results = page_results(client.api_get(client.monitor_base + path,
+                                                      options=options))
+                if type(results) is not list:
+                    results = [results]
+                emit(endpoint, client.name, vdom, results)
+                count += len(results)
+    return count
+
+
+# command line entry point: export endpoints from a fleet of devices
+# devices are exported "parallelism" at a time (fgt_fleet, thread mode); each page
+#   is encoded in the worker that fetched it and handed to one writer thread
+#   through a bounded queue, so writing never blocks more than one page per worker
+# progress goes to stderr every --progress seconds; the exit status is 1 if any
+#   device failed (rows already exported from a failed device are kept) or if
+#   writing the output failed, which also stops the export
+# created: 2026-10-18
+# last modified: 2026-10-18
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m fgt_api',
+        description='export cmdb/monitor endpoints from many FortiGates')
+    parser.add_argument('inventory',
+                        help='device list: .json, .jsonl or .csv with name, host, '
+                             'token (or token_env) and optional port, protocol, vdom, '
+                             'cert_verify, rate_limit, retries')
+    parser.add_argument('-e', '--endpoints', nargs='+', default=['addresses', 'policies'],
+                        help='endpoint names (%s) or cmdb/<path>, monitor/<path>' %
+                             ', '.join(sorted(export_endpoints)))
+    parser.add_argument('-o', '--output', default='-',
+                        help='JSON lines file (.gz to compress, - for stdout) or, '
+                             'for parquet/arrow, a directory')
+    parser.add_argument('-f', '--format', choices=['jsonl', 'parquet', 'arrow'],
+                        help='output format (default from the output name)')
+    parser.add_argument('--vdoms', nargs='+',
+                        help="VDOM names, or 'all' (default: each device's VDOM)")
+    parser.add_argument('-p', '--parallelism', type=int, default=32,
+                        help='devices exported at once')
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--request-timeout', type=float, default=60,
+                        help='HTTP timeout in seconds')
+    parser.add_argument('--device-timeout', type=float, default=3600,
+                        help='time limit per device in seconds')
+    parser.add_argument('--batch-rows', type=int, default=10000,
+                        help='rows per parquet/arrow record batch')
+    parser.add_argument('--progress', type=float, default=2.0,
+                        help='seconds between progress lines (0 for none)')
+    args = parser.parse_args(argv)
+
+    file_format = args.format
+    if file_format is None:
+        name = args.output.lower()
+        file_format = ('parquet' if name.endswith('parquet') else
+                       'arrow' if name.endswith('arrow') else 'jsonl')
+    for endpoint in args.endpoints:
+        try:
+            export_endpoint(endpoint)
+        except ValueError as e:
+            parser.error(str(e))
+    if file_format != 'jsonl' and not module_available('pyarrow'):
+        parser.error(file_format + ' output requires the pyarrow module')
+    devices = read_inventory(args.inventory)
+    if file_format == 'jsonl':
+        writer = fgt_jsonl_writer(args.output)
+    else:
+        writer = fgt_columnar_writer(args.output, file_format, args.batch_rows)
+
+    stats = fgt_export_stats(len(devices))
+    pages = queue.Queue(maxsize=2 * args.parallelism)
+    finished = threading.Event()
+    # exception that stopped the writer, if any
+    write_errors = []
+
+    def write_pages():
+        while True:
+            payload = pages.get()
+            if payload is None:
+                return
+            if write_errors:
+                # keep draining so the final put(None) cannot block
+                continue
+            try:
+                writer.write(payload)
+            except Exception as e:
+                write_errors.append(e)
+                finished.set()
+
+    def emit(endpoint, device, vdom, objects):
+        payload, rows, size = writer.prepare(endpoint, device, vdom, objects)
+        # a worker abandoned after its device timed out stops here once the
+        #   export is over, instead of blocking on a queue nobody reads
+        while True:
+            if finished.is_set():
+                raise RuntimeError('export finished')
+            try:
+                pages.put(payload, timeout=1)
+                break
+            except queue.Full:
+                pass
+        stats.add(rows, size)
+
+    def report_progress():
+        while not finished.wait(args.progress):
+            print(stats.line(), file=sys.stderr, flush=True)
+
+    writer_thread = threading.Thread(target=write_pages)
+    writer_thread.start()
+    if args.progress > 0:
+        threading.Thread(target=report_progress, daemon=True).start()
+    fleet = fgt_fleet(devices, max_in_flight=args.parallelism,
+                      timeout=args.device_timeout)
+    failures = 0
+    try:
+        for result in fleet.run(export_device, args.endpoints, args.vdoms, emit,
+                                args.page_size, args.request_timeout):
+            if write_errors:
+                break
+            if result.error is None:
+                stats.add(done=1)
+            else:
+                failures += 1
+                stats.add(done=1, failed=1)
+                print('%s: %s' % (result.name, result.error), file=sys.stderr,
+                      flush=True)
+    finally:
+        finished.set()
+        pages.put(None)
+        writer_thread.join()
+        try:
+            writer.close()
+        except Exception as e:
+            write_errors.append(e)
+        fleet.close()
+    print(stats.line(), file=sys.stderr, flush=True)
+    if write_errors:
+        print('write failed: %s' % write_errors[0], file=sys.stderr, flush=True)
+        return 1
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
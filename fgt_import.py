@@ -0,0 +1,332 @@
+#!/usr/local/bin/python3
+
+# file: fgt_import.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# read address records from CSV or JSON files and turn them into FortiGate address
+#   objects, for fgt_api_token.import_addresses()
+
+# notes:
+# read_records() streams records from a file; fgt_address_import validates,
+#   normalizes and deduplicates them and collects the rejects
+
+import csv
+import json
+import re
+import time
+
+from fgt_api import color_std, country_codes, json_loads
+
+
+# color_std() results for every valid color as int or string, for batch lookups
+color_values = dict([(index, index) for index in range(33)] +
+                    [(str(index), index) for index in range(33)])
+
+# dotted-quad octets and netmasks (as prefix length or dotted quad) for parsing
+#   addresses without ipaddress objects
+octet_values = {str(value): value for value in range(256)}
+netmask_prefixes = dict(
+    [(str(prefix), prefix) for prefix in range(33)] +
+    [('%d.%d.%d.%d' % tuple((0xffffffff << (32 - prefix)) >> shift & 255
+                            for shift in (24, 16, 8, 0)), prefix)
+     for prefix in range(33)])
+
+
+# dotted-quad IPv4 address to integer; raises ValueError if invalid
+# created: 2026-10-18
+# last modified: 2026-10-18
+def parse_ipv4(text):
+    parts = text.split('.')
+    if len(parts) != 4:
+        raise ValueError('invalid IPv4 address: ' + text)
+    try:
+        return ((octet_values[parts[0]] << 24) | (octet_values[parts[1]] << 16) |
+                (octet_values[parts[2]] << 8) | octet_values[parts[3]])
+    except KeyError:
+        raise ValueError('invalid IPv4 address: ' + text)
+
+
+# integer to dotted-quad IPv4 address
+# created: 2026-10-18
+# last modified: 2026-10-18
+def format_ipv4(value):
+    return '%d.%d.%d.%d' % (value >> 24, (value >> 16) & 255, (value >> 8) & 255,
+                            value & 255)
+
+
+# FQDN: dot-separated labels of up to 63 characters, optionally starting with a
+#   wildcard label
+fqdn_pattern = re.compile(r'(\*\.)?([A-Za-z0-9_]([A-Za-z0-9_-]{0,61}[A-Za-z0-9_])?\.)*'
+                          r'[A-Za-z0-9_]([A-Za-z0-9_-]{0,61}[A-Za-z0-9_])?\.?$')
+
+
+# yield records from a CSV or JSON lines file
+# "source" is a path or an open text file; "file_format" is 'csv' or 'jsonl' and
+#   defaults to the file extension (.csv is CSV, anything else JSON lines)
+# CSV rows become dicts keyed by the header row, with empty values dropped; JSON
+#   lines that cannot be decoded are yielded as the raw line, so the importer can
+#   reject them with their position
+# created: 2026-10-18
+# last modified: 2026-10-18
+def read_records(source, file_format=None):
+    if isinstance(source, str):
+        if file_format is None:
+            file_format = 'csv' if source.lower().endswith('.csv') else 'jsonl'
+        with open(source, newline='') as source_file:
+            for record in read_records(source_file, file_format):
+                yield record
+        return
+    if file_format == 'csv':
+        for row in csv.DictReader(source):
+            yield {field: value for field, value in row.items()
+                   if field is not None and value not in (None, '')}
+    else:
+        for line in source:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json_loads(line)
+            except ValueError:
+                yield line
+
+
+# fgt_import_reject
+# a record refused by fgt_address_import, or an address the FortiGate refused
+# "index" is the record's position in the input (1-based, None for device errors)
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_import_reject:
+    def __init__(self, index, record, reason):
+        self.index = index
+        self.record = record
+        self.reason = reason
+
+    def __repr__(self):
+        return 'fgt_import_reject(index=%r, reason=%r)' % (self.index, self.reason)
+
+    def to_dict(self):
+        return {'index': self.index, 'reason': self.reason, 'record': self.record}
+
+
+# fgt_address_import
+# streaming validation, normalization and deduplication of address records
+# records are dicts with FortiOS address fields (name, type, subnet, start-ip,
+#   end-ip, fqdn, country, color, comment) or a single "value" field holding a
+#   subnet, host, range (a.b.c.d-e.f.g.h) or FQDN; "type" is inferred if missing
+#   and records without a name are named "name_prefix" + value
+# records are read lazily "batch_size" at a time; batches() yields lists of
+#   normalized address dicts, so memory use is flat apart from the names and
+#   values kept for deduplication
+# a record is rejected if it cannot be normalized, or, with "dedupe", if its name
+#   or value is already on the FortiGate (see add_existing()) or earlier in the
+#   input; rejects are passed to "errors", a function taking an
+#   fgt_import_reject or a text file that receives one JSON line per reject
+# created: 2026-10-18
+# last modified: 2026-10-18
+class fgt_address_import:
+    name_length = 79
+    fqdn_length = 255
+    comment_length = 255
+    value_fields = {'ipmask': ('subnet',), 'iprange': ('start-ip', 'end-ip'),
+                    'fqdn': ('fqdn',), 'geography': ('country',)}
+
+    def __init__(self, name_prefix='', batch_size=1000, dedupe=True, errors=None):
+        self.name_prefix = name_prefix
+        self.batch_size = batch_size
+        self.dedupe = dedupe
+        self.errors = errors
+        self.names = set()
+        self.values = set()
+        self.read = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.start_time = time.perf_counter()
+
+    # remember an existing FortiGate address so records duplicating it are rejected
+    def add_existing(self, addr_object):
+        self.names.add(addr_object.get('name'))
+        address, reason = self.normalize(addr_object)
+        if address is not None:
+            self.values.add(self.value_key(address))
+
+    # (type, normalized value) of a normalized address
+    def value_key(self, address):
+        return (address['type'],) + tuple(address[field] for field in
+                                          self.value_fields[address['type']])
+
+    # type of a record without one, from its fields
+    def infer_type(self, record):
+        for addr_type, fields in self.value_fields.items():
+            if fields[0] in record:
+                return addr_type
+        value = record.get('value')
+        if not isinstance(value, str):
+            return None
+        if '-' in value:
+            start_ip, end_ip = [part.strip() for part in value.split('-', 1)]
+            if (start_ip.replace('.', '').isdigit() and
+                end_ip.replace('.', '').isdigit()):
+                record['start-ip'] = start_ip
+                record['end-ip'] = end_ip
+                return 'iprange'
+        if value.replace('.', '').replace('/', '').replace(' ', '').isdigit():
+            record['subnet'] = value
+            return 'ipmask'
+        if value.startswith('[') or ':' in value:
+            return None
+        record['fqdn'] = value
+        return 'fqdn'
+
+    # return (normalized address dict, None) or (None, reason)
+    def normalize(self, record):
+        if not isinstance(record, dict):
+            return None, 'not a record'
+        addr_type = record.get('type')
+        if addr_type is None:
+            record = dict(record)
+            addr_type = self.infer_type(record)
+            if addr_type is None:
+                return None, 'unknown address type'
+        address = {'type': addr_type}
+        try:
+            if addr_type == 'ipmask':
+                subnet = record['subnet']
+                if isinstance(subnet, str):
+                    # "ip", "ip/prefix", "ip mask", with any amount of whitespace
+                    parts = subnet.replace('/', ' ').split()
+                    if len(parts) == 1:
+                        parts.append(None)
+                    ip, mask = parts
+                else:
+                    ip, mask = subnet
+                prefix = netmask_prefixes.get(mask) if mask else 32
+                if prefix is None:
+                    return None, 'invalid netmask'
+                netmask = (0xffffffff << (32 - prefix)) & 0xffffffff
+                network = format_ipv4(parse_ipv4(ip) & netmask)
+                address['subnet'] = network + ' ' + format_ipv4(netmask)
+                label = network + '/' + str(prefix)
+            elif addr_type == 'iprange':
+                start_ip = parse_ipv4(record['start-ip'].strip())
+                end_ip = parse_ipv4(record['end-ip'].strip())
+                if start_ip > end_ip:
+                    return None, 'range start after end'
+                address['start-ip'] = format_ipv4(start_ip)
+                address['end-ip'] = format_ipv4(end_ip)
+                label = address['start-ip'] + '-' + address['end-ip']
+            elif addr_type == 'fqdn':
+                fqdn = record['fqdn'].strip().lower()
+                if len(fqdn) > self.fqdn_length or not fqdn_pattern.match(fqdn):
+                    return None, 'invalid fqdn'
+                address['fqdn'] = label = fqdn
+            elif addr_type == 'geography':
+                country = record['country'].strip().upper()
+                if country not in country_codes():
+                    return None, 'invalid country'
+                address['country'] = label = country
+            else:
+                return None, 'unsupported address type'
+        except KeyError as e:
+            return None, 'missing ' + str(e.args[0])
+        except (ValueError, AttributeError, TypeError):
+            return None, 'invalid ' + addr_type
+        name = record.get('name')
+        if name is None:
+            name = self.name_prefix + label
+        elif not isinstance(name, str):
+            name = str(name)
+        name = name.strip()
+        if not name or len(name) > self.name_length:
+            return None, 'invalid name'
+        address['name'] = name
+        if 'color' in record:
+            try:
+                color = color_values.get(record['color'])
+            except TypeError:
+                return None, 'invalid color'
+            address['color'] = color_std(record['color']) if color is None else color
+        comment = record.get('comment')
+        if comment:
+            if not isinstance(comment, str):
+                return None, 'invalid comment'
+            if len(comment) > self.comment_length:
+                return None, 'comment too long'
+            address['comment'] = comment
+        return address, None
+
+    # count a rejected record and pass it to the error stream
+    def reject(self, index, record, reason):
+        self.rejected += 1
+        self.write_error(index, record, reason)
+
+    # pass a reject or a device error to the error stream, without counting it
+    # device errors are counted in "failed" by fgt_api_token.import_addresses()
+    def write_error(self, index, record, reason):
+        if self.errors is None:
+            return
+        reject = fgt_import_reject(index, record, reason)
+        if hasattr(self.errors, 'write'):
+            self.errors.write(json.dumps(reject.to_dict()) + '\n')
+        else:
+            self.errors(reject)
+
+    # normalize and dedupe a list of (index, record) pairs; returns valid addresses
+    def process(self, batch):
+        normalize = self.normalize
+        value_key = self.value_key
+        names = self.names
+        values = self.values
+        addresses = []
+        for index, record in batch:
+            address, reason = normalize(record)
+            if address is None:
+                self.reject(index, record, reason)
+                continue
+            if self.dedupe:
+                key = value_key(address)
+                if address['name'] in names:
+                    reason = 'duplicate name'
+                elif key in values:
+                    reason = 'duplicate value'
+                if reason is not None:
+                    self.duplicates += 1
+                    self.reject(index, record, reason)
+                    continue
+                names.add(address['name'])
+                values.add(key)
+            addresses.append(address)
+        self.accepted += len(addresses)
+        return addresses
+
+    # yield lists of valid address dicts, reading "records" batch by batch
+    def batches(self, records):
+        batch = []
+        for record in records:
+            self.read += 1
+            batch.append((self.read, record))
+            if len(batch) >= self.batch_size:
+                yield self.process(batch)
+                batch = []
+        if batch:
+            yield self.process(batch)
+
+    # yield valid address dicts one by one
+    def addresses(self, records):
+        for batch in self.batches(records):
+            for address in batch:
+                yield address
+
+    # counters and records per second
+    def stats(self):
+        elapsed = time.perf_counter() - self.start_time
+        return {'read': self.read, 'accepted': self.accepted,
+                'rejected': self.rejected, 'duplicates': self.duplicates,
+                'succeeded': self.succeeded, 'failed': self.failed,
+                'seconds': elapsed,
+                'records_per_second': self.read / elapsed if elapsed else 0.0}
@@ -0,0 +1,534 @@
+#!/usr/local/bin/python3
+
+# file: fgt_mock.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# local stand-in for the FortiOS REST API, for benchmarking and offline testing of
+#   scripts built on fgt_api.py
+
+# notes:
+# implements only what fgt_api.py uses:
+#   /api/v2/cmdb/firewall/address/[name]
+#   /api/v2/cmdb/firewall/policy/[policyid]   (including action=move)
+#   /api/v2/cmdb/system/vdom/                 (read only)
+#   /api/v2/cmdb/firewall/addrgrp/, /api/v2/cmdb/firewall.service/custom/,
+#   /api/v2/cmdb/firewall.service/group/      (read only)
+#   /api/v2/monitor/system/firmware/
+#   /api/v2/monitor/firewall/policy/          (counters grow at a fixed rate per policy)
+#   /api/v2/cmdb/?action=transaction-start|transaction-commit|transaction-abort
+# supported URL parameters: vdom (one or a comma separated list), global, start,
+#   count, filter, format
+# tables are generated with a fixed seed, so runs are reproducible
+# any token is accepted
+# usage: python3 fgt_mock.py --port 8080 --addresses 40000 --policies 15000
+
+import argparse
+import http.server
+import json
+import random
+import ssl
+import threading
+import time
+import urllib.parse
+
+
+# build a reproducible address table
+def mock_addresses(count, seed=0):
+    rng = random.Random(seed)
+    addresses = [{'name': 'all', 'q_origin_key': 'all', 'type': 'ipmask',
+                  'subnet': '0.0.0.0 0.0.0.0', 'comment': '', 'color': 0}]
+    for index in range(1, count):
+        if index % 10 == 0:
+            start = rng.randrange(1 << 24, 223 << 24)
+            addresses.append({
+                'name': 'range-' + str(index), 'q_origin_key': 'range-' + str(index),
+                'type': 'iprange', 'start-ip': int_to_ip(start),
+                'end-ip': int_to_ip(start + rng.randrange(1, 1024)),
+                'comment': '', 'color': rng.randrange(33)})
+        else:
+            prefix = rng.randrange(16, 33)
+            network = rng.randrange(1 << 24, 223 << 24) & (((1 << prefix) - 1) << (32 - prefix))
+            mask = ((1 << prefix) - 1) << (32 - prefix)
+            addresses.append({
+                'name': 'net-' + str(index), 'q_origin_key': 'net-' + str(index),
+                'type': 'ipmask',
+                'subnet': int_to_ip(network) + ' ' + int_to_ip(mask),
+                'comment': '', 'color': rng.randrange(33)})
+    return addresses
+
+
+# build a reproducible policy table that references the address table
+def mock_policies(count, addresses, seed=0):
+    rng = random.Random(seed + 1)
+    names = [address['name'] for address in addresses]
+    policies = []
+    for policyid in range(1, count + 1):
+        srcaddr = rng.choice(names)
+        dstaddr = rng.choice(names)
+        srcintf = 'port' + str(rng.randrange(1, 5))
+        dstintf = 'port' + str(rng.randrange(1, 5))
+        policies.append({
+            'policyid': policyid, 'q_origin_key': policyid,
+            'name': 'policy-' + str(policyid),
+            'srcintf': [{'name': srcintf, 'q_origin_key': srcintf}],
+            'dstintf': [{'name': dstintf, 'q_origin_key': dstintf}],
+            'srcaddr': [{'name': srcaddr, 'q_origin_key': srcaddr}],
+            'dstaddr': [{'name': dstaddr, 'q_origin_key': dstaddr}],
+            'action': rng.choice(['accept', 'deny']),
+            'service': [{'name': 'ALL', 'q_origin_key': 'ALL'}],
+            'schedule': 'always', 'status': 'enable', 'logtraffic': 'utm',
+            'comments': ''})
+    return policies
+
+
+# build reproducible address groups; every third group also nests the one before it
+def mock_addrgrps(addresses, seed=0):
+    rng = random.Random(seed + 2)
+    names = [address['name'] for address in addresses[1:]]
+    groups = []
+    for index in range(1, len(names) // 20 + 1):
+        members = rng.sample(names, min(4, len(names)))
+        if index % 3 == 0:
+            members.append('grp-' + str(index - 1))
+        groups.append({'name': 'grp-' + str(index), 'q_origin_key': 'grp-' + str(index),
+                       'member': [{'name': name, 'q_origin_key': name}
+                                  for name in members],
+                       'exclude': 'disable', 'exclude-member': [], 'comment': ''})
+    return groups
+
+
+# fixed custom services and service groups
+def mock_services():
+    services = [
+        {'name': 'ALL', 'protocol': 'IP', 'protocol-number': 0},
+        {'name': 'HTTP', 'protocol': 'TCP/UDP/SCTP', 'tcp-portrange': '80'},
+        {'name': 'HTTPS', 'protocol': 'TCP/UDP/SCTP', 'tcp-portrange': '443'},
+        {'name': 'DNS', 'protocol': 'TCP/UDP/SCTP', 'tcp-portrange': '53',
+         'udp-portrange': '53'},
+        {'name': 'SSH', 'protocol': 'TCP/UDP/SCTP', 'tcp-portrange': '22'},
+        {'name': 'PING', 'protocol': 'ICMP', 'icmptype': 8}]
+    groups = [
+        {'name': 'Web Access', 'member': [{'name': 'HTTP'}, {'name': 'HTTPS'}]},
+        {'name': 'Infrastructure', 'member': [{'name': 'DNS'}, {'name': 'SSH'},
+                                              {'name': 'Web Access'}]}]
+    for obj in services + groups:
+        obj['q_origin_key'] = obj['name']
+    return services, groups
+
+
+# convert an integer to a dotted IPv4 address
+def int_to_ip(value):
+    return '.'.join(str((value >> shift) & 255) for shift in (24, 16, 8, 0))
+
+
+# return True if an object matches one FortiOS filter expression
+# supported operators: == != =@ !@ <= >= < >
+def filter_match(obj, expression):
+    for operator in ('==', '!=', '=@', '!@', '<=', '>=', '<', '>'):
+        if operator in expression:
+            field, value = expression.split(operator, 1)
+            break
+    else:
+        return False
+    current = obj.get(field)
+    if type(current) is list:
+        current = ','.join(str(item.get('name', '')) for item in current)
+    if operator in ('<=', '>=', '<', '>'):
+        try:
+            current = float(current)
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+        return {'<=': current <= value, '>=': current >= value,
+                '<': current < value, '>': current > value}[operator]
+    current = '' if current is None else str(current)
+    return {'==': current == value, '!=': current != value,
+            '=@': value in current, '!@': value not in current}[operator]
+
+
+# parse filter parameters into a list of OR groups that must all match (AND)
+# as on FortiOS, every "filter" parameter is one group and its expressions are
+#   separated by ','
+def parse_filters(values):
+    return [value.split(',') for value in values]
+
+
+# fgt_mock_vdom
+# address and policy tables of one mock VDOM, plus read-only object tables
+class fgt_mock_vdom:
+    def __init__(self, addresses, policies, objects=None):
+        self.addresses = {address['name']: address for address in addresses}
+        self.policies = list(policies)
+        # table name -> {name: object}
+        self.objects = {}
+        for table, table_objects in (objects or {}).items():
+            self.objects[table] = {obj['name']: obj for obj in table_objects}
+
+
+# fgt_mock_server
+# threaded HTTP(S) server with keep-alive that answers like a FortiGate
+# "addresses"/"policies" are table sizes per VDOM
+# "latency" is a fixed delay per request, "object_latency" a delay per returned
+#   object, both in seconds
+# "certfile"/"keyfile" enable HTTPS
+class fgt_mock_server:
+    def __init__(self, host='127.0.0.1', port=0, addresses=1000, policies=100,
+                 vdoms=('root',), latency=0.0, object_latency=0.0, seed=0,
+                 certfile=None, keyfile=None):
+        self.latency = latency
+        self.object_latency = object_latency
+        self.lock = threading.Lock()
+        self.revision = 1
+        self.vdoms = {}
+        for vdom in vdoms:
+            address_table = mock_addresses(addresses, seed)
+            services, service_groups = mock_services()
+            self.vdoms[vdom] = fgt_mock_vdom(
+                address_table, mock_policies(policies, address_table, seed),
+                {'addrgrp': mock_addrgrps(address_table, seed),
+                 'service.custom': services, 'service.group': service_groups})
+        self.transactions = {}
+        # policy counters count up from this time; see reset_counters()
+        self.counter_base = time.monotonic()
+        self.next_transaction = 1
+        self.requests = 0
+        self.httpd = http.server.ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.protocol = 'http'
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self.httpd.socket = context.wrap_socket(self.httpd.socket, server_side=True)
+            self.protocol = 'https'
+        self.host = host
+        self.port = self.httpd.server_address[1]
+        self.thread = None
+
+    # build the request handler class bound to this server
+    def handler_class(self):
+        server = self
+
+        class handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def handle_any(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, data = server.dispatch(self.command, self.path, self.headers,
+                                               body)
+                payload = json.dumps(data).encode()
+                # one write per response, headers and body together
+                self.wfile.write(('HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n'
+                                  'Content-Length: %d\r\n\r\n' %
+                                  (status, self.responses.get(status, ('',))[0],
+                                   len(payload))).encode() + payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = handle_any
+
+        return handler
+
+    # base URL of the server
+    @property
+    def url(self):
+        return '%s://%s:%d' % (self.protocol, self.host, self.port)
+
+    # configure an fgt_api_token (or subclass) object to talk to this server
+    def configure(self, client):
+        if self.protocol == 'http':
+            client.protocol = 'http'
+        client.set_port(self.port)
+        return client
+
+    # serve in a background thread
+    # the short poll interval lets stop() return quickly (tests start and stop many
+    #   servers)
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,),
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    # stop serving
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # response envelope
+    def envelope(self, method, vdom, path, name, results, status=200):
+        data = {'http_method': method, 'revision': '%032x' % self.revision,
+                'vdom': vdom, 'path': path, 'name': name,
+                'status': 'success' if status == 200 else 'error',
+                'http_status': status, 'serial': 'FGVMMOCK00000000',
+                'version': 'v6.0.4', 'build': 231}
+        if results is not None:
+            data['results'] = results
+        return data
+
+    # handle one request; returns (HTTP status, response data)
+    def dispatch(self, method, raw_path, headers, body):
+        with self.lock:
+            self.requests += 1
+        url = urllib.parse.urlsplit(raw_path)
+        query = urllib.parse.parse_qs(url.query, keep_blank_values=True)
+        path = urllib.parse.unquote(url.path)
+        single = {key: values[-1] for key, values in query.items()}
+        try:
+            json_data = json.loads(body) if body else None
+        except ValueError:
+            return 400, {'status': 'error', 'http_status': 400}
+
+        if path.rstrip('/') == '/api/v2/cmdb' and single.get('action', '').startswith(
+                'transaction-'):
+            return self.transaction(single['action'], headers, json_data)
+
+        transaction_id = headers.get('X-TRANSACTION-ID')
+        if method != 'GET' and transaction_id:
+            with self.lock:
+                if transaction_id not in self.transactions:
+                    return 400, {'status': 'error', 'http_status': 400}
+                self.transactions[transaction_id].append((method, raw_path, body))
+            return 200, self.envelope(method, single.get('vdom', 'root'), 'firewall',
+                                      '', None)
+
+        if path.rstrip('/') == '/api/v2/cmdb/system/vdom' and method == 'GET':
+            results = [{'name': vdom, 'q_origin_key': vdom} for vdom in self.vdoms]
+            return self.respond(method, ['root'], 'system', 'vdom',
+                                lambda vdom: (200, results), query, single)
+
+        if 'global' in single:
+            vdoms = list(self.vdoms)
+        else:
+            vdoms = single.get('vdom', 'root').split(',')
+        for vdom in vdoms:
+            if vdom not in self.vdoms:
+                return 404, {'status': 'error', 'http_status': 404, 'vdom': vdom}
+
+        if path.startswith('/api/v2/monitor/system/firmware'):
+            results = {'current': {'platform-id': 'FGVM64', 'version': 'v6.0.4',
+                                   'major': 6, 'minor': 0, 'patch': 4, 'build': 231},
+                       'available': []}
+            return self.respond(method, vdoms, 'system', 'firmware',
+                                lambda vdom: (200, results), query, single)
+
+        if path.startswith('/api/v2/monitor/firewall/policy'):
+            return self.respond(method, vdoms, 'firewall', 'policy',
+                                self.policy_stats, query, single)
+
+        for table, prefix in (('addrgrp', '/api/v2/cmdb/firewall/addrgrp'),
+                              ('service.custom', '/api/v2/cmdb/firewall.service/custom'),
+                              ('service.group', '/api/v2/cmdb/firewall.service/group')):
+            if path == prefix or path.startswith(prefix + '/'):
+                if method != 'GET':
+                    return 405, {'status': 'error', 'http_status': 405}
+                key = path[len(prefix):].strip('/')
+                handler = lambda vdom: self.read_objects(table, vdom, key)
+                return self.respond(method, vdoms, 'firewall', table, handler, query,
+                                    single)
+
+        for table, prefix in (('address', '/api/v2/cmdb/firewall/address'),
+                              ('policy', '/api/v2/cmdb/firewall/policy')):
+            if path == prefix or path.startswith(prefix + '/'):
+                key = path[len(prefix):].strip('/')
+                if method == 'GET':
+                    handler = lambda vdom: self.read(table, vdom, key)
+                    return self.respond(method, vdoms, 'firewall', table, handler,
+                                        query, single)
+                with self.lock:
+                    status = self.write(table, self.vdoms[vdoms[0]], method, key,
+                                        json_data, single)
+                    if status == 200:
+                        self.revision += 1
+                return status, self.envelope(method, vdoms[0], 'firewall', table,
+                                             None, status)
+        return 404, {'status': 'error', 'http_status': 404}
+
+    # read a table (or one object) from a VDOM
+    def read(self, table, vdom, key):
+        tables = self.vdoms[vdom]
+        with self.lock:
+            if table == 'address':
+                if key:
+                    obj = tables.addresses.get(key)
+                    return (200, [obj]) if obj else (404, None)
+                return 200, list(tables.addresses.values())
+            if key:
+                for policy in tables.policies:
+                    if str(policy['policyid']) == key:
+                        return 200, [policy]
+                return 404, None
+            return 200, list(tables.policies)
+
+    # policy counters of a VDOM; each policy gets 1-97 hits per second
+    def policy_stats(self, vdom):
+        elapsed = time.monotonic() - self.counter_base
+        with self.lock:
+            policyids = [policy['policyid'] for policy in self.vdoms[vdom].policies]
+        results = []
+        for policyid in policyids:
+            rate = policyid * 7919 % 97 + 1
+            hits = int(elapsed * rate)
+            results.append({'policyid': policyid, 'active_sessions': rate,
+                            'hit_count': hits, 'bytes': hits * 1200,
+                            'packets': hits * 3})
+        return 200, results
+
+    # restart every policy counter from zero, like clearing counters on a FortiGate
+    def reset_counters(self):
+        self.counter_base = time.monotonic()
+
+    # read a read-only object table (or one object) from a VDOM
+    def read_objects(self, table, vdom, key):
+        objects = self.vdoms[vdom].objects[table]
+        if key:
+            obj = objects.get(key)
+            return (200, [obj]) if obj else (404, None)
+        return 200, list(objects.values())
+
+    # apply paging, filters and format, sleep for the configured latency
+    def respond(self, method, vdoms, path, name, handler, query, single):
+        envelopes = []
+        total = 0
+        for vdom in vdoms:
+            status, results = handler(vdom)
+            if status != 200:
+                return status, self.envelope(method, vdom, path, name, None, status)
+            if type(results) is list:
+                if 'filter' in query:
+                    for group in parse_filters(query['filter']):
+                        results = [obj for obj in results
+                                   if any(filter_match(obj, expr) for expr in group)]
+                start = int(single.get('start', 0) or 0)
+                if 'count' in single:
+                    results = results[start:start + int(single['count'])]
+                else:
+                    results = results[start:]
+                if 'format' in single:
+                    fields = single['format'].split('|')
+                    results = [{field: obj[field] for field in fields if field in obj}
+                               for obj in results]
+                total += len(results)
+            envelopes.append(self.envelope(method, vdom, path, name, results))
+        delay = self.latency + self.object_latency * total
+        if delay > 0:
+            time.sleep(delay)
+        if len(vdoms) == 1 and 'global' not in single:
+            return 200, envelopes[0]
+        return 200, envelopes
+
+    # apply a write to a VDOM's table (caller holds the lock); returns HTTP status
+    def write(self, table, tables, method, key, json_data, single):
+        if table == 'address':
+            if method == 'POST':
+                if type(json_data) is not dict or 'name' not in json_data:
+                    return 400
+                if json_data['name'] in tables.addresses:
+                    return 500
+                obj = dict(json_data)
+                obj['q_origin_key'] = obj['name']
+                tables.addresses[obj['name']] = obj
+                return 200
+            if key not in tables.addresses:
+                return 404
+            if method == 'PUT':
+                tables.addresses[key].update(json_data or {})
+                return 200
+            if method == 'DELETE':
+                del tables.addresses[key]
+                return 200
+            return 405
+
+        positions = {str(policy['policyid']): index
+                     for index, policy in enumerate(tables.policies)}
+        if method == 'POST':
+            if type(json_data) is not dict:
+                return 400
+            obj = dict(json_data)
+            if not obj.get('policyid'):
+                obj['policyid'] = max([0] + [p['policyid'] for p in tables.policies]) + 1
+            if str(obj['policyid']) in positions:
+                return 500
+            obj['q_origin_key'] = obj['policyid']
+            tables.policies.append(obj)
+            return 200
+        if key not in positions:
+            return 404
+        if method == 'DELETE':
+            del tables.policies[positions[key]]
+            return 200
+        if method == 'PUT' and single.get('action') == 'move':
+            for move_type in ('before', 'after'):
+                if move_type in single:
+                    ref = single[move_type]
+                    if ref not in positions:
+                        return 404
+                    policy = tables.policies.pop(positions[key])
+                    ref_pos = [str(p['policyid']) for p in tables.policies].index(ref)
+                    if move_type == 'after':
+                        ref_pos += 1
+                    tables.policies.insert(ref_pos, policy)
+                    return 200
+            return 400
+        if method == 'PUT':
+            tables.policies[positions[key]].update(json_data or {})
+            return 200
+        return 405
+
+    # config transactions: writes with X-TRANSACTION-ID are held until commit
+    def transaction(self, action, headers, json_data):
+        with self.lock:
+            if action == 'transaction-start':
+                transaction_id = self.next_transaction
+                self.next_transaction += 1
+                self.transactions[str(transaction_id)] = []
+                return 200, {'status': 'success', 'http_status': 200,
+                             'results': {'transaction-id': transaction_id}}
+            transaction_id = headers.get('X-TRANSACTION-ID')
+            if transaction_id not in self.transactions:
+                return 400, {'status': 'error', 'http_status': 400}
+            staged = self.transactions.pop(transaction_id)
+        if action == 'transaction-commit':
+            for method, raw_path, body in staged:
+                self.dispatch(method, raw_path, {}, body)
+        return 200, {'status': 'success', 'http_status': 200}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='mock FortiOS REST API server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--addresses', type=int, default=1000)
+    parser.add_argument('--policies', type=int, default=100)
+    parser.add_argument('--vdoms', default='root',
+                        help='comma separated VDOM names')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every request')
+    parser.add_argument('--object-latency', type=float, default=0.0,
+                        help='seconds added per returned object')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--certfile')
+    parser.add_argument('--keyfile')
+    args = parser.parse_args()
+    server = fgt_mock_server(args.host, args.port, args.addresses, args.policies,
+                             args.vdoms.split(','), args.latency, args.object_latency,
+                             args.seed, args.certfile, args.keyfile)
+    print('serving mock FortiOS API on ' + server.url, flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
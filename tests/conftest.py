@@ -0,0 +1,26 @@
+# file: conftest.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# shared pytest fixtures: a fgt_mock_server per test and a client configured for it
+
+import pytest
+
+import fgt_api
+import fgt_mock
+
+
+# mock FortiGate with 300 addresses and 40 policies in the root VDOM
+@pytest.fixture
+def server():
+    with fgt_mock.fgt_mock_server(addresses=300, policies=40) as mock:
+        yield mock
+
+
+# fgt_api_token talking to "server"
+@pytest.fixture
+def client(server):
+    api = server.configure(fgt_api.fgt_api_token('test', '127.0.0.1', 'token'))
+    yield api
+    api.close()
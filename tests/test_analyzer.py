@@ -0,0 +1,183 @@
+# file: test_analyzer.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# policy shadowing and overlap analysis (fgt_policy_analyzer), checked against a
+#   pairwise scan
+
+import ipaddress
+import random
+
+import pytest
+
+import fgt_api
+
+numpy = pytest.importorskip('numpy')
+fgt_analyzer = pytest.importorskip('fgt_analyzer')
+
+
+def refs(*names):
+    return [{'name': name} for name in names]
+
+
+def policy(policyid, src='all', dst='all', service='ALL', action='accept',
+           srcintf='port1', dstintf='port2', **fields):
+    return dict({'policyid': policyid, 'srcintf': refs(srcintf),
+                 'dstintf': refs(dstintf), 'srcaddr': refs(src),
+                 'dstaddr': refs(dst), 'service': refs(service), 'action': action,
+                 'schedule': 'always'}, **fields)
+
+
+addresses = [{'name': 'all', 'subnet': '0.0.0.0 0.0.0.0'},
+             {'name': 'lan', 'subnet': '10.0.0.0 255.255.0.0'},
+             {'name': 'host', 'subnet': '10.0.1.1 255.255.255.255'},
+             {'name': 'dmz', 'subnet': '172.16.0.0 255.255.255.0'},
+             {'name': 'web', 'type': 'fqdn', 'fqdn': 'www.example.com'}]
+services = [{'name': 'ALL', 'protocol': 'IP', 'protocol-number': 0},
+            {'name': 'HTTP', 'tcp-portrange': '80'},
+            {'name': 'WEB', 'tcp-portrange': '80 443'},
+            {'name': 'HIGH', 'tcp-portrange': '1024-65535'}]
+
+
+def findings(results):
+    return [(finding.kind, finding.policyid, finding.by_policyid)
+            for finding in results]
+
+
+def test_interval_helpers():
+    assert fgt_analyzer.merge_intervals([(5, 10), (1, 3), (4, 4), (20, 30)]) == [
+        (1, 10), (20, 30)]
+    assert fgt_analyzer.complement_intervals([(1, 10), (20, 30)], 40) == [
+        (0, 0), (11, 19), (31, 40)]
+    assert fgt_analyzer.intervals_cover([(1, 10), (20, 30)], [(2, 3), (25, 30)])
+    assert not fgt_analyzer.intervals_cover([(1, 10)], [(5, 11)])
+    assert fgt_analyzer.intervals_intersect([(1, 3), (8, 9)], [(4, 8)])
+    assert not fgt_analyzer.intervals_intersect([(1, 3)], [(4, 8)])
+    assert fgt_analyzer.subtract_intervals([(0, 100)], [(10, 20), (50, 100)]) == [
+        (0, 9), (21, 49)]
+    assert fgt_analyzer.service_intervals({'tcp-portrange': '80 443:1024-2000'}) is None
+    assert fgt_analyzer.service_intervals({'udp-portrange': '53'}) == [
+        (17 << 16 | 53, 17 << 16 | 53)]
+
+
+def test_shadowed_and_redundant():
+    policies = [policy(1, src='lan', service='WEB'),
+                policy(2, src='host', service='HTTP'),
+                policy(3, src='host', service='HTTP', action='deny'),
+                policy(4, src='host', service='HIGH'),
+                policy(5, src='host', service='HTTP', srcintf='port3'),
+                policy(6, src='host', service='HTTP', status='disable'),
+                policy(7, src='host', service='HTTP', users=refs('alice')),
+                policy(8, src='all', service='ALL', srcintf='any'),
+                policy(9, src='dmz', dst='lan', service='HIGH', action='deny')]
+    analyzer = fgt_analyzer.fgt_policy_analyzer(policies, addresses, services)
+    assert findings(analyzer.shadowed()) == [('redundant', 2, 1), ('shadowed', 3, 1),
+                                             ('redundant', 7, 1), ('shadowed', 9, 8)]
+    assert analyzer.analyze_time is not None
+
+
+def test_unresolved_objects_are_never_covered_by_narrow_policies():
+    policies = [policy(1, dst='lan'), policy(2, dst='web'),
+                policy(3, dst='all', service='ALL'), policy(4, dst='web')]
+    analyzer = fgt_analyzer.fgt_policy_analyzer(policies, addresses, services)
+    assert analyzer.unresolved == {'web': 'address'}
+    assert findings(analyzer.shadowed()) == [('redundant', 4, 3)]
+
+
+def test_overlaps():
+    policies = [policy(1, src='lan', service='WEB'),
+                policy(2, src='host', dst='dmz', service='HIGH', action='deny'),
+                policy(3, src='host', service='HTTP', action='deny'),
+                policy(4, src='host', dst='dmz', service='WEB'),
+                policy(5, src='dmz', service='HTTP', action='deny')]
+    analyzer = fgt_analyzer.fgt_policy_analyzer(policies, addresses, services)
+    assert findings(analyzer.overlaps()) == [('overlap', 3, 1), ('overlap', 4, 3)]
+    assert sorted(findings(analyzer.overlaps(conflicts_only=False))) == [
+        ('overlap', 3, 1), ('overlap', 4, 1), ('overlap', 4, 3)]
+    assert len(analyzer.overlaps(conflicts_only=False, limit=1)) == 1
+
+
+# random policies over a small address space, so covers and overlaps are common
+def random_policies(count, seed):
+    rng = random.Random(seed)
+    objects = [{'name': 'all', 'subnet': '0.0.0.0 0.0.0.0'}]
+    for index in range(30):
+        prefix = rng.randrange(20, 29)
+        network = (10 << 24) | (rng.randrange(1 << 12) << 8)
+        network &= ((1 << prefix) - 1) << (32 - prefix)
+        objects.append({'name': 'net-%d' % index,
+                        'subnet': '%s/%d' % (ipaddress.IPv4Address(network), prefix)})
+    custom = []
+    for index in range(10):
+        low = rng.randrange(1, 60000)
+        custom.append({'name': 'svc-%d' % index,
+                       'tcp-portrange': '%d-%d' % (low, low + rng.randrange(5000))})
+    names = [obj['name'] for obj in objects]
+    service_names = ['ALL'] + [obj['name'] for obj in custom]
+    policies = [policy(policyid, rng.choice(names), rng.choice(names),
+                       rng.choice(service_names), rng.choice(['accept', 'deny']),
+                       rng.choice(['port1', 'port2', 'any']),
+                       rng.choice(['port1', 'port2', 'any']))
+                for policyid in range(1, count + 1)]
+    custom.append({'name': 'ALL', 'protocol': 'IP', 'protocol-number': 0})
+    return policies, objects, custom
+
+
+def scan(policies, resolver):
+    def ranges(policy, field):
+        return resolver.policy_ranges(policy, field)
+
+    def interface_covers(earlier, later, field):
+        outer = fgt_api.ref_names(earlier[field])
+        inner = fgt_api.ref_names(later[field])
+        return 'any' in outer or ('any' not in inner and set(inner) <= set(outer))
+
+    def interface_overlaps(earlier, later, field):
+        outer = set(fgt_api.ref_names(earlier[field]))
+        inner = set(fgt_api.ref_names(later[field]))
+        return 'any' in outer or 'any' in inner or bool(outer & inner)
+
+    shadowed = []
+    overlaps = []
+    for index, later in enumerate(policies):
+        covered = False
+        for earlier in policies[:index]:
+            fields = ('srcaddr', 'dstaddr', 'service')
+            if (not covered and
+                all(fgt_analyzer.intervals_cover(ranges(earlier, field),
+                                                 ranges(later, field))
+                    for field in fields) and
+                all(interface_covers(earlier, later, field)
+                    for field in ('srcintf', 'dstintf'))):
+                covered = True
+                kind = ('redundant' if earlier['action'] == later['action']
+                        else 'shadowed')
+                shadowed.append((kind, later['policyid'], earlier['policyid']))
+            if (earlier['action'] != later['action'] and
+                all(fgt_analyzer.intervals_intersect(ranges(earlier, field),
+                                                     ranges(later, field))
+                    for field in fields) and
+                all(interface_overlaps(earlier, later, field)
+                    for field in ('srcintf', 'dstintf'))):
+                overlaps.append(('overlap', later['policyid'], earlier['policyid']))
+    return shadowed, overlaps
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_matches_pairwise_scan(seed):
+    policies, objects, custom = random_policies(150, seed)
+    analyzer = fgt_analyzer.fgt_policy_analyzer(policies, objects, custom,
+                                                block_size=32)
+    shadowed, overlaps = scan(policies, analyzer.resolver)
+    assert shadowed
+    assert findings(analyzer.shadowed()) == shadowed
+    assert sorted(findings(analyzer.overlaps())) == sorted(overlaps)
+
+
+def test_analyze_policies_reads_the_device(client):
+    analyzer = client.analyze_policies(page_size=100)
+    assert len(analyzer.policies) == 40
+    for finding in analyzer.shadowed():
+        assert finding.kind in ('shadowed', 'redundant')
+        assert finding.by_policyid < finding.policyid
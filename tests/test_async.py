@@ -0,0 +1,98 @@
+# file: test_async.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# fgt_api_async: coroutines, async paged iterators, transactions, and the
+#   fgt_api_token helpers it does not support
+
+import asyncio
+
+import pytest
+
+import fgt_api
+
+
+def run_async(server, body):
+    async def main():
+        client = server.configure(fgt_api.fgt_api_async('test', '127.0.0.1', 'token'))
+        try:
+            return await body(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_get_post_delete(server):
+    async def body(client):
+        assert (await client.get_firmware()).status_code == 200
+        response = await client.add_address({'name': 'async-net',
+                                             'subnet': '10.9.0.0 255.255.0.0'})
+        assert response.status_code == 200
+        response = await client.get_address('async-net')
+        assert response.json()['results'][0]['name'] == 'async-net'
+        assert (await client.del_address('async-net')).status_code == 200
+        return (await client.get_address('async-net')).status_code
+
+    assert run_async(server, body) == 404
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_iter_addresses_reads_every_page(server, prefetch):
+    async def body(client):
+        return [address['name'] async for address
+                in client.iter_addresses(page_size=64, adaptive=False,
+                                         prefetch=prefetch)]
+
+    names = run_async(server, body)
+    assert len(names) == len(set(names)) == 300
+
+
+def test_iter_pages_early_stop_leaves_no_task(server):
+    async def body(client):
+        pages = client.iter_pages(client.cmdb_addr, page_size=50, prefetch=True)
+        async for page in pages:
+            break
+        await pages.aclose()
+        current = asyncio.current_task()
+        return [task for task in asyncio.all_tasks() if task is not current]
+
+    assert run_async(server, body) == []
+
+
+def test_iter_records_and_vdom_names(server):
+    async def body(client):
+        records = [record async for record
+                   in client.iter_records(client.cmdb_policy, fgt_api.fgt_policy_record)]
+        return records, await client.vdom_names()
+
+    records, vdoms = run_async(server, body)
+    assert len(records) == 40
+    assert all(isinstance(record, fgt_api.fgt_policy_record) for record in records)
+    assert vdoms == ['root']
+
+
+def test_transaction_and_config_revision(server):
+    async def body(client):
+        before = await client.config_revision()
+        transaction_id = await client.transaction_start()
+        options = fgt_api.fgt_options(headers={'X-TRANSACTION-ID': str(transaction_id)})
+        await client.add_address({'name': 'staged', 'subnet': '10.8.0.0 255.255.0.0'},
+                                 options)
+        staged = (await client.get_address('staged')).status_code
+        assert await client.transaction_commit(transaction_id)
+        committed = (await client.get_address('staged')).status_code
+        return before, await client.config_revision(), staged, committed
+
+    before, after, staged, committed = run_async(server, body)
+    assert (staged, committed) == (404, 200)
+    assert before is not None and after != before
+
+
+@pytest.mark.parametrize('name', ['run_bulk', 'reorder_policies', 'iter_vdoms',
+                                  'load_snapshot', 'import_addresses', 'send_request',
+                                  'set_transport'])
+def test_blocking_helpers_raise_type_error(name):
+    client = fgt_api.fgt_api_async('test', '127.0.0.1', 'token')
+    with pytest.raises(TypeError, match=name):
+        getattr(client, name)(None)
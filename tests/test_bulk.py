@@ -0,0 +1,65 @@
+# file: test_bulk.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# bulk writes (run_bulk and the add/update/del_addresses wrappers) and config
+#   transactions
+
+import fgt_api
+
+
+def new_addresses(count):
+    return [{'name': 'bulk-%d' % index,
+             'subnet': '198.51.100.%d 255.255.255.255' % index}
+            for index in range(count)]
+
+
+def test_add_addresses_reports_in_input_order(client):
+    addresses = new_addresses(20)
+    # a duplicate of an existing object fails, the others go through
+    addresses[7] = {'name': 'net-1', 'subnet': '10.0.0.1 255.255.255.255'}
+    report = client.add_addresses(addresses, parallelism=4)
+    assert [result.key for result in report.results] == [
+        address['name'] for address in addresses]
+    assert report.succeeded == 19
+    assert [result.key for result in report.failures()] == ['net-1']
+    assert report.transaction is None
+
+
+def test_update_and_delete_addresses(client):
+    client.add_addresses(new_addresses(5))
+    report = client.update_addresses([{'name': 'bulk-%d' % index, 'comment': 'bulk'}
+                                      for index in range(5)])
+    assert report.succeeded == 5
+    assert client.get_address('bulk-3').json()['results'][0]['comment'] == 'bulk'
+    report = client.del_addresses(['bulk-%d' % index for index in range(5)])
+    assert report.succeeded == 5
+    assert client.get_address('bulk-3').status_code == 404
+
+
+def test_bulk_in_one_transaction(client, server):
+    report = client.add_addresses(new_addresses(10), transaction=True)
+    assert report.transaction == 'committed'
+    assert report.succeeded == 10
+    assert server.next_transaction == 2
+    assert client.get_address('bulk-9').status_code == 200
+
+
+def test_transaction_writes_are_held_until_commit(client):
+    transaction_id = client.transaction_start()
+    assert transaction_id is not None
+    options = fgt_api.fgt_options(headers={'X-TRANSACTION-ID': str(transaction_id)})
+    address = new_addresses(1)[0]
+    assert client.add_address(address, options=options).status_code == 200
+    assert client.get_address('bulk-0').status_code == 404
+    assert client.transaction_commit(transaction_id)
+    assert client.get_address('bulk-0').status_code == 200
+
+
+def test_aborted_transaction_changes_nothing(client):
+    transaction_id = client.transaction_start()
+    options = fgt_api.fgt_options(headers={'X-TRANSACTION-ID': str(transaction_id)})
+    client.add_address(new_addresses(1)[0], options=options)
+    assert client.transaction_abort(transaction_id)
+    assert client.get_address('bulk-0').status_code == 404
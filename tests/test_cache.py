@@ -0,0 +1,93 @@
+# file: test_cache.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# GET response cache: hits, invalidation on writes and per-token keys, for
+#   fgt_api_token and fgt_api_async
+
+import asyncio
+import threading
+import time
+
+import fgt_api
+import fgt_mock
+
+
+def test_repeated_get_is_served_from_cache(client, server):
+    client.set_cache()
+    first = client.get_address('net-1').json()
+    before = server.requests
+    second = client.get_address('net-1').json()
+    assert second == first
+    assert server.requests == before
+    assert client.cache_stats()['hits'] == 1
+
+
+def test_write_invalidates_table(client):
+    client.set_cache()
+    assert client.get_address('net-1').json()['results'][0]['comment'] == ''
+    assert client.update_address('net-1', {'comment': 'changed'}).status_code == 200
+    assert client.get_address('net-1').json()['results'][0]['comment'] == 'changed'
+    assert client.cache_stats()['invalidated'] >= 1
+
+
+def test_read_in_flight_during_write_is_not_cached():
+    with fgt_mock.fgt_mock_server(addresses=10, policies=5, latency=0.2) as server:
+        client = server.configure(fgt_api.fgt_api_token('test', '127.0.0.1', 'token'))
+        client.set_cache()
+        # this GET is answered with the old comment, after the PUT was sent
+        reader = threading.Thread(target=client.get_address, args=('net-1',))
+        reader.start()
+        time.sleep(0.05)
+        client.update_address('net-1', {'comment': 'changed'})
+        reader.join()
+        assert client.get_address('net-1').json()['results'][0]['comment'] == 'changed'
+        client.close()
+
+
+def test_cache_is_keyed_by_token(server):
+    cache = fgt_api.fgt_response_cache()
+    first = server.configure(fgt_api.fgt_api_token('a', '127.0.0.1', 'token-a'))
+    second = server.configure(fgt_api.fgt_api_token('b', '127.0.0.1', 'token-b'))
+    first.set_cache(cache=cache)
+    second.set_cache(cache=cache)
+    first.show_addresses()
+    second.show_addresses()
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['entries'] == 2
+    first.close()
+    second.close()
+
+
+def test_async_gets_use_cache_and_writes_invalidate(server):
+    async def body():
+        client = server.configure(fgt_api.fgt_api_async('test', '127.0.0.1', 'token'))
+        client.set_cache()
+        first = (await client.get_address('net-1')).json()
+        before = server.requests
+        assert (await client.get_address('net-1')).json() == first
+        assert server.requests == before
+        await client.update_address('net-1', {'comment': 'changed'})
+        changed = (await client.get_address('net-1')).json()
+        await client.close()
+        return client.cache_stats(), changed
+
+    stats, changed = asyncio.run(body())
+    assert changed['results'][0]['comment'] == 'changed'
+    assert stats['hits'] == 1
+    assert stats['invalidated'] >= 1
+
+
+def test_async_expired_entry_is_revalidated(server):
+    async def body():
+        client = server.configure(fgt_api.fgt_api_async('test', '127.0.0.1', 'token'))
+        client.set_cache(ttl=0)
+        await client.show_addresses()
+        await client.show_addresses()
+        await client.close()
+        return client.cache_stats()
+
+    stats = asyncio.run(body())
+    assert stats['hits'] == 1
+    assert stats['revalidated'] == 1
@@ -0,0 +1,78 @@
+# file: test_cassette.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# cassette record/replay round trip (fgt_cassette.py)
+
+import pytest
+
+import fgt_cassette
+
+
+# record a short session: read firmware and addresses, add an address, read it back
+def record(client, path):
+    recorder = fgt_cassette.fgt_cassette_recorder(path)
+    client.set_transport(recorder)
+    responses = [client.get_firmware(), client.show_addresses(),
+                 client.add_address({'name': 'new-address',
+                                     'subnet': '192.0.2.1 255.255.255.255'}),
+                 client.get_address('new-address')]
+    recorder.close()
+    client.unset_transport()
+    return responses
+
+
+@pytest.mark.parametrize('file_name', ['session.jsonl', 'session.jsonl.gz'])
+def test_replay_returns_recorded_responses(client, server, tmp_path, file_name):
+    path = str(tmp_path / file_name)
+    recorded = record(client, path)
+    before = server.requests
+    client.set_transport(fgt_cassette.fgt_cassette_replay(path))
+    replayed = [client.get_firmware(), client.show_addresses(),
+                client.add_address({'name': 'new-address',
+                                    'subnet': '192.0.2.1 255.255.255.255'}),
+                client.get_address('new-address')]
+    assert [response.status_code for response in replayed] == [
+        response.status_code for response in recorded]
+    assert [response.json() for response in replayed] == [
+        response.json() for response in recorded]
+    # nothing reached the server
+    assert server.requests == before
+
+
+def test_cassette_leaves_out_the_token(client, tmp_path):
+    path = str(tmp_path / 'session.jsonl')
+    record(client, path)
+    with open(path) as cassette:
+        text = cassette.read()
+    assert 'token' not in text
+    assert 'Authorization' not in text
+
+
+def test_unrecorded_request_is_missed(client, tmp_path):
+    path = str(tmp_path / 'session.jsonl')
+    record(client, path)
+    replay = fgt_cassette.fgt_cassette_replay(path)
+    client.set_transport(replay)
+    assert client.get_policy(1) is None
+    assert len(replay.missed) == 1
+
+
+def test_exhausted_error_mode(client, tmp_path):
+    path = str(tmp_path / 'session.jsonl')
+    record(client, path)
+    client.set_transport(fgt_cassette.fgt_cassette_replay(path, exhausted='error'))
+    assert client.get_firmware().status_code == 200
+    assert client.get_firmware() is None
+
+
+def test_replay_scaling(client, tmp_path):
+    path = str(tmp_path / 'session.jsonl')
+    record(client, path)
+    results = fgt_cassette.replay_scaling(
+        path, lambda api: api.get_firmware().json(), concurrency=(1, 4), repeat=5)
+    assert sorted(results) == [1, 4]
+    assert results[4]['runs'] == 20
+    assert results[4]['errors'] == 0
+    assert results[4]['missed'] == 0
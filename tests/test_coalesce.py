@@ -0,0 +1,65 @@
+# file: test_coalesce.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# coalescing of identical concurrent GETs (fgt_single_flight) for threads and asyncio
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import fgt_api
+import fgt_mock
+
+
+def test_concurrent_gets_share_one_request():
+    with fgt_mock.fgt_mock_server(addresses=10, policies=5, latency=0.2) as server:
+        client = server.configure(fgt_api.fgt_api_token('test', '127.0.0.1', 'token'))
+        client.set_coalesce()
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            responses = list(executor.map(lambda index: client.get_firmware(),
+                                          range(8)))
+        assert all(response.status_code == 200 for response in responses)
+        assert server.requests == 1
+        client.close()
+
+
+def test_get_after_write_sees_the_write():
+    with fgt_mock.fgt_mock_server(addresses=10, policies=5, latency=0.3) as server:
+        client = server.configure(fgt_api.fgt_api_token('test', '127.0.0.1', 'token'))
+        client.set_coalesce()
+        # a slow read of the table is in flight when the address is added
+        reader = threading.Thread(target=client.show_addresses)
+        reader.start()
+        time.sleep(0.05)
+        response = client.add_address({'name': 'new-address',
+                                       'subnet': '192.0.2.1 255.255.255.255'})
+        assert response.status_code == 200
+        names = [obj['name'] for obj in client.show_addresses().json()['results']]
+        reader.join()
+        assert 'new-address' in names
+        client.close()
+
+
+def test_async_callers_are_coalesced_per_event_loop(server):
+    single_flight = fgt_api.fgt_single_flight()
+    status_codes = []
+
+    async def read_firmware():
+        client = server.configure(fgt_api.fgt_api_async('test', '127.0.0.1', 'token'))
+        client.set_coalesce(single_flight)
+        responses = await asyncio.gather(*[client.get_firmware() for index in range(5)])
+        status_codes.extend(response.status_code for response in responses)
+        await client.close()
+
+    threads = [threading.Thread(target=asyncio.run, args=(read_firmware(),))
+               for index in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert status_codes == [200] * 15
+    # one request per event loop, and no task left behind in any of them
+    assert single_flight.stats() == {'sent': 3, 'saved': 12, 'in_flight': 0}
@@ -0,0 +1,93 @@
+# file: test_export.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# fleet export command line (fgt_export.py): output and exit codes
+
+import collections
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import fgt_export
+
+repo_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+# inventory file with "count" devices on the mock server (and "dead" unreachable ones)
+def write_inventory(path, server, count, dead=0):
+    devices = [{'name': 'fgt-%d' % index, 'host': '127.0.0.1', 'port': server.port,
+                'protocol': 'http', 'token': 'token'} for index in range(count)]
+    # nothing listens on port 1
+    devices += [{'name': 'dead-%d' % index, 'host': '127.0.0.1', 'port': 1,
+                 'protocol': 'http', 'token': 'token', 'retries': 0}
+                for index in range(dead)]
+    with open(path, 'w') as inventory_file:
+        json.dump(devices, inventory_file)
+    return path
+
+
+def read_rows(path):
+    with open(path) as output:
+        return [json.loads(line) for line in output]
+
+
+def test_export_succeeds(server, tmp_path):
+    inventory = write_inventory(str(tmp_path / 'inventory.json'), server, 3)
+    output = str(tmp_path / 'export.jsonl')
+    assert fgt_export.main([inventory, '-o', output, '--progress', '0',
+                            '--page-size', '100']) == 0
+    rows = read_rows(output)
+    counts = collections.Counter((row['device'], row['endpoint']) for row in rows)
+    for index in range(3):
+        assert counts['fgt-%d' % index, 'addresses'] == 300
+        assert counts['fgt-%d' % index, 'policies'] == 40
+    assert all(row['vdom'] == 'root' for row in rows)
+
+
+def test_failed_device_exits_1(server, tmp_path, capsys):
+    inventory = write_inventory(str(tmp_path / 'inventory.json'), server, 2, dead=1)
+    output = str(tmp_path / 'export.jsonl')
+    assert fgt_export.main([inventory, '-o', output, '--progress', '0',
+                            '-e', 'addresses']) == 1
+    # rows of the devices that worked are kept
+    assert len(read_rows(output)) == 600
+    assert 'dead-0' in capsys.readouterr().err
+
+
+def test_write_failure_stops_and_exits_1(server, tmp_path, monkeypatch, capsys):
+    inventory = write_inventory(str(tmp_path / 'inventory.json'), server, 4)
+    writes = []
+
+    def failing_write(writer, payload):
+        writes.append(len(payload))
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(fgt_export.fgt_jsonl_writer, 'write', failing_write)
+    assert fgt_export.main([inventory, '-o', str(tmp_path / 'export.jsonl'),
+                            '--progress', '0', '-p', '1', '--page-size', '50']) == 1
+    # the writer gave up on the first failure
+    assert len(writes) == 1
+    assert 'No space left on device' in capsys.readouterr().err
+
+
+def test_unknown_endpoint_is_a_usage_error(server, tmp_path):
+    inventory = write_inventory(str(tmp_path / 'inventory.json'), server, 1)
+    with pytest.raises(SystemExit) as exit_info:
+        fgt_export.main([inventory, '-e', 'no-such-endpoint'])
+    assert exit_info.value.code == 2
+
+
+@pytest.mark.parametrize('module', ['fgt_export', 'fgt_api'])
+def test_command_line_exit_status(server, tmp_path, module):
+    inventory = write_inventory(str(tmp_path / 'inventory.json'), server, 1)
+    output = str(tmp_path / 'export.jsonl.gz')
+    process = subprocess.run([sys.executable, '-m', module, inventory, '-o', output,
+                              '--progress', '0', '-e', 'vdoms', 'firmware'],
+                             cwd=repo_dir, stderr=subprocess.PIPE)
+    assert process.returncode == 0
+    assert os.path.getsize(output) > 0
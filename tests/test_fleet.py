@@ -0,0 +1,83 @@
+# file: test_fleet.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# fgt_fleet: running one task across many devices, errors and per-device timeouts
+
+import time
+
+import pytest
+
+import fgt_api
+import fgt_mock
+
+
+@pytest.fixture
+def servers():
+    mocks = [fgt_mock.fgt_mock_server(addresses=20, policies=5) for index in range(3)]
+    for mock in mocks:
+        mock.start()
+    yield mocks
+    for mock in mocks:
+        mock.stop()
+
+
+def inventory(servers, **extra):
+    return [dict({'name': 'fgt-%d' % index, 'host': '127.0.0.1', 'token': 'token',
+                  'protocol': 'http', 'port': mock.port}, **extra)
+            for index, mock in enumerate(servers)]
+
+
+def test_run_all_reaches_every_device(servers):
+    fleet = fgt_api.fgt_fleet(inventory(servers), max_in_flight=2)
+    results = fleet.run_all('get_firmware')
+    fleet.close()
+    assert sorted(results) == ['fgt-0', 'fgt-1', 'fgt-2']
+    for res in results.values():
+        assert res.error is None
+        assert res.result.status_code == 200
+
+
+def test_clients_are_reused_across_runs(servers):
+    fleet = fgt_api.fgt_fleet(inventory(servers))
+    fleet.run_all('get_firmware')
+    clients = dict(fleet.clients)
+    fleet.run_all(lambda client: client.show_addresses())
+    assert fleet.clients == clients
+    fleet.close()
+    assert fleet.clients == {}
+
+
+def test_task_errors_are_reported_per_device(servers):
+    def task(client):
+        if client.name == 'fgt-1':
+            raise ValueError('bad device')
+        return client.name
+
+    fleet = fgt_api.fgt_fleet(inventory(servers))
+    results = fleet.run_all(task)
+    fleet.close()
+    assert isinstance(results['fgt-1'].error, ValueError)
+    assert results['fgt-0'].result == 'fgt-0'
+    assert results['fgt-2'].error is None
+
+
+def test_slow_device_times_out_without_holding_back_others(servers):
+    def task(client):
+        if client.name == 'fgt-0':
+            time.sleep(0.5)
+        return client.get_firmware()
+
+    devices = inventory(servers)
+    devices[0]['timeout'] = 0.2
+    fleet = fgt_api.fgt_fleet(devices)
+    names = []
+    for res in fleet.run(task):
+        names.append(res.name)
+        if res.name == 'fgt-0':
+            assert isinstance(res.error, TimeoutError)
+        else:
+            assert res.error is None
+    fleet.close()
+    assert names[-1] == 'fgt-0'
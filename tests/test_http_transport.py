@@ -0,0 +1,107 @@
+# file: test_http_transport.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# stdlib keep-alive transport (fgt_http_transport)
+
+import http.client
+import socket
+import time
+
+import pytest
+
+import fgt_api
+
+
+@pytest.fixture
+def transport(client):
+    transport = fgt_api.fgt_http_transport()
+    client.set_transport(transport)
+    yield transport
+    transport.close()
+
+
+# stand-in for an idle keep-alive connection the FortiGate closed after the request
+#   was sent: the socket looks alive, the response never comes
+class dead_connection:
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.timeout = None
+        self.sent = 0
+
+    def request(self, *args):
+        self.sent += 1
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected('remote end closed connection')
+
+    def close(self):
+        self.sock.close()
+        self.peer.close()
+
+
+def pool_key(server):
+    return ('http', '127.0.0.1', server.port, False)
+
+
+def test_read_write_round_trip(client, transport):
+    assert client.get_firmware().json()['results']['current']['major'] == 6
+    name = 'odd name/1'
+    assert client.add_address({'name': name,
+                               'subnet': '192.0.2.1 255.255.255.255'}).status_code == 200
+    assert client.get_address(name).json()['results'][0]['name'] == name
+    assert client.update_address(name, {'comment': 'x'}).status_code == 200
+    assert client.del_address(name).status_code == 200
+    assert client.get_address(name).status_code == 404
+
+
+def test_connections_are_kept_alive(client, server, transport):
+    for index in range(5):
+        assert client.get_firmware().status_code == 200
+    assert len(transport.idle[pool_key(server)]) == 1
+
+
+def test_stream_and_paging(client, transport):
+    assert len(list(client.api_get(client.cmdb_addr, stream=True))) == 300
+    assert len(list(client.iter_addresses(page_size=100))) == 300
+    # a stream read to the end hands its connection back
+    assert sum(len(idle) for idle in transport.idle.values()) == 1
+
+
+def test_get_is_resent_on_a_dropped_connection(client, server, transport):
+    dead = dead_connection()
+    transport.idle[pool_key(server)] = [dead]
+    before = server.requests
+    assert client.get_firmware().status_code == 200
+    assert dead.sent == 1
+    assert server.requests == before + 1
+
+
+def test_post_is_not_resent_on_a_dropped_connection(client, server, transport):
+    dead = dead_connection()
+    transport.idle[pool_key(server)] = [dead]
+    before = server.requests
+    assert client.add_address({'name': 'new-address',
+                               'subnet': '192.0.2.1 255.255.255.255'}) is None
+    assert dead.sent == 1
+    assert server.requests == before
+
+
+def test_closed_idle_connection_is_replaced(client, server, transport):
+    client.get_firmware()
+    connection = transport.idle[pool_key(server)][0]
+    # the server sees EOF, closes its end and the idle socket becomes readable
+    connection.sock.shutdown(socket.SHUT_WR)
+    time.sleep(0.1)
+    assert transport.dropped(connection)
+    assert client.get_firmware().status_code == 200
+    assert transport.idle[pool_key(server)] != [connection]
+
+
+def test_connection_refused_raises_connect_error(client, server):
+    transport = fgt_api.fgt_http_transport()
+    client.set_port(1)
+    with pytest.raises(fgt_api.fgt_connect_error):
+        transport.request(client, 'GET', client.monitor_base + 'system/firmware/', {},
+                          client.http_headers, None, False)
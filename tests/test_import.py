@@ -0,0 +1,67 @@
+# file: test_import.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# address import pipeline (fgt_import.py and fgt_api_token.import_addresses)
+
+import fgt_import
+
+
+def test_import_from_csv(client, tmp_path):
+    path = tmp_path / 'addresses.csv'
+    path.write_text('name,value,color,comment\n'
+                    'host-a,192.0.2.1,3,first\n'
+                    ',198.51.100.0/24,,\n'
+                    'range-a,192.0.2.10-192.0.2.20,,\n'
+                    'site-a,www.example.com,,\n'
+                    'bad-a,300.1.1.1,,\n'
+                    'bad-b,192.0.2.0/33,,\n'
+                    'host-a,192.0.2.3,,duplicate name\n')
+    rejects = []
+    importer = client.import_addresses(fgt_import.read_records(str(path)),
+                                       errors=rejects.append, name_prefix='imp-')
+    assert importer.accepted == 4
+    assert importer.succeeded == 4
+    assert sorted(reject.index for reject in rejects) == [5, 6, 7]
+    assert client.get_address('host-a').json()['results'][0]['subnet'] == (
+        '192.0.2.1 255.255.255.255')
+    assert client.get_address('imp-198.51.100.0/24').status_code == 200
+    assert client.get_address('range-a').json()['results'][0]['type'] == 'iprange'
+    assert client.get_address('site-a').json()['results'][0]['type'] == 'fqdn'
+
+
+def test_existing_addresses_are_skipped(client):
+    existing = client.get_address('net-1').json()['results'][0]
+    rejects = []
+    importer = client.import_addresses([{'name': 'copy', 'subnet': existing['subnet']},
+                                        {'name': 'net-1', 'value': '192.0.2.1'}],
+                                       errors=rejects.append)
+    assert importer.accepted == 0
+    assert len(rejects) == 2
+
+
+def test_bad_json_records_are_rejected(tmp_path):
+    path = tmp_path / 'addresses.jsonl'
+    path.write_text('{"name": "host-a", "value": "192.0.2.1"}\n'
+                    'not json\n'
+                    '{"name": "host-b", "value": "192.0.2.2", "color": ["blue"]}\n')
+    rejects = []
+    importer = fgt_import.fgt_address_import(errors=rejects.append)
+    addresses = [address for batch in importer.batches(
+        fgt_import.read_records(str(path))) for address in batch]
+    assert [address['name'] for address in addresses] == ['host-a']
+    assert [reject.index for reject in rejects] == [2, 3]
+    assert rejects[1].reason == 'invalid color'
+
+
+def test_device_errors_count_as_failed_not_rejected(client):
+    rejects = []
+    importer = client.import_addresses([{'name': 'net-1', 'value': '192.0.2.1'},
+                                        {'name': 'new-a', 'value': '192.0.2.2'}],
+                                       errors=rejects.append, dedupe=False)
+    assert (importer.accepted, importer.succeeded, importer.failed) == (2, 1, 1)
+    assert importer.rejected == 0
+    assert [(reject.index, reject.record['name']) for reject in rejects] == [
+        (None, 'net-1')]
+    assert rejects[0].reason == 'status 500'
@@ -0,0 +1,115 @@
+# file: test_metrics.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# per-endpoint metrics (fgt_metrics), Prometheus exposition and request hooks, for
+#   fgt_api_token and fgt_api_async
+
+import asyncio
+import json
+
+import pytest
+
+import fgt_api
+
+
+address = {'name': 'new-address', 'subnet': '192.0.2.1 255.255.255.255'}
+labels = ('test', 'root', 'cmdb/firewall/address')
+
+
+def test_counters_per_endpoint(client):
+    metrics = client.set_metrics()
+    client.show_addresses()
+    client.get_address('net-1')
+    client.get_address('no-such-address')
+    client.add_address(address)
+    assert metrics.requests[labels + ('GET', '200')] == 2
+    assert metrics.requests[labels + ('GET', '404')] == 1
+    assert metrics.errors[labels + ('GET', 'http_404')] == 1
+    assert metrics.requests[labels + ('POST', '200')] == 1
+    assert metrics.bytes_out[labels + ('POST',)] == len(json.dumps(address))
+    assert metrics.bytes_in[labels + ('GET',)] > 0
+    # object names do not create series of their own
+    assert {key[2] for key in metrics.requests} == {'cmdb/firewall/address'}
+    assert metrics.histograms[labels + ('GET', 'total')][-1] == 3
+
+
+def test_failed_call_is_counted_by_error_class(client):
+    metrics = client.set_metrics()
+    client.set_port(1)
+    assert client.get_firmware() is None
+    (key, count), = metrics.errors.items()
+    assert count == 1
+    assert key[3] == 'GET' and key[4] != 'none'
+
+
+def test_exposition_format(client):
+    metrics = client.set_metrics(fgt_api.fgt_metrics(buckets=(0.5, 10)))
+    client.show_addresses()
+    lines = metrics.exposition().splitlines()
+    series = ('{device="test",vdom="root",endpoint="cmdb/firewall/address",'
+              'method="GET"')
+    assert 'fgt_api_requests_total%s,status="200"} 1' % series in lines
+    assert '# TYPE fgt_api_request_duration_seconds histogram' in lines
+    total = series + ',phase="total"'
+    assert 'fgt_api_request_duration_seconds_bucket%s,le="10"} 1' % total in lines
+    assert 'fgt_api_request_duration_seconds_bucket%s,le="+Inf"} 1' % total in lines
+    assert 'fgt_api_request_duration_seconds_count%s} 1' % total in lines
+    for line in lines:
+        assert line.startswith('#') or float(line.split()[-1]) >= 0
+
+
+def test_label_values_are_escaped():
+    assert fgt_api.prom_labels([('device', 'a"b\\c\n')]) == '{device="a\\"b\\\\c\\n"}'
+
+
+def test_hooks(client):
+    calls = []
+
+    def pre_hook(api, method, api_url, params, headers):
+        params['format'] = 'name'
+        calls.append(('pre', method))
+
+    def post_hook(api, method, api_url, response, error, elapsed):
+        calls.append(('post', method, response.status_code, elapsed >= 0))
+
+    client.add_pre_hook(pre_hook)
+    client.add_post_hook(post_hook)
+    results = client.show_addresses().json()['results']
+    assert calls == [('pre', 'GET'), ('post', 'GET', 200, True)]
+    assert set(results[0]) == {'name'}
+    # the change applied to that request only
+    assert 'format' not in client.url_params
+
+
+def test_failing_hook_becomes_a_warning(client):
+    def hook(api, *args):
+        raise RuntimeError('hook failed')
+
+    client.add_post_hook(hook)
+    with pytest.warns(UserWarning, match='hook failed'):
+        assert client.get_firmware().status_code == 200
+
+
+def test_async_calls_are_measured_and_hooked(server):
+    calls = []
+
+    async def body():
+        client = server.configure(fgt_api.fgt_api_async('test', '127.0.0.1', 'token'))
+        metrics = client.set_metrics()
+        client.add_pre_hook(lambda api, method, *args: calls.append(('pre', method)))
+        client.add_post_hook(lambda api, method, api_url, response, *args:
+                             calls.append(('post', method, response.status_code)))
+        await client.show_addresses()
+        await client.add_address(address)
+        await client.close()
+        return metrics
+
+    metrics = asyncio.run(body())
+    assert calls == [('pre', 'GET'), ('post', 'GET', 200),
+                     ('pre', 'POST'), ('post', 'POST', 200)]
+    assert metrics.requests[labels + ('GET', '200')] == 1
+    assert metrics.requests[labels + ('POST', '200')] == 1
+    assert metrics.bytes_out[labels + ('POST',)] == len(json.dumps(address))
+    assert metrics.bytes_in[labels + ('GET',)] > 0
@@ -0,0 +1,71 @@
+# file: test_mirror.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# fgt_mirror: incremental refresh and indexed queries, checked against table scans
+
+import pytest
+
+import fgt_api
+
+
+@pytest.fixture
+def mirror(client):
+    mirror = fgt_api.fgt_mirror(client)
+    mirror.refresh()
+    return mirror
+
+
+# names of addresses whose interval matches "test"; the table scan the indexes replace
+def scan(mirror, test):
+    names = []
+    for name, addr_object in mirror.addresses.items():
+        interval = fgt_api.addr_interval(addr_object)
+        if interval is not None and test(*interval):
+            names.append(name)
+    return sorted(names)
+
+
+def test_refresh_is_incremental(client, mirror):
+    assert len(mirror.addresses) == 300
+    assert len(mirror.policies) == 40
+    assert mirror.refresh() is None
+    client.add_address({'name': 'new-net', 'subnet': '10.1.2.0 255.255.255.0'})
+    client.update_address('net-1', {'comment': 'changed'})
+    client.del_address('net-2')
+    report = mirror.refresh()
+    assert report['addresses'] == (1, 1, 1)
+    assert report['policies'] == (0, 0, 0)
+    assert mirror.address('net-1')['comment'] == 'changed'
+    assert mirror.addresses_containing('10.1.2.3')[-1] == 'new-net'
+    assert mirror.address('net-2') is None
+
+
+@pytest.mark.parametrize('ip', ['10.1.2.3', '100.64.0.1', '192.168.255.255',
+                                '0.0.0.0'])
+def test_addresses_containing_matches_scan(mirror, ip):
+    value = fgt_api.ip_to_int(ip)
+    assert mirror.addresses_containing(ip) == scan(
+        mirror, lambda start, end: start <= value <= end)
+
+
+@pytest.mark.parametrize('subnet', ['10.0.0.0/8', '100.64.0.0/10', '172.16.0.0/12'])
+def test_overlap_and_within_match_scan(mirror, subnet):
+    low, high = fgt_api.ip_interval(subnet)
+    assert mirror.addresses_overlapping(subnet) == scan(
+        mirror, lambda start, end: start <= high and end >= low)
+    assert mirror.addresses_within(subnet) == scan(
+        mirror, lambda start, end: start >= low and end <= high)
+
+
+def test_policy_indexes_match_scan(mirror):
+    for name in ('all', 'net-1', 'range-10'):
+        assert mirror.policies_using(name) == sorted(
+            policyid for policyid, policy in mirror.policies.items()
+            if name in fgt_api.ref_names(policy['srcaddr'] + policy['dstaddr']))
+    assert mirror.policies_between('port1', 'port2') == sorted(
+        policyid for policyid, policy in mirror.policies.items()
+        if fgt_api.ref_names(policy['srcintf']) == ['port1'] and
+        fgt_api.ref_names(policy['dstintf']) == ['port2'])
+    assert mirror.policies_between() == list(range(1, 41))
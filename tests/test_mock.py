@@ -0,0 +1,45 @@
+# file: test_mock.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# fgt_mock.py behaves like FortiOS where fgt_api.py depends on it
+
+import fgt_api
+import fgt_mock
+
+
+def policies(client, **options):
+    return client.show_policies(options=fgt_api.fgt_options(**options)).json()['results']
+
+
+def test_filter_parameters_are_anded(client):
+    every = policies(client)
+    port1 = policies(client, filter='srcintf==port1')
+    accept = policies(client, filter=['srcintf==port1', 'action==accept'])
+    assert 0 < len(accept) < len(port1) < len(every)
+    assert all(policy['action'] == 'accept' for policy in accept)
+
+
+def test_commas_in_one_filter_are_ored(client):
+    either = policies(client, filter='srcintf==port1,srcintf==port2')
+    assert len(either) == (len(policies(client, filter='srcintf==port1')) +
+                           len(policies(client, filter='srcintf==port2')))
+
+
+def test_joined_filter_value_is_one_literal_expression(client):
+    # "filter=a&filter=b" inside one value is not split into two filters
+    joined = policies(client, params={'filter': 'srcintf==port1&filter=action==accept'})
+    assert joined == []
+
+
+def test_start_and_count(client):
+    names = [obj['name'] for obj in client.show_addresses().json()['results']]
+    page = client.show_addresses(options=fgt_api.fgt_options(start=10, count=5))
+    assert [obj['name'] for obj in page.json()['results']] == names[10:15]
+
+
+def test_tables_are_reproducible():
+    first = fgt_mock.mock_addresses(50, seed=3)
+    assert fgt_mock.mock_addresses(50, seed=3) == first
+    assert fgt_mock.mock_addresses(50, seed=4) != first
@@ -0,0 +1,73 @@
+# file: test_monitor.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# policy counter polling (fgt_monitor_poller) and its ring buffers
+
+import time
+
+import pytest
+
+import fgt_api
+
+
+def test_ring_buffer_keeps_the_newest_samples():
+    ring = fgt_api.fgt_ring_buffer(3, ('a', 'b'))
+    assert ring.latest() is None
+    for index in range(5):
+        ring.append(float(index), (index * 10, index * 100))
+    assert len(ring) == 3
+    assert ring.timestamps() == [2.0, 3.0, 4.0]
+    assert ring.column('b') == [200.0, 300.0, 400.0]
+    assert ring.latest() == {'time': 4.0, 'a': 40.0, 'b': 400.0}
+    assert ring.nbytes == 3 * 8 * 3
+
+
+def test_counter_delta_handles_resets():
+    assert fgt_api.counter_delta(100, 150) == 50
+    assert fgt_api.counter_delta(100, 30) == 30
+
+
+def test_poll_records_deltas_and_rates(client, server):
+    seen = []
+    poller = fgt_api.fgt_monitor_poller(
+        [client], interval=1, capacity=4,
+        callback=lambda name, timestamp, samples: seen.append(len(samples)))
+    # the first poll only sets the baseline
+    assert poller.poll('test') == {}
+    time.sleep(0.2)
+    samples = poller.poll('test')
+    assert seen == [0, 40]
+    # policy 1 gets 63 hits per second in the mock
+    sample = samples[('root', 1)]
+    assert sample['active_sessions'] == 63
+    assert sample['hit_count_rate'] == pytest.approx(63, rel=0.5)
+    assert sample['bytes_delta'] == sample['hit_count_delta'] * 1200
+    ring = poller.policy_series('test', 1)
+    assert len(ring) == 1
+    assert ring.latest()['hit_count_delta'] == sample['hit_count_delta']
+    # a counter reset does not produce a negative delta
+    server.reset_counters()
+    samples = poller.poll('test')
+    assert all(sample['hit_count_delta'] >= 0 for sample in samples.values())
+    assert len(poller.latest('test')) == 40
+
+
+def test_failed_poll_backs_off(client):
+    client.set_port(1)
+    poller = fgt_api.fgt_monitor_poller([client], interval=1)
+    with pytest.raises(fgt_api.fgt_api_error):
+        poller.poll('test')
+    stats = poller.device_stats()['test']
+    assert stats['errors'] == 1
+    assert stats['interval'] == 2
+
+
+def test_run_polls_on_schedule(client):
+    poller = fgt_api.fgt_monitor_poller([client], interval=0.05)
+    poller.start()
+    time.sleep(0.4)
+    poller.stop()
+    assert poller.device_stats()['test']['polls'] >= 3
+    assert len(poller.latest()) == 40
@@ -0,0 +1,57 @@
+# file: test_options.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# per-call request options (fgt_options): filters, thread safety of one shared client
+
+import concurrent.futures
+
+import pytest
+
+import fgt_api
+
+
+def names(response):
+    return sorted(obj['name'] for obj in response.json()['results'])
+
+
+def test_options_leave_client_settings_alone(client):
+    client.set_filter({'name==net-1': 'or'})
+    options = fgt_api.fgt_options(filter='name==net-2', format=['name'])
+    assert names(client.show_addresses(options)) == ['net-2']
+    assert client.url_params == {'vdom': 'root', 'filter': ['name==net-1']}
+    # a call without options uses (and then clears) the client settings
+    assert names(client.show_addresses()) == ['net-1']
+
+
+def test_filter_groups_and_or(client):
+    filters = {'name=@net-1': 'or', 'name=@range-1': 'or', 'name=@0': 'and'}
+    assert fgt_api.fgt_options.filter_groups(filters) == (
+        'name=@net-1,name=@range-1', 'name=@0')
+    expected = names(client.show_addresses(fgt_api.fgt_options(filter=filters)))
+    assert 'net-101' in expected and 'range-10' in expected
+    assert all('0' in name and ('net-1' in name or 'range-1' in name)
+               for name in expected)
+    client.set_filter(filters)
+    assert names(client.show_addresses()) == expected
+
+
+def test_options_are_immutable():
+    options = fgt_api.fgt_options(vdom='root')
+    with pytest.raises(AttributeError):
+        options.vdom = 'dmz'
+    assert options.merge(vdom='dmz').vdom == 'dmz'
+    assert options.vdom == 'root'
+
+
+def test_concurrent_calls_with_options_share_one_client(client):
+    def read(index):
+        options = fgt_api.fgt_options(filter='name==net-%d' % index, format=['name'])
+        return index, names(client.api_get(client.cmdb_addr, options=options))
+
+    indexes = [index for index in range(1, 200) if index % 10]
+    with concurrent.futures.ThreadPoolExecutor(16) as executor:
+        results = list(executor.map(read, indexes))
+    assert all(result == ['net-%d' % index] for index, result in results)
+    assert client.url_params == {'vdom': 'root'}
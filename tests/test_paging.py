@@ -0,0 +1,44 @@
+# file: test_paging.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# paged reads (iter_pages and the iterators built on it)
+
+import threading
+
+import fgt_api
+
+
+def test_iter_addresses_reads_every_page(client, server):
+    names = [obj['name'] for obj in client.iter_addresses(page_size=64, adaptive=False)]
+    assert len(names) == 300
+    assert len(set(names)) == 300
+    # 300 objects in pages of 64: four full pages and one short one
+    assert server.requests == 5
+
+
+def test_iter_pages_with_prefetch_keeps_order(client):
+    plain = [obj['name'] for obj in client.iter_addresses(page_size=50)]
+    prefetched = [obj['name'] for obj in client.iter_addresses(page_size=50,
+                                                               prefetch=True)]
+    assert prefetched == plain
+
+
+def test_iter_policies_with_format(client):
+    options = fgt_api.fgt_options(format=['policyid', 'name'])
+    policies = list(client.iter_policies(options=options))
+    assert len(policies) == 40
+    assert all(set(policy) <= {'policyid', 'name'} for policy in policies)
+
+
+def test_iter_pages_early_stop_waits_for_prefetch(client, server):
+    server.latency = 0.1
+    pages = client.iter_pages(client.cmdb_addr, page_size=50, adaptive=False,
+                              prefetch=True)
+    next(pages)
+    pages.close()
+    # the prefetch was sent before close(); close() returns after it finished
+    assert server.requests == 2
+    assert not [thread for thread in threading.enumerate()
+                if thread.name.startswith('ThreadPoolExecutor')]
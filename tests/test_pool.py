@@ -0,0 +1,58 @@
+# file: test_pool.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# pooled keep-alive sessions of fgt_api_token
+
+import concurrent.futures
+import warnings
+
+import fgt_api
+
+
+def test_requests_share_one_session(client):
+    for index in range(5):
+        assert client.get_firmware().status_code == 200
+    pool = client.pool
+    session = pool.get_session()
+    client.show_addresses()
+    assert client.pool is pool
+    assert pool.get_session() is session
+
+
+def test_concurrent_first_requests_create_one_pool(server):
+    client = server.configure(fgt_api.fgt_api_token('test', '127.0.0.1', 'token'))
+    with concurrent.futures.ThreadPoolExecutor(16) as executor:
+        sessions = list(executor.map(lambda index: client.get_session(), range(16)))
+    assert all(session is sessions[0] for session in sessions)
+    client.close()
+
+
+def test_shared_pool_is_reused_per_host(server):
+    clients = [server.configure(fgt_api.fgt_api_token(name, '127.0.0.1', 'token'))
+               for name in ('a', 'b')]
+    for api in clients:
+        api.share_pool()
+        assert api.get_firmware().status_code == 200
+    assert clients[0].pool is clients[1].pool
+    fgt_api.close_shared_pools()
+    assert fgt_api.shared_pools == {}
+
+
+def test_idle_pool_is_rebuilt():
+    pool = fgt_api.fgt_session_pool(idle_timeout=60)
+    session = pool.get_session()
+    assert pool.get_session() is session
+    pool.last_used -= 120
+    assert pool.get_session() is not session
+    pool.close()
+
+
+def test_cert_verify_keeps_other_warning_filters(client):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        client.set_url_warn(False)
+        client.set_url_warn(True)
+        assert any(action == 'error' and category is DeprecationWarning
+                   for action, message, category, module, line in warnings.filters)
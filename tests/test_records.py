@@ -0,0 +1,81 @@
+# file: test_records.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# typed result models (fgt_record subclasses and fgt_result_set)
+
+import pytest
+
+import fgt_api
+
+
+policy = {'policyid': 7, 'q_origin_key': 7, 'name': 'web', 'action': 'accept',
+          'srcintf': [{'name': 'port1', 'q_origin_key': 'port1'}],
+          'srcaddr': [{'name': 'lan'}, {'name': 'dmz'}], 'status': 'enable',
+          'vendor-field': 'kept'}
+
+
+def test_record_decodes_on_first_access():
+    record = fgt_api.fgt_policy_record.from_object(policy)
+    assert not record.decoded
+    assert record.key == 7
+    assert record.decoded
+    assert record.srcaddr == ('lan', 'dmz')
+    assert record.srcintf == ('port1',)
+    # fields missing from the object are None, unknown ones go to "extra"
+    assert record.dstaddr is None
+    assert record.get('dstaddr', []) == []
+    assert record.get('vendor-field') == 'kept'
+    assert record.extra == {'vendor-field': 'kept'}
+    with pytest.raises(AttributeError):
+        record.no_such_attribute
+
+
+def test_to_dict_round_trip():
+    record = fgt_api.fgt_policy_record.from_object(policy)
+    undecoded = record.to_dict()
+    assert undecoded == policy
+    record.decode()
+    decoded = record.to_dict()
+    assert decoded['srcaddr'] == [{'name': 'lan'}, {'name': 'dmz'}]
+    assert 'q_origin_key' not in decoded
+    assert decoded['vendor-field'] == 'kept'
+
+
+def test_records_use_slots():
+    record = fgt_api.fgt_address_record.from_object({'name': 'a', 'type': 'ipmask'})
+    with pytest.raises(AttributeError):
+        record.no_such_attribute = 1
+    other = fgt_api.fgt_address_record.from_object({'name': 'b', 'type': 'ipmask'})
+    # interned values are shared between records
+    assert record.type is other.type
+
+
+def test_result_set_from_device(client):
+    results = client.show_address_records()
+    assert len(results) == 300
+    assert results.status == 'success'
+    assert results.http_status == 200
+    assert results.revision is not None
+    assert results.vdom == 'root'
+    assert results.get('net-1').name == 'net-1'
+    assert results.get('missing') is None
+    assert isinstance(results[0], fgt_api.fgt_address_record)
+    policies = client.show_policy_records()
+    assert [record.policyid for record in policies] == list(range(1, 41))
+
+
+def test_result_set_errors(client):
+    results = client.api_get(client.cmdb_addr + 'missing/')
+    with pytest.raises(fgt_api.fgt_api_error, match='404'):
+        len(fgt_api.fgt_result_set(results, fgt_api.fgt_address_record))
+    with pytest.raises(fgt_api.fgt_api_error):
+        fgt_api.fgt_result_set(None).load()
+
+
+def test_iter_records(client):
+    records = list(client.iter_records(client.cmdb_addr, fgt_api.fgt_address_record,
+                                       page_size=64))
+    assert len(records) == 300
+    assert records[1].key == 'net-1'
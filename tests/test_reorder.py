@@ -0,0 +1,41 @@
+# file: test_reorder.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# minimal policy reordering (reorder_policies and fgt_reorder_plan)
+
+import random
+
+import pytest
+
+import fgt_api
+
+
+def policy_ids(client):
+    options = fgt_api.fgt_options(format=['policyid'])
+    return [policy['policyid'] for policy in client.iter_policies(options=options)]
+
+
+def test_reorder_policies_reaches_target(client):
+    current = policy_ids(client)
+    target = list(current)
+    random.Random(1).shuffle(target)
+    plan = client.reorder_policies(target)
+    assert policy_ids(client) == target
+    assert len(plan.responses) == len(plan.moves)
+    assert len(plan.moves) <= plan.naive_calls
+
+
+def test_reorder_dry_run_moves_nothing(client):
+    current = policy_ids(client)
+    target = current[1:] + current[:1]
+    plan = client.reorder_policies(target, dry_run=True)
+    # moving the first policy to the end is one move
+    assert plan.moves == [(current[0], current[-1], 'after')]
+    assert policy_ids(client) == current
+
+
+def test_reorder_plan_rejects_a_different_set():
+    with pytest.raises(ValueError):
+        fgt_api.fgt_reorder_plan([1, 2, 3], [1, 2, 4])
@@ -0,0 +1,88 @@
+# file: test_resolver.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# address and service group resolution (fgt_object_resolver)
+
+import pytest
+
+import fgt_analyzer
+
+
+def refs(*names):
+    return [{'name': name} for name in names]
+
+
+def group(name, *members, exclude=()):
+    return {'name': name, 'member': refs(*members),
+            'exclude': 'enable' if exclude else 'disable',
+            'exclude-member': refs(*exclude)}
+
+
+@pytest.fixture
+def resolver():
+    resolver = fgt_analyzer.fgt_object_resolver()
+    resolver.set_tables(
+        addresses=[{'name': 'a', 'subnet': '10.0.0.0 255.255.255.0'},
+                   {'name': 'b', 'subnet': '10.0.1.0 255.255.255.0'},
+                   {'name': 'c', 'type': 'iprange', 'start-ip': '10.0.0.10',
+                    'end-ip': '10.0.0.19'},
+                   {'name': 'web', 'type': 'fqdn', 'fqdn': 'www.example.com'}],
+        addrgrps=[group('ab', 'a', 'b'), group('nested', 'ab', 'c'),
+                  group('holes', 'ab', exclude=('c',)), group('loop-1', 'a', 'loop-2'),
+                  group('loop-2', 'loop-1'), group('fqdn', 'a', 'web')],
+        services=[{'name': 'HTTP', 'tcp-portrange': '80'},
+                  {'name': 'HTTPS', 'tcp-portrange': '443'},
+                  {'name': 'PING', 'protocol': 'ICMP', 'icmptype': 8}],
+        servicegrps=[group('web-services', 'HTTP', 'HTTPS')])
+    return resolver
+
+
+def test_groups_are_expanded_and_merged(resolver):
+    assert resolver.address_ranges('ab') == [(0x0a000000, 0x0a0001ff)]
+    assert resolver.address_ranges('nested') == resolver.address_ranges('ab')
+    assert resolver.address_ranges('holes') == [(0x0a000000, 0x0a000009),
+                                                (0x0a000014, 0x0a0001ff)]
+    assert resolver.service_ranges('web-services') == [(6 << 16 | 80, 6 << 16 | 80),
+                                                       (6 << 16 | 443, 6 << 16 | 443)]
+
+
+def test_expansions_are_memoized(resolver):
+    resolver.address_ranges('nested')
+    misses = resolver.stats()['misses']
+    resolver.address_ranges('nested')
+    resolver.address_ranges('ab')
+    assert resolver.stats()['misses'] == misses
+    assert resolver.stats()['hits'] >= 2
+
+
+def test_cycles_and_unresolved_names(resolver):
+    assert resolver.address_ranges('loop-1') is None
+    assert resolver.cycles == [('loop-1', 'loop-2', 'loop-1')]
+    assert resolver.address_ranges('fqdn') is None
+    assert resolver.service_ranges('PING') is None
+    assert resolver.address_ranges('missing') is None
+    assert resolver.unresolved == {'web': 'address', 'PING': 'service',
+                                   'missing': 'address'}
+
+
+def test_negated_policy_fields(resolver):
+    policy = {'srcaddr': refs('ab'), 'srcaddr-negate': 'enable'}
+    assert resolver.policy_ranges(policy, 'srcaddr') == [(0, 0x09ffffff),
+                                                         (0x0a000200, 0xffffffff)]
+
+
+def test_refresh_loads_tables_once_per_revision(client, server):
+    resolver = fgt_analyzer.fgt_object_resolver(client)
+    assert resolver.refresh()
+    groups = resolver.groups['address']
+    assert len(resolver.objects['address']) == 300 and groups
+    for name in groups:
+        assert resolver.address_ranges(name) is not None
+    before = server.requests
+    assert not resolver.refresh()
+    assert server.requests == before + 1
+    client.add_address({'name': 'new-net', 'subnet': '192.0.2.0 255.255.255.0'})
+    assert resolver.refresh()
+    assert 'new-net' in resolver.objects['address']
@@ -0,0 +1,219 @@
+# file: test_retry.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# retry policy and token-bucket rate limiting, for fgt_api_token and fgt_api_async
+
+import asyncio
+import socket
+import ssl
+import time
+import types
+
+import aiohttp
+import pytest
+
+import fgt_api
+
+
+# transport over the client's session that fails the first "failures" requests
+class flaky_transport:
+    def __init__(self, failures, error=ConnectionResetError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def request(self, client, method, api_url, params, headers, json_data, stream):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error('connection reset by peer')
+        return client.get_session().request(method, api_url, params=params,
+                                            headers=headers, json=json_data,
+                                            verify=client.cert_verify,
+                                            timeout=client.timeout, stream=stream)
+
+
+# fgt_api_async whose first "failures" request attempts fail with "error"
+class flaky_async(fgt_api.fgt_api_async):
+    def __init__(self, failures, error):
+        super().__init__('test', '127.0.0.1', 'token')
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def request_async(self, *args):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return await super().request_async(*args)
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_get_is_retried_after_connection_reset(client):
+    client.set_transport(flaky_transport(2))
+    client.set_retry(retries=3, backoff=0.01)
+    response = client.get_firmware()
+    assert response.status_code == 200
+    assert response.retries == 2
+    assert client.transport_stats()['retries'] == 2
+
+
+def test_retries_stop_at_the_limit(client):
+    client.set_transport(flaky_transport(5))
+    client.set_retry(retries=2, backoff=0.01)
+    assert client.get_firmware() is None
+    assert client.transport.calls == 3
+
+
+def test_post_is_not_retried_once_sent(client, server):
+    client.set_transport(flaky_transport(1))
+    client.set_retry(retries=3, backoff=0.01)
+    response = client.add_address({'name': 'new-address',
+                                   'subnet': '192.0.2.1 255.255.255.255'})
+    assert response is None
+    assert client.transport.calls == 1
+    assert client.get_address('new-address').status_code == 404
+
+
+def test_post_is_retried_if_it_never_left(client):
+    client.set_transport(flaky_transport(1, fgt_api.fgt_connect_error))
+    client.set_retry(retries=3, backoff=0.01)
+    response = client.add_address({'name': 'new-address',
+                                   'subnet': '192.0.2.1 255.255.255.255'})
+    assert response.status_code == 200
+    assert client.transport.calls == 2
+
+
+def test_retryable_statuses_and_errors():
+    policy = fgt_api.fgt_retry_policy()
+    busy = types.SimpleNamespace(status_code=503)
+    error = types.SimpleNamespace(status_code=500)
+    assert policy.retryable('GET', busy, None)
+    assert policy.retryable('POST', busy, None)
+    assert not policy.retryable('GET', error, None)
+    # a certificate that failed verification fails the same way every time
+    cert_error = fgt_api.fgt_connect_error('cannot connect')
+    cert_error.__cause__ = ssl.SSLCertVerificationError('certificate verify failed')
+    assert not policy.retryable('GET', None, cert_error)
+    assert policy.retryable('GET', None, fgt_api.fgt_connect_error('refused'))
+
+
+def test_retry_after_header_sets_the_delay():
+    policy = fgt_api.fgt_retry_policy(max_backoff=5)
+    assert policy.delay(0, types.SimpleNamespace(headers={'Retry-After': '2'})) == 2
+    assert policy.delay(0, types.SimpleNamespace(headers={'Retry-After': '60'})) == 5
+    assert 0 <= policy.delay(3) <= policy.backoff * 8
+
+
+def test_rate_limit_spaces_requests(client):
+    client.set_rate_limit(rate=20, burst=1)
+    start = time.monotonic()
+    for index in range(6):
+        assert client.get_firmware().status_code == 200
+    # the first request uses the burst, the other five wait 1/20 s each
+    assert time.monotonic() - start >= 0.2
+    assert client.transport_stats()['throttled'] >= 4
+
+
+def test_shared_rate_limit_covers_every_client(server):
+    limiter = fgt_api.fgt_rate_limiter(20, burst=1)
+    clients = [server.configure(fgt_api.fgt_api_token(name, '127.0.0.1', 'token'))
+               for name in ('a', 'b')]
+    for api in clients:
+        api.set_rate_limit(limiter=limiter)
+    start = time.monotonic()
+    for index in range(3):
+        for api in clients:
+            api.get_firmware()
+    assert time.monotonic() - start >= 0.2
+    for api in clients:
+        api.close()
+
+
+def test_rate_limiter_needs_a_positive_rate():
+    for rate in (0, -1):
+        with pytest.raises(ValueError):
+            fgt_api.fgt_rate_limiter(rate)
+    # no fleet-wide limit
+    assert fgt_api.fgt_fleet([], rate_limit=0).rate_limiter is None
+
+
+def test_async_get_is_retried(server):
+    async def body():
+        client = server.configure(flaky_async(2, aiohttp.ServerDisconnectedError()))
+        client.set_retry(retries=3, backoff=0.01)
+        response = await client.get_firmware()
+        await client.close()
+        return client, response
+
+    client, response = asyncio.run(body())
+    assert response.status_code == 200
+    assert response.retries == 2
+    assert client.transport_stats()['retries'] == 2
+
+
+def test_async_post_is_retried_only_if_it_never_left(server):
+    async def body(error):
+        client = server.configure(flaky_async(1, error))
+        client.set_retry(retries=3, backoff=0.01)
+        response = await client.add_address({'name': 'new-address',
+                                             'subnet': '192.0.2.1 255.255.255.255'})
+        await client.close()
+        return client.calls, response
+
+    calls, response = asyncio.run(body(aiohttp.ServerDisconnectedError()))
+    assert (calls, response) == (1, None)
+    refused = aiohttp.ClientConnectorError(
+        types.SimpleNamespace(ssl=None, host='127.0.0.1', port=0),
+        ConnectionRefusedError(111, 'refused'))
+    calls, response = asyncio.run(body(refused))
+    assert calls == 2
+    assert response.status_code == 200
+
+
+def test_async_retries_stop_at_the_limit():
+    async def body():
+        client = fgt_api.fgt_api_async('test', '127.0.0.1', 'token')
+        client.protocol = 'http'
+        client.set_port(closed_port())
+        client.set_retry(retries=2, backoff=0.01)
+        response = await client.get_firmware()
+        await client.close()
+        return client, response
+
+    client, response = asyncio.run(body())
+    assert response is None
+    assert client.transport_stats() == {'calls': 1, 'retries': 2, 'throttled': 0,
+                                        'throttle_wait': 0.0}
+
+
+def test_async_rate_limit_does_not_block_the_loop(server):
+    async def body():
+        client = server.configure(fgt_api.fgt_api_async('test', '127.0.0.1', 'token'))
+        client.set_rate_limit(rate=20, burst=1)
+        ticks = []
+
+        async def ticker():
+            for index in range(10):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        start = time.monotonic()
+        responses = await asyncio.gather(
+            ticker(), *[client.get_firmware() for index in range(6)])
+        elapsed = time.monotonic() - start
+        await client.close()
+        return client, responses[1:], elapsed, ticks
+
+    client, responses, elapsed, ticks = asyncio.run(body())
+    assert [response.status_code for response in responses] == [200] * 6
+    assert elapsed >= 0.2
+    assert client.transport_stats()['throttled'] == 5
+    # the ticker kept running while requests waited for tokens
+    assert ticks[-1] - ticks[0] < 0.4
@@ -0,0 +1,81 @@
+# file: test_snapshot.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# on-disk config snapshots (write_snapshot, fgt_snapshot, load_snapshot)
+
+import os
+
+import pytest
+
+import fgt_api
+
+
+def test_write_and_read_back(tmp_path):
+    path = str(tmp_path / 'tables.snap')
+    objects = [{'name': 'obj-%d' % index, 'value': index} for index in range(100)]
+    fgt_api.write_snapshot(path, [('table/', 'name', iter(objects)),
+                                  ('empty/', 'name', [])],
+                           revision='abc', device={'host': 'fgt'})
+    with fgt_api.fgt_snapshot(path) as snapshot:
+        assert snapshot.revision == 'abc'
+        assert snapshot.device == {'host': 'fgt'}
+        table = snapshot['table/']
+        assert len(table) == 100
+        assert list(table) == objects
+        assert table['obj-42'] == {'name': 'obj-42', 'value': 42}
+        assert 'obj-100' not in table
+        assert table.keys()[:2] == ['obj-0', 'obj-1']
+        assert list(snapshot.table('empty/')) == []
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = str(tmp_path / 'tables.snap')
+
+    def objects():
+        yield {'name': 'first'}
+        raise fgt_api.fgt_api_error('read failed')
+
+    with pytest.raises(fgt_api.fgt_api_error):
+        fgt_api.write_snapshot(path, [('table/', 'name', objects())])
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / 'other.snap'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        fgt_api.fgt_snapshot(str(path))
+
+
+def test_load_snapshot_reuses_a_current_file(client, server, tmp_path):
+    path = str(tmp_path / 'device.snap')
+    snapshot = client.load_snapshot(path, page_size=100)
+    assert snapshot.fetched
+    assert len(snapshot['firewall/address/']) == 300
+    assert snapshot['firewall/policy/'][1]['policyid'] == 1
+    snapshot.close()
+    # same revision: opened from disk with one revision check
+    before = server.requests
+    snapshot = client.load_snapshot(path)
+    assert not snapshot.fetched
+    assert server.requests == before + 1
+    snapshot.close()
+    # a config change makes it stale
+    client.add_address({'name': 'new-net', 'subnet': '192.0.2.0 255.255.255.0'})
+    with client.load_snapshot(path) as snapshot:
+        assert snapshot.fetched
+        assert 'new-net' in snapshot['firewall/address/']
+
+
+def test_snapshot_of_another_device_is_replaced(client, tmp_path):
+    path = str(tmp_path / 'device.snap')
+    tables = [(table, key_field, []) for table, key_field
+              in fgt_api.default_snapshot_tables.items()]
+    fgt_api.write_snapshot(path, tables, client.config_revision(),
+                           {'host': 'other', 'port': client.port, 'vdom': 'root'})
+    with client.load_snapshot(path) as snapshot:
+        assert snapshot.fetched
+        assert snapshot.device['host'] == '127.0.0.1'
+        assert len(snapshot['firewall/address/']) == 300
@@ -0,0 +1,61 @@
+# file: test_stream.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# streamed responses (stream_results and api_get(stream=True))
+
+import http.client
+
+import pytest
+
+import fgt_api
+
+
+# response whose body breaks off after "body", raising "error" (if not None)
+class broken_response:
+    status_code = 200
+
+    def __init__(self, body, error):
+        self.body = body
+        self.error = error
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        yield self.body
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_matches_whole_response(client):
+    whole = client.show_addresses().json()['results']
+    streamed = list(client.api_get(client.cmdb_addr, stream=True))
+    assert streamed == whole
+
+
+def test_stream_results_small_chunks(client):
+    response = client.api_request('GET', client.cmdb_addr, {}, client.http_headers,
+                                  stream=True)
+    streamed = list(fgt_api.stream_results(response, chunk_size=7))
+    assert len(streamed) == 300
+    assert streamed[0]['name'] == 'all'
+
+
+@pytest.mark.parametrize('error', [ConnectionResetError('reset by peer'),
+                                   http.client.IncompleteRead(b'')])
+def test_read_errors_become_api_errors(error):
+    response = broken_response(b'{"results": [{"name": "a"}, ', error)
+    results = fgt_api.stream_results(response)
+    assert next(results) == {'name': 'a'}
+    with pytest.raises(fgt_api.fgt_api_error, match='response body not received'):
+        next(results)
+    assert response.closed
+
+
+def test_malformed_json_is_an_api_error():
+    response = broken_response(b'{"results": [{"name": ', None)
+    with pytest.raises(fgt_api.fgt_api_error, match='invalid JSON'):
+        list(fgt_api.stream_results(response))
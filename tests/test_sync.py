@@ -0,0 +1,50 @@
+# file: test_sync.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# desired-state sync (fgt_sync)
+
+import fgt_api
+
+
+def test_plan_only_changes_what_differs(client):
+    sync = fgt_api.fgt_sync(client)
+    current = client.get_address('net-1').json()['results'][0]
+    plan = sync.plan_addresses([{'name': 'net-1', 'subnet': current['subnet']},
+                                {'name': 'net-2', 'comment': 'changed'},
+                                {'name': 'new-address',
+                                 'subnet': '192.0.2.1 255.255.255.255'}])
+    assert [obj['name'] for obj in plan.creates] == ['new-address']
+    assert [update[0] for update in plan.updates] == ['net-2']
+    assert plan.deletes == []
+    assert len(plan) == 2
+
+
+def test_apply_in_one_transaction(client, server):
+    sync = fgt_api.fgt_sync(client)
+    address_plan = sync.plan_addresses([{'name': 'new-address',
+                                         'subnet': '192.0.2.0 255.255.255.0'},
+                                        {'name': 'net-1', 'comment': 'synced'}])
+    policy_plan = sync.plan_policies([{
+        'policyid': 999, 'name': 'synced', 'srcintf': ['port1'],
+        'dstintf': ['port2'], 'srcaddr': ['all'], 'dstaddr': ['new-address'],
+        'service': ['ALL'], 'action': 'accept', 'schedule': 'always'}])
+    # shorthand values are sent in the form FortiOS expects
+    assert policy_plan.create_items()[0][2]['dstaddr'] == [{'name': 'new-address'}]
+    reports = sync.apply(address_plan, policy_plan, transaction=True)
+    assert [(table, action) for table, action, report in reports] == [
+        ('address', 'create'), ('address', 'update'), ('policy', 'create')]
+    assert all(report.transaction == 'committed' for table, action, report in reports)
+    # one transaction for the whole sync
+    assert server.next_transaction == 2
+    policy = client.get_policy(999).json()['results'][0]
+    assert policy['dstaddr'] == [{'name': 'new-address'}]
+    assert client.get_address('net-1').json()['results'][0]['comment'] == 'synced'
+
+
+def test_second_plan_after_apply_is_empty(client):
+    sync = fgt_api.fgt_sync(client)
+    desired = [{'name': 'net-%d' % index, 'comment': 'synced'} for index in range(1, 6)]
+    sync.apply(sync.plan_addresses(desired))
+    assert len(sync.plan_addresses(desired)) == 0
@@ -0,0 +1,62 @@
+# file: test_vdoms.py
+# created: 2026-10-18
+# last modified: 2026-10-18
+
+# purpose:
+# multi-VDOM reads (iter_vdoms, query_vdoms): parallel and split modes, per-VDOM
+#   reports
+
+import pytest
+
+import fgt_api
+import fgt_mock
+
+
+@pytest.fixture
+def vdom_client():
+    with fgt_mock.fgt_mock_server(addresses=50, policies=10,
+                                  vdoms=('root', 'dmz', 'lab')) as server:
+        client = server.configure(fgt_api.fgt_api_token('test', '127.0.0.1', 'token'))
+        options = fgt_api.fgt_options(vdom='dmz')
+        client.add_address({'name': 'dmz-only', 'subnet': '192.0.2.0 255.255.255.0'},
+                           options=options)
+        yield client
+        client.close()
+
+
+def test_query_every_vdom_in_parallel(vdom_client):
+    results, report = vdom_client.query_vdoms(vdom_client.cmdb_addr, page_size=20)
+    assert report.mode == 'parallel'
+    assert list(results) == ['root', 'dmz', 'lab']
+    assert {vdom: len(objects) for vdom, objects in results.items()} == {
+        'root': 50, 'dmz': 51, 'lab': 50}
+    assert 'dmz-only' in [obj['name'] for obj in results['dmz']]
+    assert report.succeeded == 3
+    assert report.results['dmz'].count == 51
+
+
+def test_split_global_matches_parallel(vdom_client):
+    parallel, report = vdom_client.query_vdoms(vdom_client.cmdb_policy)
+    split, report = vdom_client.query_vdoms(vdom_client.cmdb_policy,
+                                            split_global=True)
+    assert report.mode == 'split'
+    assert split == parallel
+    split, report = vdom_client.query_vdoms(vdom_client.cmdb_policy, ['lab', 'root'],
+                                            split_global=True)
+    assert sorted(split) == ['lab', 'root']
+
+
+def test_failed_vdom_is_reported_without_stopping_others(vdom_client):
+    results, report = vdom_client.query_vdoms(vdom_client.cmdb_addr,
+                                              ['root', 'missing', 'lab'])
+    assert report.failed == 1
+    assert [result.vdom for result in report.failures()] == ['missing']
+    assert results['missing'] == []
+    assert len(results['root']) == len(results['lab']) == 50
+
+
+def test_early_stop_returns(vdom_client):
+    pairs = vdom_client.iter_vdom_addresses(parallelism=1, page_size=10)
+    first = [next(pairs) for index in range(5)]
+    pairs.close()
+    assert all(vdom in ('root', 'dmz', 'lab') for vdom, obj in first)